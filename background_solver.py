@@ -0,0 +1,205 @@
+#background_solver.py
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from node import Node
+from rush_hour_puzzle import RushHourPuzzle
+
+# Positions des véhicules d'un état : (id, x, y)
+VehicleSnapshot = Tuple[str, int, int]
+
+
+class SearchCancelled(Exception):
+    """Levée dans le thread de recherche lorsque l'utilisateur annule."""
+
+
+class SearchProgress:
+    """Instantané de la recherche transmis à l'interface via la file."""
+    def __init__(self,
+                 explored: int,
+                 frontier_size: int,
+                 best_f: float,
+                 depth: int,
+                 nodes_per_sec: float,
+                 elapsed: float,
+                 vehicles: Optional[List[VehicleSnapshot]] = None):
+        self.explored = explored
+        self.frontier_size = frontier_size
+        self.best_f = best_f
+        self.depth = depth
+        self.nodes_per_sec = nodes_per_sec
+        self.elapsed = elapsed
+        self.vehicles = vehicles
+
+    def __repr__(self) -> str:
+        return (f"SearchProgress(explored={self.explored}, frontier={self.frontier_size}, "
+                f"f={self.best_f}, {self.nodes_per_sec:.0f} nœuds/s)")
+
+
+class BackgroundSolver:
+    """
+    Exécute un solveur (bfs, astar...) dans un thread et publie des instantanés
+    de progression dans une file bornée, consommée par la boucle pygame.
+
+    Le solveur doit accepter les arguments on_progress et progress_every.
+    La file ne bloque jamais la recherche : si l'interface ne suit pas,
+    l'instantané le plus ancien est remplacé.
+    """
+    def __init__(self,
+                 solver: Callable[..., Tuple[Optional[Node], int, float]],
+                 puzzle: RushHourPuzzle,
+                 progress_every: int = 256,
+                 include_state: bool = True,
+                 max_snapshots: int = 8):
+        self.solver = solver
+        self.puzzle = puzzle
+        self.progress_every = progress_every
+        self.include_state = include_state
+        self.snapshots: "queue.Queue[SearchProgress]" = queue.Queue(maxsize=max_snapshots)
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self.result: Optional[Tuple[Optional[Node], int, float]] = None
+        self.error: Optional[BaseException] = None
+        self.callback_time = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._start_time = 0.0
+
+    def start(self) -> 'BackgroundSolver':
+        self._start_time = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_done(self) -> bool:
+        return self.done_event.is_set()
+
+    def join(self, timeout: Optional[float] = None) -> Optional[Tuple[Optional[Node], int, float]]:
+        self._thread.join(timeout)
+        return self.result
+
+    def overhead(self) -> float:
+        """
+        Fraction du temps de recherche passée dans le callback de progression. N'inclut
+        pas l'attente du GIL pendant le rendu : voir measure_overhead pour le surcoût réel.
+        """
+        if not self.result or self.result[2] <= 0:
+            return 0.0
+        return self.callback_time / self.result[2]
+
+    def poll(self) -> Optional[SearchProgress]:
+        """Retourne le dernier instantané disponible (ou None), sans bloquer."""
+        latest = None
+        while True:
+            try:
+                latest = self.snapshots.get_nowait()
+            except queue.Empty:
+                return latest
+
+    def _on_progress(self, explored: int, frontier_size: int, node: Node):
+        t0 = time.perf_counter()
+        if self.cancel_event.is_set():
+            raise SearchCancelled()
+        elapsed = t0 - self._start_time
+        vehicles = None
+        if self.include_state:
+            vehicles = [(v.id, v.x, v.y) for v in node.state.vehicles]
+        snapshot = SearchProgress(
+            explored=explored,
+            frontier_size=frontier_size,
+            best_f=node.f if node.f else node.g,
+            depth=node.g,
+            nodes_per_sec=explored / elapsed if elapsed > 0 else 0.0,
+            elapsed=elapsed,
+            vehicles=vehicles,
+        )
+        try:
+            self.snapshots.put_nowait(snapshot)
+        except queue.Full:
+            try:
+                self.snapshots.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.snapshots.put_nowait(snapshot)
+            except queue.Full:
+                pass
+        self.callback_time += time.perf_counter() - t0
+
+    def _run(self):
+        try:
+            self.result = self.solver(self.puzzle,
+                                      on_progress=self._on_progress,
+                                      progress_every=self.progress_every)
+        except SearchCancelled:
+            self.result = None
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done_event.set()
+
+
+def _poll_until_done(background_solver: BackgroundSolver, fps: int = 60):
+    """Consommateur minimal : lit la file fps fois par seconde jusqu'à la fin de la recherche."""
+    while not background_solver.is_done():
+        background_solver.poll()
+        time.sleep(1.0 / fps)
+
+
+def measure_overhead(solver: Callable[..., Tuple[Optional[Node], int, float]],
+                     puzzle: RushHourPuzzle,
+                     consumer: Optional[Callable[[BackgroundSolver], object]] = None,
+                     progress_every: int = 256,
+                     repeat: int = 3) -> Tuple[float, float]:
+    """
+    Surcoût réel du suivi, en temps mur : meilleur temps de repeat recherches sans
+    callback contre meilleur temps de repeat recherches dans un BackgroundSolver lu
+    par consumer (par défaut un sondage de la file à 60 Hz ; interface.animate_search
+    pour mesurer la contention du GIL avec le rendu pygame).
+    Retourne : (secondes sans suivi, secondes avec suivi)
+    """
+    consumer = consumer or _poll_until_done
+    plain = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solver(puzzle)
+        plain.append(time.perf_counter() - start)
+    observed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        background_solver = BackgroundSolver(solver, puzzle, progress_every).start()
+        consumer(background_solver)
+        background_solver.join()
+        observed.append(time.perf_counter() - start)
+    return min(plain), min(observed)
+
+
+if __name__ == "__main__":
+    import argparse
+    from puzzle_corpus import iter_named_puzzles
+    from solver import SolveOptions, solve
+
+    parser = argparse.ArgumentParser(description="Surcoût du suivi de progression en temps mur (avec et sans observateur).")
+    parser.add_argument("puzzle", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    parser.add_argument("-a", "--algo", default="astar2", help="Algorithme du catalogue (défaut : astar2)")
+    parser.add_argument("--progress-every", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--animate", action="store_true",
+                        help="Observe la recherche avec la fenêtre pygame (interface.animate_search)")
+    args = parser.parse_args()
+
+    def search(game: RushHourPuzzle, **progress):
+        return solve(game, args.algo, SolveOptions(**progress))
+
+    for name, game in iter_named_puzzles(args.puzzle):
+        game.setBoard()
+        consumer = None
+        if args.animate:
+            from interface import animate_search
+            consumer = lambda background_solver, game=game: animate_search(game, background_solver, args.algo)
+        plain, observed = measure_overhead(search, game, consumer, args.progress_every, args.repeat)
+        print(f"{name} : {plain:.3f}s sans suivi, {observed:.3f}s avec suivi "
+              f"({(observed - plain) / plain * 100:+.1f}%)")
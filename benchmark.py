@@ -0,0 +1,146 @@
+#benchmark.py
+"""
+Banc d'essai : compromis longueur de solution / temps de résolution.
+
+Chaque configuration (algorithme du catalogue et ses options, ex. beam3 avec
+un faisceau de 20) est lancée sur chaque puzzle. Pour chaque puzzle, la
+longueur de référence est la plus courte solution trouvée par l'ensemble des
+configurations (l'optimum si bfs fait partie du banc). La courbe de compromis
+d'une configuration est le couple (temps moyen, longueur moyenne / référence) ;
+les configurations qu'aucune autre ne bat sur les deux axes forment le front
+de Pareto, marqué d'une étoile.
+
+    python benchmark.py data --beam-widths 1,5,20,100,500 --csv courbes.csv
+    python benchmark.py --random 16x16:60:10 --count 5 --exact "" --time-budget 30
+"""
+import csv
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rush_hour_puzzle import RushHourPuzzle
+from solver import SolveOptions, algorithm_name, solve
+
+# (libellé, algorithme du catalogue, options propres au moteur)
+Config = Tuple[str, str, Dict[str, Any]]
+
+
+def tradeoff_configs(exact: Sequence[str] = ("bfs", "astar2"),
+                     heuristics: Sequence[str] = ("h2", "h3"),
+                     beam_widths: Sequence[int] = (1, 5, 20, 100, 500)) -> List[Config]:
+    """Configurations exactes, puis greedy et beam (une par largeur) pour chaque heuristique."""
+    configs: List[Config] = [(name, name, {}) for name in exact]
+    for h in heuristics:
+        greedy = algorithm_name("greedy", h)
+        configs.append((greedy, greedy, {}))
+        beam = algorithm_name("beam", h)
+        for width in beam_widths:
+            configs.append((f"{beam}/{width}", beam, {"beam_width": width}))
+    return configs
+
+
+def run_benchmark(puzzles: Iterable[Tuple[str, RushHourPuzzle]], configs: Sequence[Config],
+                  time_budget: Optional[float] = None, verbose: bool = True) -> List[Dict[str, Any]]:
+    """Une ligne par (puzzle, configuration) : solved, moves, time, expanded."""
+    rows = []
+    for name, puzzle in puzzles:
+        for label, algorithm, extra in configs:
+            result = solve(puzzle, algorithm, SolveOptions(time_budget=time_budget, **extra))
+            row = {"puzzle": name, "config": label, "algorithm": algorithm,
+                   "beam_width": extra.get("beam_width"), "solved": result.solved, "moves": result.moves,
+                   "time": round(result.time, 6), "expanded": result.expanded}
+            rows.append(row)
+            if verbose:
+                moves = result.moves if result.solved else "-"
+                print(f"{name:<24} {label:<14} {moves:>6} coups {result.time:9.3f}s {result.expanded:>9} nœuds")
+    return rows
+
+
+def tradeoff_curves(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Par configuration : temps moyen, rapport moyen longueur / référence (puzzles résolus),
+    nombre de puzzles résolus et appartenance au front de Pareto ; triées par temps.
+    """
+    best: Dict[str, int] = {}
+    for row in rows:
+        if row["solved"]:
+            best[row["puzzle"]] = min(best.get(row["puzzle"], row["moves"]), row["moves"])
+    curves: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        c = curves.setdefault(row["config"], {"config": row["config"], "runs": 0, "solved": 0,
+                                              "time": 0.0, "ratio": 0.0})
+        c["runs"] += 1
+        c["time"] += row["time"]
+        if row["solved"]:
+            c["solved"] += 1
+            c["ratio"] += row["moves"] / best[row["puzzle"]] if best[row["puzzle"]] else 1.0
+    result = []
+    for c in curves.values():
+        c["time"] /= c["runs"]
+        c["ratio"] = c["ratio"] / c["solved"] if c["solved"] else None
+        result.append(c)
+    # Front de Pareto parmi les configurations qui résolvent autant de puzzles que la meilleure
+    most = max((c["solved"] for c in result), default=0)
+    complete = [c for c in result if c["solved"] == most and c["ratio"] is not None]
+    for c in result:
+        c["pareto"] = c in complete and not any(
+            o is not c and o["time"] <= c["time"] and o["ratio"] <= c["ratio"]
+            and (o["time"] < c["time"] or o["ratio"] < c["ratio"]) for o in complete)
+    result.sort(key=lambda c: c["time"])
+    return result
+
+
+def random_puzzles(spec: str, count: int, seed: int = 0) -> List[Tuple[str, RushHourPuzzle]]:
+    """Plateaux aléatoires (non garantis solubles) décrits par LxH:véhicules[:murs]."""
+    from puzzle_generator import random_layout
+    size, *rest = spec.split(":")
+    width, height = (int(n) for n in size.lower().split("x"))
+    n_vehicles = int(rest[0]) if rest else 12
+    n_walls = int(rest[1]) if len(rest) > 1 else 0
+    rng = random.Random(seed)
+    puzzles = []
+    for i in range(count):
+        layout, start = random_layout(rng, width, height, n_vehicles, n_walls)
+        puzzle = layout.to_puzzle(start)
+        puzzle.setBoard()
+        puzzles.append((f"random-{spec}-{i}", puzzle))
+    return puzzles
+
+
+if __name__ == "__main__":
+    import argparse
+    from puzzle_corpus import iter_named_puzzles
+
+    parser = argparse.ArgumentParser(description="Courbes longueur de solution / temps des solveurs.")
+    parser.add_argument("puzzle", nargs="?", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    parser.add_argument("--random", default=None, help="Plateaux aléatoires LxH:véhicules[:murs] (ex. 16x16:60:10)")
+    parser.add_argument("--count", type=int, default=5, help="Nombre de plateaux aléatoires")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--exact", default="bfs,astar2",
+                        help="Algorithmes de référence, séparés par des virgules (\"\" pour aucun)")
+    parser.add_argument("--heuristics", default="h2,h3")
+    parser.add_argument("--beam-widths", default="1,5,20,100,500")
+    parser.add_argument("--time-budget", type=float, default=None, help="Secondes par configuration et par puzzle")
+    parser.add_argument("--csv", default=None, help="Écrit toutes les mesures dans ce fichier CSV")
+    args = parser.parse_args()
+    if args.puzzle is None and args.random is None:
+        parser.error("indiquez des puzzles ou --random")
+
+    split = lambda text: [item.strip() for item in text.split(",") if item.strip()]
+    configs = tradeoff_configs(split(args.exact), split(args.heuristics),
+                               [int(w) for w in split(args.beam_widths)])
+    puzzles = random_puzzles(args.random, args.count, args.seed) if args.random else iter_named_puzzles(args.puzzle)
+    start = time.perf_counter()
+    rows = run_benchmark(puzzles, configs, args.time_budget)
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    print(f"\n{'configuration':<14} {'temps moyen':>12} {'longueur/réf.':>14} {'résolus':>8}")
+    for c in tradeoff_curves(rows):
+        ratio = f"{c['ratio']:.3f}" if c["ratio"] is not None else "-"
+        print(f"{c['config']:<14} {c['time']:>11.3f}s {ratio:>14} {c['solved']:>4}/{c['runs']:<3}"
+              f"{' *' if c['pareto'] else ''}")
+    print(f"\nTotal : {time.perf_counter() - start:.1f}s (* : front de Pareto)")
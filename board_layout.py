@@ -0,0 +1,149 @@
+#board_layout.py
+"""
+Disposition figée d'un plateau (dimensions, murs, véhicules sur leurs voies)
+et représentation compacte des états : un tuple de positions le long des voies
+et un masque d'entiers pour l'occupation des cases.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from rush_hour_puzzle import Action, RushHourPuzzle, Vehicle
+
+TARGET_ID = 'X'
+
+# Spécification d'un véhicule dans une disposition : (id, orientation, longueur, coordonnée fixe)
+VehicleSpec = Tuple[str, str, int, int]
+# Position de chaque véhicule le long de sa voie, dans l'ordre de la disposition
+State = Tuple[int, ...]
+
+
+class Layout:
+    """
+    Disposition figée d'un plateau : dimensions, murs et véhicules sur leurs voies.
+    Les états sont des tuples de positions ; l'occupation est un masque d'entiers.
+    """
+    def __init__(self, width: int, height: int, walls: List[Tuple[int, int]], specs: List[VehicleSpec],
+                 exit_side: str = 'E', exit_index: Optional[int] = None, target_id: str = TARGET_ID):
+        self.width = width
+        self.height = height
+        self.walls = sorted(walls)
+        self.specs = specs
+        self.exit_side = exit_side
+        horizontal_exit = exit_side in ('E', 'W')
+        if exit_index is None:
+            exit_index = (height // 2) - 1 if horizontal_exit else (width // 2) - 1
+        self.exit_index = exit_index
+        self.target_id = target_id
+        self.wall_mask = 0
+        for x, y in self.walls:
+            self.wall_mask |= 1 << (y * width + x)
+        # masks[i][p] : cases occupées par le véhicule i à la position p
+        self.masks: List[List[int]] = []
+        for _, orientation, length, fixed in specs:
+            lane = width if orientation == 'H' else height
+            row = []
+            for p in range(lane - length + 1):
+                m = 0
+                for k in range(length):
+                    x, y = (p + k, fixed) if orientation == 'H' else (fixed, p + k)
+                    m |= 1 << (y * width + x)
+                row.append(m)
+            self.masks.append(row)
+        self.target_index = next((i for i, s in enumerate(specs) if s[0] == target_id), None)
+        self.goal_position: Optional[int] = None
+        if self.target_index is not None:
+            _, orientation, length, fixed = specs[self.target_index]
+            if orientation == ('H' if horizontal_exit else 'V') and fixed == exit_index:
+                lane = width if horizontal_exit else height
+                self.goal_position = lane - length if exit_side in ('E', 'S') else 0
+
+    def signature(self) -> Tuple:
+        return (self.width, self.height, tuple(self.walls), tuple(self.specs),
+                self.exit_side, self.exit_index, self.target_id)
+
+    def occupancy(self, state: State) -> int:
+        m = self.wall_mask
+        for i, p in enumerate(state):
+            m |= self.masks[i][p]
+        return m
+
+    def is_goal(self, state: State) -> bool:
+        return self.goal_position is not None and state[self.target_index] == self.goal_position
+
+    def neighbors(self, state: State):
+        occupied = self.occupancy(state)
+        for i, p in enumerate(state):
+            row = self.masks[i]
+            free = occupied & ~row[p]
+            q = p - 1
+            while q >= 0 and not (row[q] & free):
+                yield state[:i] + (q,) + state[i + 1:]
+                q -= 1
+            q = p + 1
+            while q < len(row) and not (row[q] & free):
+                yield state[:i] + (q,) + state[i + 1:]
+                q += 1
+
+    def component(self, start: State, max_states: Optional[int] = None) -> Optional[List[State]]:
+        """États atteignables depuis start ; None si la composante dépasse max_states."""
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            s = queue.popleft()
+            for n in self.neighbors(s):
+                if n not in seen:
+                    seen.add(n)
+                    queue.append(n)
+            if max_states is not None and len(seen) > max_states:
+                return None
+        return list(seen)
+
+    def goal_distances(self, states: List[State]) -> Dict[State, int]:
+        """BFS multi-sources depuis les états but de la composante."""
+        goals = [s for s in states if self.is_goal(s)]
+        dist = {s: 0 for s in goals}
+        queue = deque(goals)
+        while queue:
+            s = queue.popleft()
+            d = dist[s] + 1
+            for n in self.neighbors(s):
+                if n not in dist:
+                    dist[n] = d
+                    queue.append(n)
+        return dist
+
+    def to_puzzle(self, state: State) -> RushHourPuzzle:
+        puzzle = RushHourPuzzle(self.height, self.width)
+        puzzle.walls = list(self.walls)
+        puzzle.exit_side = self.exit_side
+        puzzle.exit_index = self.exit_index
+        puzzle.target_id = self.target_id
+        for (vid, orientation, length, fixed), p in zip(self.specs, state):
+            x, y = (p, fixed) if orientation == 'H' else (fixed, p)
+            puzzle.vehicles.append(Vehicle(vid, x, y, orientation, length))
+        return puzzle
+
+    @classmethod
+    def from_puzzle(cls, puzzle: RushHourPuzzle) -> Tuple['Layout', State]:
+        """Disposition et état initial d'un RushHourPuzzle (dans l'ordre de ses véhicules)."""
+        specs = []
+        state = []
+        for v in puzzle.vehicles:
+            if v.orientation == 'H':
+                specs.append((v.id, 'H', v.length, v.y))
+                state.append(v.x)
+            else:
+                specs.append((v.id, 'V', v.length, v.x))
+                state.append(v.y)
+        geo = puzzle.geometry()
+        layout = cls(puzzle.board_width, puzzle.board_height, list(puzzle.walls), specs,
+                     geo.exit_side, geo.exit_index, geo.target_id)
+        return layout, tuple(state)
+
+    def action_between(self, before: State, after: State) -> Action:
+        """Action (id, déplacement) qui mène de before à after (états voisins)."""
+        for i, (p, q) in enumerate(zip(before, after)):
+            if p != q:
+                return self.specs[i][0], q - p
+        raise ValueError("Les deux états sont identiques.")
+
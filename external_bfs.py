@@ -0,0 +1,270 @@
+#external_bfs.py
+"""
+BFS en mémoire externe avec détection différée des doublons.
+
+Chaque couche de la recherche est écrite sur disque sous forme de clés d'état
+compactes (une position par octet, une clé = un enregistrement de taille fixe),
+triées et sans doublons. La couche k+1 est construite ainsi :
+    1. les voisins de la couche k sont générés par paquets de memory_limit
+       états, chaque paquet est trié puis écrit dans un fichier temporaire ;
+    2. les paquets sont fusionnés (heapq.merge) en éliminant les doublons ;
+    3. les états déjà présents dans les couches k et k-1 sont retirés par
+       fusion des fichiers triés. Les mouvements étant réversibles, ces deux
+       couches suffisent à éliminer tous les états déjà visités.
+Le chemin solution est reconstruit à la fin en remontant les couches : pour
+chaque état, un de ses voisins est cherché par dichotomie dans la couche précédente.
+La mémoire utilisée est bornée par memory_limit, indépendamment de la taille de l'espace d'états.
+"""
+import heapq
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from board_layout import Layout, State
+from node import Node
+from pruning import is_unsolvable
+from rush_hour_puzzle import RushHourPuzzle
+from solver import SolveOptions, SolveResult, register_solver
+
+READ_CHUNK = 1 << 16
+
+
+def pack_state(state: State) -> bytes:
+    return bytes(state)
+
+
+def unpack_state(key: bytes) -> State:
+    return tuple(key)
+
+
+class LayerFile:
+    """Fichier de couche : clés triées de taille fixe."""
+    def __init__(self, path: str, record_size: int):
+        self.path = path
+        self.record_size = record_size
+
+    def __len__(self) -> int:
+        return os.path.getsize(self.path) // self.record_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        size = self.record_size
+        chunk = (READ_CHUNK // size) * size or size
+        with open(self.path, 'rb') as f:
+            while True:
+                data = f.read(chunk)
+                if not data:
+                    return
+                for i in range(0, len(data), size):
+                    yield data[i:i + size]
+
+    def contains_any(self, keys: Iterable[bytes]) -> Optional[bytes]:
+        """Retourne la première clé de keys présente dans la couche (recherche dichotomique)."""
+        if len(self) == 0:
+            return None
+        size = self.record_size
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            n = len(data) // size
+            for key in keys:
+                lo, hi = 0, n
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    record = data[mid * size:(mid + 1) * size]
+                    if record < key:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                if lo < n and data[lo * size:(lo + 1) * size] == key:
+                    return key
+        return None
+
+
+def write_sorted(path: str, keys: Iterable[bytes]) -> int:
+    count = 0
+    with open(path, 'wb') as f:
+        buffer = []
+        for key in keys:
+            buffer.append(key)
+            if len(buffer) >= 4096:
+                f.write(b''.join(buffer))
+                count += len(buffer)
+                buffer = []
+        f.write(b''.join(buffer))
+        count += len(buffer)
+    return count
+
+
+def unique(sorted_keys: Iterable[bytes]) -> Iterator[bytes]:
+    previous = None
+    for key in sorted_keys:
+        if key != previous:
+            yield key
+            previous = key
+
+
+def difference(sorted_keys: Iterable[bytes], *excluded: Iterable[bytes]) -> Iterator[bytes]:
+    """Clés de sorted_keys absentes de toutes les séquences triées excluded (fusion en flux)."""
+    excluded_iter = iter(unique(heapq.merge(*excluded)))
+    current = next(excluded_iter, None)
+    for key in sorted_keys:
+        while current is not None and current < key:
+            current = next(excluded_iter, None)
+        if current != key:
+            yield key
+
+
+class ExternalBFS:
+    """
+    Moteur de BFS couche par couche sur disque pour une disposition donnée.
+    Les fichiers de couche sont placés dans workdir (répertoire temporaire par défaut).
+    """
+    def __init__(self,
+                 puzzle: RushHourPuzzle,
+                 memory_limit: int = 1_000_000,
+                 workdir: Optional[str] = None,
+                 keep_files: bool = False):
+        self.puzzle = puzzle
+        self.layout, self.start = Layout.from_puzzle(puzzle)
+        if any(p > 255 for p in self.start) or max(puzzle.board_width, puzzle.board_height) > 256:
+            raise ValueError("Plateau trop grand pour des clés d'un octet par véhicule.")
+        self.record_size = len(self.start)
+        self.memory_limit = memory_limit
+        self.keep_files = keep_files
+        self.workdir = workdir or tempfile.mkdtemp(prefix="rush_hour_bfs_")
+        os.makedirs(self.workdir, exist_ok=True)
+        self.layers: List[LayerFile] = []
+        self.layer_sizes: List[int] = []
+
+    def _layer_path(self, depth: int) -> str:
+        return os.path.join(self.workdir, f"layer-{depth:05d}.bin")
+
+    def _expand(self, depth: int) -> Tuple[LayerFile, Optional[bytes]]:
+        """Construit la couche depth + 1 ; retourne aussi une clé but rencontrée, s'il y en a une."""
+        layout = self.layout
+        runs: List[LayerFile] = []
+        buffer = set()
+        goal_key = None
+
+        def flush():
+            path = os.path.join(self.workdir, f"run-{depth:05d}-{len(runs):05d}.bin")
+            write_sorted(path, sorted(buffer))
+            runs.append(LayerFile(path, self.record_size))
+            buffer.clear()
+
+        for key in self.layers[depth]:
+            for neighbor in layout.neighbors(unpack_state(key)):
+                packed = pack_state(neighbor)
+                buffer.add(packed)
+                if goal_key is None and layout.is_goal(neighbor):
+                    goal_key = packed
+            if len(buffer) >= self.memory_limit:
+                flush()
+        if buffer or not runs:
+            flush()
+
+        excluded = [self.layers[depth]]
+        if depth > 0:
+            excluded.append(self.layers[depth - 1])
+        new_layer = LayerFile(self._layer_path(depth + 1), self.record_size)
+        merged = unique(heapq.merge(*runs))
+        size = write_sorted(new_layer.path, difference(merged, *excluded))
+        for run in runs:
+            os.remove(run.path)
+
+        if goal_key is not None and new_layer.contains_any([goal_key]) is None:
+            # Le but rencontré appartient à une couche déjà visitée (impossible si le départ n'est pas but)
+            goal_key = None
+        self.layers.append(new_layer)
+        self.layer_sizes.append(size)
+        return new_layer, goal_key
+
+    def run(self, stop_at_goal: bool = True) -> Optional[List[State]]:
+        """
+        Exécute le BFS. Avec stop_at_goal, s'arrête au premier but et retourne le chemin
+        d'états ; sinon énumère toute la composante (voir layer_sizes) et retourne None.
+        """
+        first = LayerFile(self._layer_path(0), self.record_size)
+        write_sorted(first.path, [pack_state(self.start)])
+        self.layers = [first]
+        self.layer_sizes = [1]
+        if stop_at_goal and self.layout.is_goal(self.start):
+            return [self.start]
+
+        depth = 0
+        while self.layer_sizes[-1] > 0:
+            _, goal_key = self._expand(depth)
+            depth += 1
+            if stop_at_goal and goal_key is not None:
+                return self._rebuild_path(goal_key, depth)
+        self.layers.pop()
+        self.layer_sizes.pop()
+        return None
+
+    def _rebuild_path(self, goal_key: bytes, depth: int) -> List[State]:
+        path = [unpack_state(goal_key)]
+        for d in range(depth - 1, -1, -1):
+            candidates = [pack_state(n) for n in self.layout.neighbors(path[-1])]
+            found = self.layers[d].contains_any(candidates)
+            if found is None:
+                raise RuntimeError(f"Couche {d} incohérente : prédécesseur introuvable.")
+            path.append(unpack_state(found))
+        return path[::-1]
+
+    def close(self):
+        if not self.keep_files:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self) -> 'ExternalBFS':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def path_to_node(puzzle: RushHourPuzzle, layout: Layout, path: List[State]) -> Node:
+    """Rejoue un chemin d'états sous forme de chaîne de Node (compatible getSolution/animate_solution)."""
+    node = Node(puzzle)
+    for before, after in zip(path, path[1:]):
+        action = layout.action_between(before, after)
+        index = node.state.get_vehicle_index(action[0])
+        node = Node(node.state.create_new_state(index, action[1]), node, action, node.g + 1)
+    return node
+
+
+def external_bfs(initial: RushHourPuzzle,
+                 memory_limit: int = 1_000_000,
+                 workdir: Optional[str] = None) -> Tuple[Optional[Node], int, float]:
+    """
+    BFS sur disque : même résultat que bfs (nombre minimal de mouvements),
+    avec une mémoire bornée par memory_limit états.
+    Retourne : (nœud solution, nombre d'états générés, temps d'exécution en secondes)
+    """
+    start_time = time.time()
+    if is_unsolvable(initial):
+        return None, 0, time.time() - start_time
+    with ExternalBFS(initial, memory_limit, workdir) as engine:
+        path = engine.run()
+        explored_count = sum(engine.layer_sizes)
+        if path is None:
+            return None, explored_count, time.time() - start_time
+        node = path_to_node(initial, engine.layout, path)
+    return node, explored_count, time.time() - start_time
+
+
+@register_solver("bfs-disk", "BFS (mémoire externe)", optimal=True)
+def _solve_external_bfs(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    memory_limit = options.extra.get("memory_limit", 1_000_000)
+    node, explored, elapsed = external_bfs(puzzle, memory_limit, options.extra.get("workdir"))
+    return SolveResult("bfs-disk", node, explored, expanded=explored, generated=explored,
+                       stored=memory_limit, timings={"search": elapsed})
+
+
+def enumerate_layers(puzzle: RushHourPuzzle,
+                     memory_limit: int = 1_000_000,
+                     workdir: Optional[str] = None) -> List[int]:
+    """Énumère toute la composante du puzzle ; retourne la taille de chaque couche BFS."""
+    with ExternalBFS(puzzle, memory_limit, workdir) as engine:
+        engine.run(stop_at_goal=False)
+        return list(engine.layer_sizes)
@@ -0,0 +1,128 @@
+#hint_service.py
+"""
+Service d'indices : "meilleur prochain coup" depuis un état proche d'une
+solution déjà calculée, sans relancer astar depuis zéro.
+
+Deux sources de connaissance, combinables :
+    - le chemin solution précédent : chaque état du chemin connaît sa distance
+      restante (borne supérieure) ;
+    - une carte de distances inverse (BFS multi-sources depuis les états but de
+      la composante), exacte, construite une fois par disposition.
+Pour un état connu, l'indice est une simple consultation des voisins. Sinon,
+une recherche locale bornée (BFS de quelques milliers d'états au plus, arrêté à
+la première couche qui touche un état connu) rejoint l'état connu le plus
+prometteur et retourne le premier coup du trajet.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from board_layout import Layout, State
+from rush_hour_puzzle import Action, RushHourPuzzle
+
+
+class HintService:
+    def __init__(self, puzzle: RushHourPuzzle):
+        self.layout, self.start = Layout.from_puzzle(puzzle)
+        self._index = {spec[0]: i for i, spec in enumerate(self.layout.specs)}
+        # distance au but connue (exacte ou borne supérieure) par état
+        self.distances: Dict[State, int] = {}
+        self.exact = False
+
+    @classmethod
+    def from_solution(cls, puzzle: RushHourPuzzle, solution: List[Action]) -> 'HintService':
+        """Initialise les distances le long d'une solution (ex. celle jouée par animate_solution)."""
+        service = cls(puzzle)
+        service.add_solution(solution)
+        return service
+
+    @classmethod
+    def with_distance_map(cls, puzzle: RushHourPuzzle, max_states: Optional[int] = 2_000_000) -> 'HintService':
+        """Initialise une carte de distances exacte sur toute la composante du puzzle."""
+        service = cls(puzzle)
+        service.build_distance_map(max_states)
+        return service
+
+    def state_of(self, puzzle: RushHourPuzzle) -> State:
+        """Position de chaque véhicule de la disposition, quel que soit l'ordre dans puzzle."""
+        state = [0] * len(self.layout.specs)
+        for v in puzzle.vehicles:
+            i = self._index[v.id]
+            state[i] = v.x if self.layout.specs[i][1] == 'H' else v.y
+        return tuple(state)
+
+    def apply(self, state: State, action: Action) -> State:
+        i = self._index[action[0]]
+        return state[:i] + (state[i] + action[1],) + state[i + 1:]
+
+    def add_solution(self, solution: List[Action], start: Optional[State] = None):
+        state = self.start if start is None else start
+        path = [state]
+        for action in solution:
+            state = self.apply(state, action)
+            path.append(state)
+        total = len(path) - 1
+        for k, s in enumerate(path):
+            known = self.distances.get(s)
+            if known is None or total - k < known:
+                self.distances[s] = total - k
+
+    def build_distance_map(self, max_states: Optional[int] = 2_000_000):
+        states = self.layout.component(self.start, max_states)
+        if states is None:
+            raise MemoryError(f"Composante de plus de {max_states} états : utilisez from_solution.")
+        self.distances = self.layout.goal_distances(states)
+        self.exact = True
+
+    def distance(self, puzzle: RushHourPuzzle) -> Optional[int]:
+        return self.distances.get(self.state_of(puzzle))
+
+    def hint(self, puzzle: RushHourPuzzle, max_nodes: int = 5000) -> Optional[Action]:
+        """Meilleur prochain coup depuis puzzle, ou None (déjà résolu ou aucun trajet trouvé)."""
+        return self.hint_for_state(self.state_of(puzzle), max_nodes)
+
+    def hint_for_state(self, state: State, max_nodes: int = 5000) -> Optional[Action]:
+        layout = self.layout
+        if layout.is_goal(state):
+            return None
+        d = self.distances.get(state)
+        if d is not None:
+            best = None
+            for n in layout.neighbors(state):
+                dn = self.distances.get(n)
+                if dn is not None and dn < d and (best is None or dn < best[0]):
+                    best = (dn, n)
+            if best is not None:
+                return layout.action_between(state, best[1])
+        return self._local_search(state, max_nodes)
+
+    def _local_search(self, state: State, max_nodes: int) -> Optional[Action]:
+        """
+        BFS borné : s'arrête à la première couche qui atteint un but ou un état de
+        distance connue, et rejoint celui de cette couche qui minimise profondeur +
+        distance restante. Un écart d'un coup par rapport au chemin connu ne coûte
+        donc qu'une expansion.
+        """
+        layout = self.layout
+        first_move: Dict[State, Tuple[int, Optional[State]]] = {state: (0, None)}
+        queue = deque([state])
+        best: Optional[Tuple[int, State]] = None
+        last_layer: Optional[int] = None
+        while queue and len(first_move) < max_nodes:
+            s = queue.popleft()
+            depth, first = first_move[s]
+            if last_layer is not None and depth >= last_layer:
+                break
+            for n in layout.neighbors(s):
+                if n in first_move:
+                    continue
+                first_move[n] = (depth + 1, first if first is not None else n)
+                remaining = 0 if layout.is_goal(n) else self.distances.get(n)
+                if remaining is not None:
+                    last_layer = depth + 1
+                    cost = depth + 1 + remaining
+                    if best is None or cost < best[0]:
+                        best = (cost, first_move[n][1])
+                queue.append(n)
+        if best is None:
+            return None
+        return layout.action_between(state, best[1])
@@ -6,6 +6,9 @@ import math
 import random
 from typing import Optional, List, Tuple
 
+from render_governor import QualityGovernor
+from render_profiler import RenderProfiler
+
 # ============================================================================
 # CONFIGURATION ET CONSTANTES - Optimisé pour mode horizontal avec rose clair
 # ============================================================================
@@ -14,6 +17,7 @@ CELL_SIZE = 70
 MARGIN = 50
 TITLE_HEIGHT = 100
 FPS = 60
+SEARCH_IDLE_REDRAW = 0.5  # secondes entre deux rendus de la recherche sans nouvel instantané
 
 BG_COLOR = (35, 20, 28)
 BG_GRADIENT_TOP = (50, 25, 45)
@@ -49,6 +53,7 @@ CAR_COLORS = [
 
 MAX_PARTICLES = 150
 MAX_PARTICLES_PER_VEHICLE = 20
+SPRITE_PADDING = 16  # Roues et contours dépassent du rectangle du véhicule
 
 # ============================================================================
 # CLASSE PARTICLE
@@ -87,10 +92,11 @@ class Particle:
 # ============================================================================
 
 class AnimatedVehicle:
-    """Véhicule avec animation de position et rotation"""
-    def __init__(self, vehicle, idx):
+    """Véhicule avec animation de position et rotation (is_target : voiture cible du puzzle)"""
+    def __init__(self, vehicle, idx, is_target=False):
         self.vehicle = vehicle
         self.idx = idx
+        self.is_target = is_target
         self.target_x = vehicle.x
         self.target_y = vehicle.y
         self.current_x = float(vehicle.x)
@@ -124,8 +130,10 @@ class AnimatedVehicle:
             self.wheel_rotation += dt * 360 * 2
             self.wheel_rotation %= 360
     
-    def sync_position(self):
-        """Synchronise avec la position du véhicule"""
+    def sync_position(self, vehicle=None):
+        """Synchronise avec la position du véhicule (vehicle : nouvel objet après move_vehicle)"""
+        if vehicle is not None:
+            self.vehicle = vehicle
         self.target_x = self.vehicle.x
         self.target_y = self.vehicle.y
     
@@ -181,10 +189,24 @@ class Button:
 # FONCTIONS UTILITAIRES
 # ============================================================================
 
-def get_car_color(idx):
-    """Retourne la couleur du véhicule selon son index"""
+def get_car_color(idx, target_index=0):
+    """Retourne la couleur du véhicule selon son index ; le rouge de CAR_COLORS[0] revient à la cible"""
+    if target_index is not None and idx == target_index:
+        idx = 0
+    elif target_index is not None and idx == 0:
+        idx = target_index
     return CAR_COLORS[idx % len(CAR_COLORS)]
 
+_FONTS = {}
+
+def get_font(name, size, bold=False):
+    """Police SysFont mise en cache (la créer à chaque image coûte cher)"""
+    key = (name, size, bold)
+    font = _FONTS.get(key)
+    if font is None:
+        font = _FONTS[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
 def draw_gradient_background(screen):
     """Dessine un fond avec dégradé lisse"""
     width, height = screen.get_size()
@@ -193,8 +215,16 @@ def draw_gradient_background(screen):
         color = tuple(int(BG_GRADIENT_TOP[i] * (1 - ratio) + BG_GRADIENT_BOTTOM[i] * ratio) for i in range(3))
         pygame.draw.line(screen, color, (0, y), (width, y))
 
-def draw_glowing_grid(screen, puzzle, time_offset):
-    """Grille avec effet de lueur animée et murs"""
+def build_background(size, puzzle=None):
+    """Fond précalculé : dégradé, plus la grille à lueur figée si puzzle est donné"""
+    background = pygame.Surface(size)
+    draw_gradient_background(background)
+    if puzzle is not None:
+        draw_glowing_grid(background, puzzle, 0.0, animated=False)
+    return background
+
+def draw_glowing_grid(screen, puzzle, time_offset, animated=True):
+    """Grille avec effet de lueur animée (figée si animated est faux) et murs"""
     for y_row in range(puzzle.board_height):
         for x_col in range(puzzle.board_width):
             rect = pygame.Rect(
@@ -204,7 +234,7 @@ def draw_glowing_grid(screen, puzzle, time_offset):
                 CELL_SIZE
             )
             
-            pulse = math.sin(time_offset * 2 + (x_col + y_row) * 0.3) * 0.3 + 0.7
+            pulse = math.sin(time_offset * 2 + (x_col + y_row) * 0.3) * 0.3 + 0.7 if animated else 0.7
             glow_alpha = int(pulse * 40)
             
             glow_surf = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
@@ -236,14 +266,16 @@ def draw_wheel(screen, x, y, radius, rotation):
         spoke_y = y + (radius - 6) * math.sin(angle)
         pygame.draw.line(screen, (100, 100, 100), (x, y), (spoke_x, spoke_y), 2)
 
-def draw_realistic_car(screen, rect, color, orientation, is_target_car, time_offset, vehicle_length, wheel_rotation=0):
-    """Dessine une voiture réaliste avec ombres et effets"""
-    shadow = rect.copy()
-    shadow.x += 6
-    shadow.y += 6
-    shadow_surf = pygame.Surface((shadow.width, shadow.height), pygame.SRCALPHA)
-    pygame.draw.rect(shadow_surf, (0, 0, 0, 100), shadow_surf.get_rect(), border_radius=20)
-    screen.blit(shadow_surf, shadow.topleft)
+def draw_realistic_car(screen, rect, color, orientation, is_target_car, time_offset, vehicle_length, wheel_rotation=0,
+                       effects=True):
+    """Dessine une voiture réaliste avec ombres et effets (ombre et reflet omis si effects est faux)"""
+    if effects:
+        shadow = rect.copy()
+        shadow.x += 6
+        shadow.y += 6
+        shadow_surf = pygame.Surface((shadow.width, shadow.height), pygame.SRCALPHA)
+        pygame.draw.rect(shadow_surf, (0, 0, 0, 100), shadow_surf.get_rect(), border_radius=20)
+        screen.blit(shadow_surf, shadow.topleft)
     
     is_truck = vehicle_length >= 2
     
@@ -252,6 +284,8 @@ def draw_realistic_car(screen, rect, color, orientation, is_target_car, time_off
     else:
         draw_small_car(screen, rect, color, orientation, time_offset, wheel_rotation)
     
+    if not effects:
+        return
     shine_offset = math.sin(time_offset * 2) * 5
     ellipse_rect = pygame.Rect(
         rect.x + rect.width // 4 + shine_offset,
@@ -391,11 +425,35 @@ def draw_truck(screen, rect, color, orientation, time_offset, wheel_rotation=0):
         draw_wheel(screen, rect.right + 2, rect.y + 25, 12, wheel_rotation)
         draw_wheel(screen, rect.right + 2, rect.y + 45, 12, wheel_rotation)
 
-def draw_animated_vehicle(screen, anim_vehicle, time_offset, particles):
-    """Dessine un véhicule avec animations"""
+def draw_vehicle_label(screen, rect, vehicle_id):
+    """Lettre du véhicule avec ombre portée"""
+    font = get_font("Arial", 36, bold=True)
+    text_shadow = font.render(vehicle_id, True, (0, 0, 0))
+    screen.blit(text_shadow, (rect.centerx - 10, rect.centery - 16))
+    
+    text = font.render(vehicle_id, True, (255, 255, 255))
+    screen.blit(text, (rect.centerx - 12, rect.centery - 18))
+
+def render_vehicle_sprite(vehicle, color, is_target, width, height):
+    """Véhicule immobile (sans ombre, reflet ni rotation des roues) rendu une fois sur une surface"""
+    sprite = pygame.Surface((width + 2 * SPRITE_PADDING, height + 2 * SPRITE_PADDING), pygame.SRCALPHA)
+    rect = pygame.Rect(SPRITE_PADDING, SPRITE_PADDING, width, height)
+    draw_realistic_car(sprite, rect, color, vehicle.orientation, is_target, 0.0, vehicle.length,
+                       effects=False)
+    draw_vehicle_label(sprite, rect, vehicle.id)
+    return sprite
+
+def draw_animated_vehicle(screen, anim_vehicle, time_offset, particles, quality=None, sprites=None,
+                          target_index=0):
+    """
+    Dessine un véhicule avec animations. quality (RenderQuality) allège le rendu :
+    moins de particules, sans ombre ni reflet, ou sprite précalculé conservé dans sprites.
+    target_index : index de la voiture cible (geometry().target_index), pour sa couleur.
+    """
     v = anim_vehicle.vehicle
     idx = anim_vehicle.idx
-    color = get_car_color(idx)
+    is_target = anim_vehicle.is_target
+    color = get_car_color(idx, target_index)
 
     x_pos = MARGIN + anim_vehicle.current_x * CELL_SIZE
     y_pos = TITLE_HEIGHT + MARGIN + anim_vehicle.current_y * CELL_SIZE
@@ -407,8 +465,9 @@ def draw_animated_vehicle(screen, anim_vehicle, time_offset, particles):
         width = CELL_SIZE
         height = CELL_SIZE * v.length
     
+    use_sprite = quality is not None and quality.sprites and sprites is not None and anim_vehicle.scale >= 1.0
     scale_factor = anim_vehicle.scale
-    if idx == 0:  
+    if is_target and not use_sprite:
         pulse = math.sin(time_offset * 3) * 0.05 + 1.0
         scale_factor *= pulse
     
@@ -424,16 +483,21 @@ def draw_animated_vehicle(screen, anim_vehicle, time_offset, particles):
         scaled_height
     )
     
-    draw_realistic_car(screen, rect, color, v.orientation, idx == 0, time_offset, v.length, anim_vehicle.wheel_rotation)
-    
-    font = pygame.font.SysFont("Arial", 36, bold=True)
-    text_shadow = font.render(v.id, True, (0, 0, 0))
-    screen.blit(text_shadow, (rect.centerx - 10, rect.centery - 16))
-    
-    text = font.render(v.id, True, (255, 255, 255))
-    screen.blit(text, (rect.centerx - 12, rect.centery - 18))
-    
-    if anim_vehicle.is_moving() and random.random() < 0.3 and anim_vehicle.particle_count < MAX_PARTICLES_PER_VEHICLE and len(particles) < MAX_PARTICLES:
+    if use_sprite:
+        key = (idx, v.id, v.orientation, v.length, scaled_width, scaled_height)
+        sprite = sprites.get(key)
+        if sprite is None:
+            sprite = sprites[key] = render_vehicle_sprite(v, color, is_target, scaled_width, scaled_height)
+        screen.blit(sprite, (rect.x - SPRITE_PADDING, rect.y - SPRITE_PADDING))
+    else:
+        effects = quality is None or quality.effects
+        draw_realistic_car(screen, rect, color, v.orientation, is_target, time_offset, v.length,
+                           anim_vehicle.wheel_rotation, effects)
+        draw_vehicle_label(screen, rect, v.id)
+    
+    max_particles = MAX_PARTICLES if quality is None else quality.max_particles(MAX_PARTICLES)
+    max_per_vehicle = MAX_PARTICLES_PER_VEHICLE if quality is None else quality.max_particles(MAX_PARTICLES_PER_VEHICLE)
+    if anim_vehicle.is_moving() and random.random() < 0.3 and anim_vehicle.particle_count < max_per_vehicle and len(particles) < max_particles:
         particle_color = color
         velocity = (random.uniform(-50, 50), random.uniform(-50, 0))
         particles.append(Particle(rect.centerx, rect.centery, particle_color, velocity))
@@ -464,7 +528,8 @@ def draw_success_message(screen, time_offset, moves_count, elapsed_time, algorit
     
     scale = abs(math.sin(time_offset * 2)) * 0.2 + 1.0
     
-    font_big = pygame.font.SysFont("Bahnschrift", int(72 * scale), bold=True)
+    # Taille entière comprise entre 72 et 86 : au plus 15 polices en cache
+    font_big = get_font("Bahnschrift", int(72 * scale), bold=True)
     text = "🎉 VICTOIRE ! 🎉"
 
     rainbow_offset = int(time_offset * 100) % 360
@@ -476,7 +541,7 @@ def draw_success_message(screen, time_offset, moves_count, elapsed_time, algorit
     text_rect = text_surface.get_rect(center=(width // 2, height // 2 - 60))
     screen.blit(text_surface, text_rect)
     
-    font_stats = pygame.font.SysFont("Segoe UI", 32, bold=True)
+    font_stats = get_font("Segoe UI", 32, bold=True)
     stats_text = f"Résolu en {moves_count} coups et {elapsed_time:.1f}s"
     
     stats_shadow = font_stats.render(stats_text, True, (0, 0, 0))
@@ -486,7 +551,7 @@ def draw_success_message(screen, time_offset, moves_count, elapsed_time, algorit
     stats_rect = stats_surface.get_rect(center=(width // 2, height // 2 + 40))
     screen.blit(stats_surface, stats_rect)
     
-    font_algo = pygame.font.SysFont("Segoe UI", 24, bold=True)
+    font_algo = get_font("Segoe UI", 24, bold=True)
     algo_text = f"Algorithme: {algorithm_name}"
     algo_surface = font_algo.render(algo_text, True, ACCENT_COLOR)
     algo_rect = algo_surface.get_rect(center=(width // 2, height // 2 + 90))
@@ -500,14 +565,14 @@ def draw_failure_message(screen, time_offset):
     pygame.draw.rect(overlay, (0, 0, 0, 180), overlay.get_rect())
     screen.blit(overlay, (0, 0))
     
-    font_big = pygame.font.SysFont("Bahnschrift", 72, bold=True)
+    font_big = get_font("Bahnschrift", 72, bold=True)
     text = "❌ AUCUNE SOLUTION ❌"
     
     text_surface = font_big.render(text, True, (255, 100, 100))
     text_rect = text_surface.get_rect(center=(width // 2, height // 2 - 60))
     screen.blit(text_surface, text_rect)
     
-    font_info = pygame.font.SysFont("Segoe UI", 28)
+    font_info = get_font("Segoe UI", 28)
     info_text = "Ce puzzle n'a pas de solution"
     info_surface = font_info.render(info_text, True, (200, 100, 100))
     info_rect = info_surface.get_rect(center=(width // 2, height // 2 + 40))
@@ -518,7 +583,7 @@ def draw_hud(screen, moves_count, elapsed_time, time_offset, algorithm_name="",
     width = screen.get_width()
     height = screen.get_height()
     
-    font_title = pygame.font.SysFont("Arial", 20, bold=True)
+    font_title = get_font("Arial", 20, bold=True)
     title_text = "RUSH HOUR PUZZLE"
     
     outline_surf = font_title.render(title_text, True, (0, 0, 0))
@@ -528,12 +593,12 @@ def draw_hud(screen, moves_count, elapsed_time, time_offset, algorithm_name="",
     title_surface = font_title.render(title_text, True, (255, 255, 255))
     screen.blit(title_surface, (MARGIN, 15))
     
-    font_algo = pygame.font.SysFont("Arial", 13, bold=True)
+    font_algo = get_font("Arial", 13, bold=True)
     algo_text = f"Algorithme: {algorithm_name}" if algorithm_name else "Résolution..."
     algo_surface = font_algo.render(algo_text, True, ACCENT_COLOR)
     screen.blit(algo_surface, (MARGIN, 48))
     
-    font_subtitle = pygame.font.SysFont("Arial", 16, bold=True)
+    font_subtitle = get_font("Arial", 16, bold=True)
     subtitle_text = "Libérez la voiture rouge !"
     subtitle_surface = font_subtitle.render(subtitle_text, True, (255, 200, 220))
     screen.blit(subtitle_surface, (MARGIN, 68))
@@ -552,8 +617,8 @@ def draw_hud(screen, moves_count, elapsed_time, time_offset, algorithm_name="",
     pygame.draw.rect(hud_surf, (255, 150, 200), hud_surf.get_rect(), 2, border_radius=12)
     screen.blit(hud_surf, (hud_x, hud_y))
     
-    font_label = pygame.font.SysFont("Segoe UI", 14, bold=True)
-    font_value = pygame.font.SysFont("Bahnschrift", 28, bold=True)
+    font_label = get_font("Segoe UI", 14, bold=True)
+    font_value = get_font("Bahnschrift", 28, bold=True)
     
     # Mouvements
     moves_label = font_label.render("MOUVEMENTS", True, (150, 160, 170))
@@ -570,13 +635,150 @@ def draw_hud(screen, moves_count, elapsed_time, time_offset, algorithm_name="",
     time_value = font_value.render(time_text, True, (255, 150, 200))
     screen.blit(time_value, (hud_x + 160, hud_y + 28))
 
+def draw_search_progress(screen, progress, algorithm_name=""):
+    """Affiche les statistiques de la recherche en cours (f, frontière, nœuds/s)"""
+    width, height = screen.get_width(), screen.get_height()
+    panel_width = 320
+    panel_height = 150
+    panel_x = (width - panel_width) // 2
+    panel_y = height - panel_height - MARGIN // 2
+
+    panel = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
+    pygame.draw.rect(panel, (0, 0, 0, 170), panel.get_rect(), border_radius=12)
+    pygame.draw.rect(panel, ACCENT_COLOR, panel.get_rect(), 2, border_radius=12)
+    screen.blit(panel, (panel_x, panel_y))
+
+    font_label = get_font("Segoe UI", 16, bold=True)
+    lines = [f"Recherche en cours : {algorithm_name}"]
+    if progress is None:
+        lines.append("Démarrage...")
+    else:
+        lines.append(f"Meilleur f : {progress.best_f:g}   profondeur : {progress.depth}")
+        lines.append(f"Nœuds explorés : {progress.explored}")
+        lines.append(f"Frontière : {progress.frontier_size}")
+        lines.append(f"Vitesse : {progress.nodes_per_sec:,.0f} nœuds/s   ({progress.elapsed:.1f}s)")
+    for i, line in enumerate(lines):
+        surf = font_label.render(line, True, TEXT_COLOR)
+        screen.blit(surf, (panel_x + 14, panel_y + 12 + i * 26))
+
+def draw_snapshot_vehicles(screen, puzzle, vehicles):
+    """Dessine l'état en cours d'expansion (rectangles simples, sans effets coûteux)"""
+    positions = {vid: (x, y) for vid, x, y in vehicles} if vehicles else {}
+    target_index = puzzle.geometry().target_index
+    for idx, v in enumerate(puzzle.vehicles):
+        x, y = positions.get(v.id, (v.x, v.y))
+        w = CELL_SIZE * v.length if v.orientation == 'H' else CELL_SIZE
+        h = CELL_SIZE if v.orientation == 'H' else CELL_SIZE * v.length
+        rect = pygame.Rect(MARGIN + x * CELL_SIZE + 4, TITLE_HEIGHT + MARGIN + y * CELL_SIZE + 4, w - 8, h - 8)
+        pygame.draw.rect(screen, get_car_color(idx, target_index), rect, border_radius=14)
+        pygame.draw.rect(screen, (255, 255, 255), rect, 2, border_radius=14)
+
+def draw_profiler_overlay(screen, profiler, quality=None):
+    """Incrustation du profileur de rendu (F3) : percentiles du temps d'image et des phases"""
+    summary = profiler.summary
+    if not summary:
+        return
+    font = get_font("Consolas", 13)
+    period_p50 = summary["period"]["p50"]
+    lines = [f"{len(profiler.frames)} images   {1000 / period_p50 if period_p50 else 0:5.1f} FPS (p50)"]
+    if quality is not None:
+        lines.append(f"qualité : {quality.name}")
+    lines.append(f"{'ms':<10}{'p50':>7}{'p95':>7}{'p99':>7}")
+    for name in ("period", "work") + profiler.phases:
+        q = summary[name]
+        lines.append(f"{name:<10}{q['p50']:>7.2f}{q['p95']:>7.2f}{q['p99']:>7.2f}")
+
+    panel_width = 230
+    panel_height = 10 + len(lines) * 16
+    panel = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
+    pygame.draw.rect(panel, (0, 0, 0, 190), panel.get_rect(), border_radius=8)
+    slowest = set(profiler.slowest_phases(1))
+    for i, line in enumerate(lines):
+        color = ACCENT_COLOR if line.split(" ", 1)[0] in slowest else TEXT_COLOR
+        panel.blit(font.render(line, True, color), (8, 5 + i * 16))
+    screen.blit(panel, (8, 8))
+
+def draw_board(screen, puzzle, time_offset, quality, gradient_background, static_background, profiler):
+    """Fond et grille : lueur animée sur le dégradé précalculé, ou fond entièrement figé"""
+    if quality.animated_glow:
+        with profiler.phase("gradient"):
+            screen.blit(gradient_background, (0, 0))
+        with profiler.phase("grid"):
+            draw_glowing_grid(screen, puzzle, time_offset)
+    else:
+        with profiler.phase("grid"):
+            screen.blit(static_background, (0, 0))
+
+# ============================================================================
+# VISUALISATION DE LA RECHERCHE EN DIRECT
+# ============================================================================
+
+def animate_search(puzzle, background_solver, algorithm_name=""):
+    """
+    Affiche la progression d'un BackgroundSolver tant que la recherche tourne.
+    Le fond et la grille sont précalculés ; l'écran n'est redessiné qu'à l'arrivée
+    d'un instantané (ou toutes les SEARCH_IDLE_REDRAW secondes pour le chronomètre).
+    Le rendu partage le GIL avec le thread de recherche et le ralentit donc un peu :
+    python background_solver.py --animate mesure ce surcoût. Retourne False si
+    l'utilisateur a fermé la fenêtre (la recherche est alors annulée), True sinon.
+    """
+    pygame.init()
+
+    width = puzzle.board_width * CELL_SIZE + 2 * MARGIN + 100
+    height = puzzle.board_height * CELL_SIZE + 2 * MARGIN + TITLE_HEIGHT + 50
+
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption('🚗 Rush Hour - Recherche en cours')
+    clock = pygame.time.Clock()
+
+    background = build_background((width, height), puzzle)
+
+    progress = None
+    start_time = time.time()
+    last_draw = None
+    while not background_solver.is_done():
+        clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                background_solver.cancel()
+                background_solver.join()
+                _FONTS.clear()
+                pygame.quit()
+                return False
+
+        latest = background_solver.poll()
+        now = time.time()
+        if latest is None and last_draw is not None and now - last_draw < SEARCH_IDLE_REDRAW:
+            continue
+        if latest is not None:
+            progress = latest
+        last_draw = now
+
+        elapsed = now - start_time
+        screen.blit(background, (0, 0))
+        draw_snapshot_vehicles(screen, puzzle, progress.vehicles if progress else None)
+        draw_hud(screen, progress.depth if progress else 0, elapsed, elapsed, algorithm_name, is_solving=True)
+        draw_search_progress(screen, progress, algorithm_name)
+        pygame.display.flip()
+
+    return True
+
 # ============================================================================
 # FONCTION PRINCIPALE D'ANIMATION
 # ============================================================================
 
-def animate_solution(puzzle, solution, algorithm_name="A* (h3)"):
-    """Animation de la solution avec effets visuels optimisés - Mode horizontal"""
+def animate_solution(puzzle, solution, algorithm_name="A* (h3)", profiler=None, governor=None):
+    """
+    Animation de la solution avec effets visuels optimisés - Mode horizontal.
+    profiler (RenderProfiler) chronomètre chaque phase du rendu ; F3 affiche
+    ou masque son incrustation. governor (QualityGovernor, adaptatif par
+    défaut) baisse ou relève la qualité des effets selon le temps des images.
+    """
     pygame.init()
+    if profiler is None:
+        profiler = RenderProfiler()
+    if governor is None:
+        governor = QualityGovernor(FPS)
     
     width = puzzle.board_width * CELL_SIZE + 2 * MARGIN + 100
     height = puzzle.board_height * CELL_SIZE + 2 * MARGIN + TITLE_HEIGHT + 50
@@ -587,8 +789,14 @@ def animate_solution(puzzle, solution, algorithm_name="A* (h3)"):
     
     quit_button = Button(width - 110, height - 45, 100, 40, "Quitter", font_size=16)
     
+    # Fonds précalculés : dégradé seul (lueur animée) ou dégradé + grille figée
+    gradient_background = build_background((width, height))
+    static_background = build_background((width, height), puzzle)
+    sprites = {}
+    
     # Initialisation des véhicules animés
-    animated_vehicles = [AnimatedVehicle(v, idx) for idx, v in enumerate(puzzle.vehicles)]
+    target_index = puzzle.geometry().target_index
+    animated_vehicles = [AnimatedVehicle(v, idx, idx == target_index) for idx, v in enumerate(puzzle.vehicles)]
     particles = []
     
     start_time = time.time()
@@ -607,6 +815,9 @@ def animate_solution(puzzle, solution, algorithm_name="A* (h3)"):
     running = True
     while running:
         dt = clock.tick(FPS) / 1000.0
+        profiler.begin_frame()
+        governor.begin_frame()
+        quality = governor.quality
         current_time = time.time()
         
         if show_success:
@@ -622,23 +833,34 @@ def animate_solution(puzzle, solution, algorithm_name="A* (h3)"):
                 running = False
             if quit_button.is_clicked(event):
                 running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
         
         if show_failure:
-            draw_gradient_background(screen)
-            draw_glowing_grid(screen, puzzle, elapsed)
+            draw_board(screen, puzzle, elapsed, quality, gradient_background, static_background, profiler)
             
-            for anim_v in animated_vehicles:
-                draw_animated_vehicle(screen, anim_v, elapsed, particles)
+            with profiler.phase("vehicles"):
+                for anim_v in animated_vehicles:
+                    draw_animated_vehicle(screen, anim_v, elapsed, particles, quality, sprites, target_index)
             
-            for p in particles:
-                p.draw(screen)
+            with profiler.phase("particles"):
+                for p in particles:
+                    p.draw(screen)
             
-            draw_hud(screen, 0, elapsed, elapsed, algorithm_name, is_solving=False)
-            draw_failure_message(screen, current_time - failure_start_time)
+            with profiler.phase("hud"):
+                draw_hud(screen, 0, elapsed, elapsed, algorithm_name, is_solving=False)
+            with profiler.phase("messages"):
+                draw_failure_message(screen, current_time - failure_start_time)
             
-            quit_button.draw(screen)
+            with profiler.phase("hud"):
+                quit_button.draw(screen)
+            if profiler.overlay:
+                draw_profiler_overlay(screen, profiler, quality)
+            governor.end_frame()
             
-            pygame.display.flip()
+            with profiler.phase("flip"):
+                pygame.display.flip()
+            profiler.end_frame()
             
             if current_time - failure_start_time > 5:
                 running = False
@@ -648,7 +870,7 @@ def animate_solution(puzzle, solution, algorithm_name="A* (h3)"):
             puzzle.move_vehicle(solution[move_index])
            
             for anim_v in animated_vehicles:
-                anim_v.sync_position()
+                anim_v.sync_position(puzzle.vehicles[anim_v.idx])
             move_index += 1
             last_move_time = current_time
             
@@ -661,7 +883,7 @@ def animate_solution(puzzle, solution, algorithm_name="A* (h3)"):
         for anim_v in animated_vehicles:
             anim_v.update(dt)
         
-        particles = [p for p in particles if p.update(dt)]
+        particles = [p for p in particles if p.update(dt)][:quality.max_particles(MAX_PARTICLES)]
         if show_success:
             success_particles = [p for p in success_particles if p.update(dt)]
         
@@ -670,29 +892,39 @@ def animate_solution(puzzle, solution, algorithm_name="A* (h3)"):
                 anim_v.particle_count = 0
        
         # Rendu
-        draw_gradient_background(screen)
-        draw_glowing_grid(screen, puzzle, elapsed)
+        draw_board(screen, puzzle, elapsed, quality, gradient_background, static_background, profiler)
        
-        for anim_v in animated_vehicles:
-            draw_animated_vehicle(screen, anim_v, elapsed, particles)
-        
-        for p in particles:
-            p.draw(screen)
+        with profiler.phase("vehicles"):
+            for anim_v in animated_vehicles:
+                draw_animated_vehicle(screen, anim_v, elapsed, particles, quality, sprites, target_index)
         
-        if show_success:
-            for p in success_particles:
+        with profiler.phase("particles"):
+            for p in particles:
                 p.draw(screen)
-            draw_success_message(screen, current_time - success_start_time, len(solution), fixed_elapsed_time, algorithm_name)
+            if show_success:
+                for p in success_particles[:quality.max_particles(len(success_particles))]:
+                    p.draw(screen)
         
-        draw_hud(screen, move_index, elapsed, elapsed, algorithm_name, is_solving=not show_success)
+        if show_success:
+            with profiler.phase("messages"):
+                draw_success_message(screen, current_time - success_start_time, len(solution), fixed_elapsed_time, algorithm_name)
         
-        quit_button.draw(screen)
+        with profiler.phase("hud"):
+            draw_hud(screen, move_index, elapsed, elapsed, algorithm_name, is_solving=not show_success)
+            quit_button.draw(screen)
+        if profiler.overlay:
+            draw_profiler_overlay(screen, profiler, quality)
+        governor.end_frame()
         
-        pygame.display.flip()
+        with profiler.phase("flip"):
+            pygame.display.flip()
+        profiler.end_frame()
         
         if show_success and current_time - success_start_time > 5:
             running = False
     
+    profiler.close()
+    _FONTS.clear()  # Les polices ne survivent pas à pygame.quit()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,334 @@
+#learned_heuristic.py
+"""
+Heuristique apprise à partir d'instances résolues (NumPy uniquement, dépendance optionnelle).
+
+Chaque état est décrit par quelques caractéristiques (FEATURES) : distance de
+la cible, chaîne de blocage, mobilité des véhicules (estimate_mobility) et
+occupation des voies. Un modèle linéaire (moindres carrés régularisés) ou un
+petit MLP est entraîné hors ligne sur les distances exactes au but, obtenues
+par BFS inverse sur la composante de chaque puzzle (Layout.goal_distances).
+
+Pendant astar, LearnedHeuristic.batch évalue tous les enfants d'une expansion
+en une seule multiplication matricielle. Deux modes :
+    learned     prédiction brute du modèle (rapide, solutions proches de l'optimum) ;
+    learned-h2  max(prédiction, h2) : jamais moins informée que h2.
+Aucun des deux modes n'est admissible (ni le modèle, ni h2 qui surestime
+déjà) : astar-learned* ne garantit pas l'optimalité, ces heuristiques sont
+enregistrées sans admissible=True et le portefeuille ne les retient pas
+pour --require optimal. Il n'existe pas de mode optimal appris.
+Les caractéristiques restent calculées état par état en Python : c'est
+l'essentiel du coût de l'heuristique (environ 3 enfants par expansion, trop
+peu pour qu'une version vectorisée amortisse ses appels NumPy).
+Les deux heuristiques ne sont enregistrées (catalogue, main.py -H) que si
+NumPy est installé et que le modèle RUSH_HOUR_MODEL existe. NumPy n'est
+importé qu'au premier usage (chargement ou entraînement d'un modèle) : le
+catalogue des algorithmes, construit à l'import de main.py, ne le charge pas.
+
+    python learned_heuristic.py train data --kind mlp --out learned_heuristic.npz
+    python learned_heuristic.py evaluate data
+"""
+import importlib.util
+import os
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Dépendance optionnelle, importée par _require_numpy (environ 100 ms)
+np = None
+
+from board_layout import Layout
+from rush_hour_puzzle import RushHourPuzzle
+from solver import register_heuristic
+
+# Modèle chargé par les heuristiques du registre (variable d'environnement RUSH_HOUR_MODEL)
+DEFAULT_MODEL = os.environ.get("RUSH_HOUR_MODEL", "learned_heuristic.npz")
+
+FEATURES = [
+    "distance",              # cases entre la cible et la sortie
+    "blockers",              # véhicules sur la ligne de sortie devant la cible
+    "blockers_of_blockers",  # véhicules qui bloquent ces bloqueurs (comme h3)
+    "blocker_mobility",      # somme des mobilités des bloqueurs
+    "stuck_blockers",        # bloqueurs sans aucun mouvement possible
+    "immobile",              # véhicules sans aucun mouvement possible
+    "total_mobility",        # somme des mobilités de tous les véhicules
+    "exit_lane_free",        # cases libres sur la ligne de sortie
+    "occupancy",             # fraction des cases occupées (murs compris)
+]
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("NumPy est requis pour l'heuristique apprise (pip install numpy).")
+        np = numpy
+
+
+def state_features(puzzle: RushHourPuzzle) -> List[float]:
+    blockers = puzzle.exit_lane_vehicles()
+    mobilities = [puzzle.estimate_mobility(v) for v in puzzle.vehicles]
+    mobility_of = {v.id: m for v, m in zip(puzzle.vehicles, mobilities)}
+    geo = puzzle.geometry()
+    rows, cols = puzzle.lane_masks()
+    if geo.horizontal_exit:
+        lane_mask, lane = rows[geo.exit_index] if 0 <= geo.exit_index < len(rows) else 0, puzzle.board_width
+    else:
+        lane_mask, lane = cols[geo.exit_index] if 0 <= geo.exit_index < len(cols) else 0, puzzle.board_height
+    occupied = sum(bin(m).count("1") for m in rows)
+    return [
+        float(puzzle.distance_to_exit()),
+        float(len(blockers)),
+        float(sum(len(puzzle.get_blockers_of_vehicle_by_id(v.id)) for v in blockers)),
+        float(sum(mobility_of[v.id] for v in blockers)),
+        float(sum(1 for v in blockers if mobility_of[v.id] == 0)),
+        float(sum(1 for m in mobilities if m == 0)),
+        float(sum(mobilities)),
+        float(lane - bin(lane_mask).count("1")),
+        occupied / float(puzzle.board_width * puzzle.board_height),
+    ]
+
+
+def feature_matrix(puzzles: Iterable[RushHourPuzzle]):
+    _require_numpy()
+    return np.array([state_features(p) for p in puzzles], dtype=np.float64).reshape(-1, len(FEATURES))
+
+
+# ============================================================================
+# MODÈLES
+# ============================================================================
+
+class LinearModel:
+    """Régression linéaire régularisée (ridge) sur caractéristiques normalisées."""
+    kind = "linear"
+
+    def __init__(self, weights, mean, scale):
+        self.weights = weights
+        self.mean = mean
+        self.scale = scale
+
+    def predict(self, X):
+        Xn = (X - self.mean) / self.scale
+        return Xn @ self.weights[:-1] + self.weights[-1]
+
+    @classmethod
+    def fit(cls, X, y, l2: float = 1e-3) -> 'LinearModel':
+        _require_numpy()
+        mean, scale = X.mean(axis=0), X.std(axis=0) + 1e-9
+        Xn = np.hstack([(X - mean) / scale, np.ones((len(X), 1))])
+        A = Xn.T @ Xn + l2 * np.eye(Xn.shape[1])
+        weights = np.linalg.solve(A, Xn.T @ y)
+        return cls(weights, mean, scale)
+
+    def arrays(self) -> Dict[str, object]:
+        return {"weights": self.weights, "mean": self.mean, "scale": self.scale}
+
+
+class MLPModel:
+    """Perceptron à une couche cachée (ReLU), entraîné par Adam sur l'erreur quadratique."""
+    kind = "mlp"
+
+    def __init__(self, W1, b1, W2, b2, mean, scale):
+        self.W1, self.b1, self.W2, self.b2 = W1, b1, W2, b2
+        self.mean = mean
+        self.scale = scale
+
+    def predict(self, X):
+        hidden = np.maximum((X - self.mean) / self.scale @ self.W1 + self.b1, 0.0)
+        return hidden @ self.W2 + self.b2
+
+    @classmethod
+    def fit(cls, X, y, hidden: int = 32, epochs: int = 200, lr: float = 1e-2,
+            batch_size: int = 256, seed: int = 0) -> 'MLPModel':
+        _require_numpy()
+        rng = np.random.default_rng(seed)
+        mean, scale = X.mean(axis=0), X.std(axis=0) + 1e-9
+        Xn = (X - mean) / scale
+        n_features = X.shape[1]
+        params = [rng.normal(0, np.sqrt(2.0 / n_features), (n_features, hidden)), np.zeros(hidden),
+                  rng.normal(0, np.sqrt(1.0 / hidden), hidden), np.array(float(y.mean()))]
+        moments = [np.zeros_like(p) for p in params]
+        velocities = [np.zeros_like(p) for p in params]
+        beta1, beta2, step = 0.9, 0.999, 0
+        for _ in range(epochs):
+            order = rng.permutation(len(Xn))
+            for start in range(0, len(Xn), batch_size):
+                idx = order[start:start + batch_size]
+                xb, yb = Xn[idx], y[idx]
+                W1, b1, W2, b2 = params
+                pre = xb @ W1 + b1
+                hid = np.maximum(pre, 0.0)
+                error = hid @ W2 + b2 - yb
+                d_out = 2.0 * error / len(idx)
+                d_hid = np.outer(d_out, W2) * (pre > 0)
+                grads = [xb.T @ d_hid, d_hid.sum(axis=0), hid.T @ d_out, np.array(d_out.sum())]
+                step += 1
+                for k, g in enumerate(grads):
+                    moments[k] = beta1 * moments[k] + (1 - beta1) * g
+                    velocities[k] = beta2 * velocities[k] + (1 - beta2) * g * g
+                    m_hat = moments[k] / (1 - beta1 ** step)
+                    v_hat = velocities[k] / (1 - beta2 ** step)
+                    params[k] = params[k] - lr * m_hat / (np.sqrt(v_hat) + 1e-8)
+        return cls(*params, mean, scale)
+
+    def arrays(self) -> Dict[str, object]:
+        return {"W1": self.W1, "b1": self.b1, "W2": self.W2, "b2": self.b2,
+                "mean": self.mean, "scale": self.scale}
+
+
+MODELS = {"linear": LinearModel, "mlp": MLPModel}
+
+
+def save_model(model, path: str):
+    _require_numpy()
+    np.savez(path, kind=np.array(model.kind), features=np.array(FEATURES), **model.arrays())
+
+
+def load_model(path: str):
+    _require_numpy()
+    with np.load(path) as data:
+        if list(data["features"]) != FEATURES:
+            raise ValueError(f"Modèle {path} entraîné avec d'autres caractéristiques : réentraînez-le.")
+        kind = str(data["kind"])
+        if kind == "linear":
+            return LinearModel(data["weights"], data["mean"], data["scale"])
+        if kind == "mlp":
+            return MLPModel(data["W1"], data["b1"], data["W2"], data["b2"], data["mean"], data["scale"])
+    raise ValueError(f"Type de modèle inconnu : {kind}")
+
+
+# ============================================================================
+# HEURISTIQUE
+# ============================================================================
+
+class LearnedHeuristic:
+    """Heuristique (puzzle -> int) avec une évaluation groupée batch(puzzles) utilisée par astar."""
+    def __init__(self, model, clamp: bool = False):
+        _require_numpy()
+        self.model = model
+        self.clamp = clamp
+
+    def batch(self, puzzles: List[RushHourPuzzle]) -> List[int]:
+        X = feature_matrix(puzzles)
+        values = np.maximum(np.rint(self.model.predict(X)), 0.0)
+        if self.clamp:
+            # h2 = distance + bloqueurs, déjà présents dans les caractéristiques ;
+            # h2 n'est pas admissible : ce plancher informe, il ne garantit rien
+            values = np.maximum(values, X[:, 0] + X[:, 1])
+        goals = np.fromiter((p.isGoal() for p in puzzles), dtype=bool, count=len(puzzles))
+        values[goals] = 0.0
+        return values.astype(int).tolist()
+
+    def __call__(self, puzzle: RushHourPuzzle) -> int:
+        return self.batch([puzzle])[0]
+
+
+_loaded_models: Dict[str, object] = {}
+
+
+def _heuristic_factory(clamp: bool):
+    def make(puzzle: RushHourPuzzle) -> LearnedHeuristic:
+        path = DEFAULT_MODEL
+        if path not in _loaded_models:
+            _loaded_models[path] = load_model(path)
+        return LearnedHeuristic(_loaded_models[path], clamp)
+    return make
+
+
+if importlib.util.find_spec("numpy") is not None and os.path.exists(DEFAULT_MODEL):
+    register_heuristic("learned", "appris, non admissible", _heuristic_factory(clamp=False))
+    register_heuristic("learned-h2", "appris, au moins h2, non admissible", _heuristic_factory(clamp=True))
+
+
+# ============================================================================
+# ENTRAÎNEMENT
+# ============================================================================
+
+def training_samples(puzzles: Iterable[RushHourPuzzle],
+                     max_states_per_puzzle: int = 20000,
+                     component_limit: Optional[int] = 500_000,
+                     seed: int = 0) -> Tuple[object, object]:
+    """
+    (X, y) : caractéristiques et distance exacte au but d'états tirés dans la
+    composante de chaque puzzle. Les composantes plus grandes que component_limit sont ignorées.
+    """
+    _require_numpy()
+    rng = random.Random(seed)
+    features: List[List[float]] = []
+    targets: List[int] = []
+    for puzzle in puzzles:
+        layout, start = Layout.from_puzzle(puzzle)
+        states = layout.component(start, component_limit)
+        if states is None:
+            continue
+        distances = layout.goal_distances(states)
+        solvable = list(distances)
+        if len(solvable) > max_states_per_puzzle:
+            solvable = rng.sample(solvable, max_states_per_puzzle)
+        for state in solvable:
+            p = layout.to_puzzle(state)
+            p.setBoard()
+            features.append(state_features(p))
+            targets.append(distances[state])
+    return (np.array(features, dtype=np.float64).reshape(-1, len(FEATURES)),
+            np.array(targets, dtype=np.float64))
+
+
+def train(puzzles: Iterable[RushHourPuzzle], kind: str = "mlp",
+          max_states_per_puzzle: int = 20000,
+          component_limit: Optional[int] = 500_000,
+          seed: int = 0,
+          **fit_args):
+    """Entraîne un modèle MODELS[kind] ; fit_args est passé à sa méthode fit (hidden, epochs, l2...)."""
+    X, y = training_samples(puzzles, max_states_per_puzzle, component_limit, seed)
+    if len(X) == 0:
+        raise ValueError("Aucun état d'entraînement (composantes trop grandes ou puzzles insolubles).")
+    model = MODELS[kind].fit(X, y, **fit_args)
+    predicted = model.predict(X)
+    return model, {"samples": len(X), "mae": float(np.abs(predicted - y).mean()),
+                   "overestimate": float((np.rint(predicted) > y).mean())}
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from puzzle_corpus import iter_named_puzzles
+
+    parser = argparse.ArgumentParser(description="Heuristique apprise pour A* (NumPy).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="Entraîne un modèle sur les distances exactes des puzzles")
+    p_train.add_argument("puzzles", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    p_train.add_argument("--kind", default="mlp", choices=list(MODELS))
+    p_train.add_argument("--out", default=DEFAULT_MODEL)
+    p_train.add_argument("--max-states", type=int, default=20000, help="États tirés par puzzle")
+    p_train.add_argument("--hidden", type=int, default=32)
+    p_train.add_argument("--epochs", type=int, default=200)
+    p_eval = sub.add_parser("evaluate", help="Compare astar h2 et les heuristiques apprises")
+    p_eval.add_argument("puzzles")
+    p_eval.add_argument("--model", default=DEFAULT_MODEL)
+    args = parser.parse_args()
+
+    try:
+        _require_numpy()
+    except ImportError as e:
+        print(e)
+        sys.exit(1)
+    if args.command == "train":
+        puzzles = [p for _, p in iter_named_puzzles(args.puzzles)]
+        fit_args = {"hidden": args.hidden, "epochs": args.epochs} if args.kind == "mlp" else {}
+        model, report = train(puzzles, args.kind, max_states_per_puzzle=args.max_states, **fit_args)
+        save_model(model, args.out)
+        print(f"Modèle {args.kind} enregistré dans {args.out} : {report['samples']} états, "
+              f"erreur moyenne {report['mae']:.2f} coups, {report['overestimate'] * 100:.1f}% de surestimations.")
+    else:
+        from solver import astar, heuristic_h2
+        model = load_model(args.model)
+        candidates = [("h2", heuristic_h2), ("learned", LearnedHeuristic(model)),
+                      ("learned-h2", LearnedHeuristic(model, clamp=True))]
+        for name, game in iter_named_puzzles(args.puzzles):
+            cells = []
+            for label, heuristic in candidates:
+                node, explored, elapsed = astar(game, heuristic)
+                moves = len(node.getSolution()) if node else None
+                cells.append(f"{label} {moves} coups/{explored} nœuds/{elapsed:.2f}s")
+            print(f"{name} : " + " | ".join(cells))
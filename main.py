@@ -1,18 +1,22 @@
 #main.py 
 from typing import Literal, List, Tuple, Optional
 import os
-import copy
-import tkinter as tk
+import sys
+import json
+import argparse
 from rush_hour_puzzle import RushHourPuzzle, Vehicle
-from solver import bfs, astar, heuristic_h1, heuristic_h2, heuristic_h3
-from interface import animate_solution
+from solver import SOLVERS, TIE_BREAKING, HEURISTICS, SolveOptions, SolveResult, algorithm_catalog, algorithm_name, solve
+from pruning import unsolvable_reason
+from puzzle_corpus import iter_named_puzzles, list_puzzle_names, load_named_puzzle
+from render_governor import QUALITY_NAMES
+# tkinter et interface (pygame) sont importés à la demande : la ligne de commande
+# démarre ainsi en quelques millisecondes, y compris sur un serveur sans affichage.
 
 
 Action = Tuple[str, int]
-CONFIG_FILES = [
-    "data/1.csv", "data/2-a.csv", "data/2-b.csv", "data/2-c.csv",
-    "data/2-d.csv", "data/2-e.csv", "data/e-f.csv"
-]
+# Sources de puzzles essayées dans l'ordre : catalogue SQLite (puzzle_catalog), dossier extrait, archive fournie
+CATALOG_PATH = "rush_hour.db"
+DATA_SOURCES = [CATALOG_PATH, "data", "data.zip"]
 
 
 class Node:
@@ -59,13 +63,14 @@ class Node:
         self.f = self.g + h
 
 
+# Algorithmes et heuristiques viennent du registre de solver.py (moteurs externes compris)
+ALGORITHMES = {name: label for name, (_, _, label) in algorithm_catalog().items()}
+HEURISTIQUES = {h: algorithm_name("astar", h) for h in HEURISTICS}
+
+
 def choisir_algorithme():
-    algos = [
-        ("Breadth-First Search (BFS)", "bfs"),
-        ("A*  Heuristic 1 (h1)", "astar1"),
-        ("A*  Heuristic 2 (h2)", "astar2"),
-        ("A*  Heuristic 3 (h3)", "astar3")
-    ]
+    import tkinter as tk
+    algos = [(label, name) for name, label in ALGORITHMES.items()]
     choix = [algos[0][1]]  # valeur par défaut
 
     def on_submit():
@@ -85,6 +90,7 @@ def choisir_algorithme():
 
 
 def choisir_fichier_csv(config_files):
+    import tkinter as tk
     choix = [config_files[0]]  # valeur par défaut
 
     def on_submit():
@@ -121,72 +127,209 @@ def display_board_info(game: RushHourPuzzle, file_name: str):
     else:
         print("  Aucun mur détecté.")
     print(f"\nStatut: {'Objectif atteint!' if game.isGoal() else 'Non objectif.'}")
+    raison = unsolvable_reason(game)
+    if raison:
+        print(f"Puzzle insoluble : {raison}")
     print("\n" + "-" * 80)
 
 
-def run_solver_on_puzzle(game: RushHourPuzzle, algorithme: str):
+def construire_solveur(game: RushHourPuzzle, algorithme: str,
+                       time_budget: Optional[float] = None, node_budget: Optional[int] = None,
+                       tie_breaking: str = "low-g", **extra):
+    """
+    Retourne le solveur correspondant à algorithme (signature de bfs, résultat SolveResult),
+    ou None s'il est inconnu. extra : options propres au moteur (beam_width, max_stored...).
+    """
+    if algorithme not in ALGORITHMES:
+        return None
+    return lambda puzzle, **kw: solve(puzzle, algorithme,
+                                      SolveOptions(time_budget=time_budget, node_budget=node_budget,
+                                                   tie_breaking=tie_breaking, **extra, **kw))
+
+
+def run_solver_on_puzzle(game: RushHourPuzzle, algorithme: str, animate: bool = True, verbose: bool = True,
+                         time_budget: Optional[float] = None, node_budget: Optional[int] = None,
+                         tie_breaking: str = "low-g", render_trace: Optional[str] = None,
+                         render_quality: str = "auto", **extra):
+    result = None
     solution_node = None
     explored_count = 0
     exec_time = 0.0
-    print(f"\n[Recherche avec l'algorithme sélectionné : {algorithme}]")
+    log = print if verbose else (lambda *args, **kwargs: None)
+    log(f"\n[Recherche avec l'algorithme sélectionné : {algorithme}]")
 
-    # Sauvegarde de la position initiale de la voiture rouge pour heuristique h3
-    red_car_init_pos = next((v.x for v in game.vehicles if v.id == 'X'), 0)
+    algorithme_display_name = ALGORITHMES.get(algorithme, "Inconnu")
+    search = construire_solveur(game, algorithme, time_budget, node_budget, tie_breaking, **extra)
+    if search is None:
+        log("Algorithme inconnu.")
+    elif animate:
+        from background_solver import BackgroundSolver
+        from interface import animate_search
+        # La recherche tourne dans un thread ; la fenêtre affiche sa progression en direct
+        background_solver = BackgroundSolver(search, game).start()
+        try:
+            if not animate_search(game, background_solver, algorithm_name=algorithme_display_name):
+                log("Recherche annulée par l'utilisateur.")
+                return None, explored_count, exec_time
+        except Exception as e:
+            log(f"\n[INFO] Visualisation de la recherche indisponible : {e}")
+        background_solver.join()
+        if background_solver.error is not None:
+            raise background_solver.error
+        result = background_solver.result
+        solution_node, explored_count, exec_time = result
+        log(f"Temps passé dans le rappel de progression : {background_solver.overhead() * 100:.2f}% "
+            f"(surcoût en temps mur : python background_solver.py --animate)")
+    else:
+        result = search(game)
+        solution_node, explored_count, exec_time = result
 
-    if algorithme == "bfs":
-        algorithme_display_name = "BFS"
-        solution_node, explored_count, exec_time = bfs(game)
+    if search is not None:
         if solution_node:
-            print(f" Solution BFS trouvée en {solution_node.g} mouvements.")
+            log(f"Solution {algorithme_display_name} trouvée en {solution_node.g} mouvements.")
         else:
-            print("Aucune solution trouvée par BFS.")
-    elif algorithme == "astar1":
-        algorithme_display_name = "A* (h1)"
-        solution_node, explored_count, exec_time = astar(game, heuristic_h1)
-        if solution_node:
-            print(f"Solution A* (h1) trouvée en {solution_node.g} mouvements.")
-        else:
-            print("Aucune solution trouvée par A* (h1).")
-    elif algorithme == "astar2":
-        algorithme_display_name = "A* (h2)"
-        solution_node, explored_count, exec_time = astar(game, heuristic_h2)
-        if solution_node:
-            print(f"Solution A* (h2) trouvée en {solution_node.g} mouvements.")
-        else:
-            print("Aucune solution trouvée par A* (h2).")
-    elif algorithme == "astar3":
-        algorithme_display_name = "A* (h3)"
-        # Passe la position initiale à l'heuristique h3
-        solution_node, explored_count, exec_time = astar(game, lambda puzzle: heuristic_h3(puzzle, red_car_init_pos))
-        if solution_node:
-            print(f"Solution A* (h3) trouvée en {solution_node.g} mouvements.")
-        else:
-            print("Aucune solution trouvée par A* (h3).")
-    else:
-        algorithme_display_name = "Inconnu"
-        print("Algorithme inconnu.")
-    
+            log(f"Aucune solution trouvée par {algorithme_display_name}.")
+
     # Affichage des métriques
-    print(f"Nombre de nœuds explorés : {explored_count}")
-    print(f"Temps d'exécution : {exec_time:.4f} secondes")
-    
-    print("\n" + "#" * 80)
-    if solution_node:
-        print("\n Démarrage de l'animation de la solution sélectionnée")
-        game_for_animation = copy.deepcopy(game)
+    log(f"Nombre de nœuds explorés : {explored_count}")
+    log(f"Temps d'exécution : {exec_time:.4f} secondes")
+    if isinstance(result, SolveResult):
+        log(f"Nœuds développés : {result.expanded}, générés : {result.generated}, conservés : {result.stored}")
+        log("Phases : " + ", ".join(f"{phase} {t:.4f}s" for phase, t in result.timings.items()))
+        if result.bound is not None:
+            log(f"Borne d'optimalité : {result.bound:.3f} (mouvements / optimum)")
+
+    log("\n" + "#" * 80)
+    if solution_node and animate:
+        log("\n Démarrage de l'animation de la solution sélectionnée")
+        game_for_animation = game.copy()
         try:
-            animate_solution(game_for_animation, solution_node.getSolution(), algorithm_name=algorithme_display_name)
+            from interface import animate_solution
+            from render_governor import QualityGovernor
+            from render_profiler import RenderProfiler
+            profiler = RenderProfiler(trace_path=render_trace) if render_trace else None
+            animate_solution(game_for_animation, solution_node.getSolution(), algorithm_name=algorithme_display_name,
+                             profiler=profiler, governor=QualityGovernor.from_name(render_quality))
         except Exception as e:
-            print(f"\n[INFO] Pygame s'est terminé ou a rencontré une erreur : {e}")
+            log(f"\n[INFO] Pygame s'est terminé ou a rencontré une erreur : {e}")
+    if result is None:
+        return solution_node, explored_count, exec_time
+    return result
 
 
+def format_result(name: str, algorithme: str, result, output_format: str) -> str:
+    solution_node, explored_count, exec_time = result
+    solution = solution_node.getSolution() if solution_node else None
+    if output_format == "json":
+        record = {
+            "puzzle": name,
+            "algorithm": algorithme,
+            "solved": solution is not None,
+            "moves": len(solution) if solution is not None else None,
+            "solution": [list(a) for a in solution] if solution is not None else None,
+            "explored": explored_count,
+            "time": round(exec_time, 6),
+        }
+        if isinstance(result, SolveResult):
+            details = result.as_dict()
+            record.update((k, v) for k, v in details.items() if k not in record)
+        return json.dumps(record, ensure_ascii=False)
+    if output_format == "moves":
+        if solution is None:
+            return f"# {name} : aucune solution"
+        return "\n".join([f"# {name} : {len(solution)} mouvements"] + [f"{vid} {d:+d}" for vid, d in solution])
+    # text
+    bound = getattr(result, "bound", None)
+    details = f"{explored_count} nœuds, {exec_time:.4f}s" + (f", borne {bound:.3f}" if bound is not None else "")
+    if solution is None:
+        return f"{name} : aucune solution ({details})"
+    return f"{name} : {len(solution)} mouvements ({details})"
 
-if __name__ == "__main__":
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Résout des puzzles Rush Hour. Sans argument, lance le mode interactif (Tk + pygame).")
+    parser.add_argument("puzzle", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    parser.add_argument("-a", "--algo", default="astar",
+                        choices=[n for n, e in SOLVERS.items() if e.uses_heuristic] + list(ALGORITHMES),
+                        help="Algorithme de recherche (défaut : astar)")
+    parser.add_argument("-H", "--heuristic", default="h2", choices=list(HEURISTIQUES),
+                        help="Heuristique utilisée par astar et anytime (défaut : h2)")
+    parser.add_argument("--tie-breaking", default="low-g", choices=list(TIE_BREAKING),
+                        help="Départage des nœuds de même f dans astar (défaut : low-g)")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Budget en secondes (bfs, astar, anytime, greedy, beam, *-resumable, portfolio)")
+    parser.add_argument("--node-budget", type=int, default=None,
+                        help="Budget en nœuds développés (bfs, astar, anytime, greedy, beam, *-resumable)")
+    parser.add_argument("--beam-width", type=int, default=None,
+                        help="Largeur du faisceau de beam (défaut : 200)")
+    parser.add_argument("--max-stored", type=int, default=None,
+                        help="Nombre maximal d'états mémorisés par greedy et beam")
+    parser.add_argument("-f", "--format", default="text", choices=["text", "json", "moves"],
+                        help="Format de sortie (défaut : text)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Raccourcit la solution trouvée (fusion de mouvements, re-recherche locale)")
+    parser.add_argument("--catalog", default=None, metavar="DB",
+                        help="Catalogue SQLite où enregistrer les puzzles et leurs solutions (voir puzzle_catalog.py)")
+    parser.add_argument("--animate", action="store_true",
+                        help="Affiche la recherche et la solution avec pygame")
+    parser.add_argument("--render-quality", default="auto", choices=("auto",) + QUALITY_NAMES,
+                        help="Avec --animate : qualité des effets, adaptée au temps des images par défaut")
+    parser.add_argument("--render-trace", default=None, metavar="CSV",
+                        help="Avec --animate : écrit le temps de chaque phase de rendu, image par image (F3 : incrustation)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Affiche le plateau et le détail de la recherche")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    entry = SOLVERS.get(args.algo)
+    if entry is not None and entry.uses_heuristic:
+        algorithme = algorithm_name(args.algo, args.heuristic)
+    else:
+        algorithme = args.algo
+    extra = {k: v for k, v in (("beam_width", args.beam_width), ("max_stored", args.max_stored)) if v is not None}
+    status = 0
+    catalog = None
+    if args.catalog:
+        from puzzle_catalog import PuzzleCatalog
+        from portfolio import is_optimal
+        catalog = PuzzleCatalog(args.catalog)
+    for name, game in iter_named_puzzles(args.puzzle):
+        game.setBoard()
+        if args.verbose:
+            display_board_info(game, name)
+        result = run_solver_on_puzzle(game, algorithme, animate=args.animate, verbose=args.verbose,
+                                      time_budget=args.time_budget, node_budget=args.node_budget,
+                                      tie_breaking=args.tie_breaking, render_trace=args.render_trace,
+                                      render_quality=args.render_quality, **extra)
+        if result[0] is None:
+            status = 1
+        elif args.optimize:
+            from solution_optimizer import optimize_node
+            if isinstance(result, SolveResult):
+                result.node = optimize_node(game, result.node)
+            else:
+                result = (optimize_node(game, result[0]),) + tuple(result[1:])
+        if catalog is not None and isinstance(result, SolveResult):
+            if name not in catalog:
+                catalog.add(name, game, args.puzzle)
+            catalog.record_solution(game, algorithme, result, is_optimal(algorithme),
+                                    exhaustive=not result.budget_exhausted)
+        print(format_result(name, algorithme, result, args.format), flush=True)
+    if catalog is not None:
+        catalog.close()
+    return status
+
+
+def interactive():
+    source = trouver_source()
+    config_files = list_puzzle_names(source)
     choix_algo = choisir_algorithme()
-    fichier_choisi = choisir_fichier_csv(CONFIG_FILES)
-    game = RushHourPuzzle()
+    fichier_choisi = choisir_fichier_csv(config_files)
     try:
-        game.setVehicles(fichier_choisi)
+        game = load_named_puzzle(source, fichier_choisi)
         game.setBoard()
         display_board_info(game, fichier_choisi)
         run_solver_on_puzzle(game, choix_algo)
@@ -195,3 +338,15 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Échec de chargement/affichage pour {fichier_choisi}: {e}")
 
+
+def trouver_source(sources=DATA_SOURCES) -> str:
+    for source in sources:
+        if os.path.exists(source):
+            return source
+    raise FileNotFoundError(f"Aucune source de puzzles trouvée parmi {sources}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    interactive()
@@ -0,0 +1,243 @@
+#portfolio.py
+"""
+Portefeuille de solveurs : plusieurs configurations du catalogue (bfs, astar2,
+astar3...) sont lancées en parallèle, chacune dans son propre processus, et la
+première solution qui satisfait la garantie demandée l'emporte :
+    "any"      toute solution ;
+    "optimal"  solution d'une configuration optimale (SolverEntry.is_optimal) :
+               bfs*, ou A* avec une heuristique admissible (astar-moves).
+Les perdants sont arrêtés immédiatement (Process.terminate) ; chaque processus
+renvoie son résultat par son propre tube, si bien qu'un arrêt brutal ne peut
+pas corrompre les résultats des autres.
+
+Avec moins de processus que de configurations, l'ordre d'essai vient d'un
+PortfolioSelector appris des gagnants enregistrés (fichier JSON lines, une
+ligne par puzzle) : les configurations qui gagnent le plus souvent sur des
+puzzles de même profil sont lancées en premier.
+"""
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Sequence
+
+from rush_hour_puzzle import RushHourPuzzle
+from solver import SOLVERS, SolveOptions, SolveResult, algorithm_catalog, register_solver, solve
+
+DEFAULT_CONFIGS = ("bfs", "astar-moves", "astar2", "astar3")
+GUARANTEES = ("any", "optimal")
+
+
+def is_optimal(algorithm: str) -> bool:
+    """Vrai si algorithm (nom du catalogue) garantit une solution de longueur minimale."""
+    catalog = algorithm_catalog()
+    name, heuristic = catalog[algorithm][:2] if algorithm in catalog else (algorithm, None)
+    entry = SOLVERS.get(name)
+    return entry is not None and entry.is_optimal(heuristic)
+
+
+def puzzle_profile(puzzle: RushHourPuzzle) -> str:
+    """Profil grossier d'un puzzle pour le sélecteur : dimensions, véhicules, bloqueurs de la sortie."""
+    return (f"{puzzle.board_width}x{puzzle.board_height}-v{len(puzzle.vehicles)}"
+            f"-b{len(puzzle.exit_lane_vehicles())}")
+
+
+class PortfolioSelector:
+    """Compte les victoires de chaque configuration, par profil de puzzle et au total."""
+    def __init__(self):
+        self.wins: Dict[str, Counter] = {}
+        self.total: Counter = Counter()
+
+    def update(self, profile: str, winner: str):
+        self.wins.setdefault(profile, Counter())[winner] += 1
+        self.total[winner] += 1
+
+    def order(self, puzzle: RushHourPuzzle, configs: Sequence[str]) -> List[str]:
+        """configs triées : victoires sur ce profil, puis victoires totales, puis ordre donné."""
+        local = self.wins.get(puzzle_profile(puzzle), Counter())
+        rank = {c: i for i, c in enumerate(configs)}
+        return sorted(configs, key=lambda c: (-local[c], -self.total[c], rank[c]))
+
+    @classmethod
+    def from_records(cls, path: str) -> 'PortfolioSelector':
+        selector = cls()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        record = json.loads(line)
+                        if record.get("winner"):
+                            selector.update(record["profile"], record["winner"])
+        return selector
+
+
+def record_winner(path: str, name: str, puzzle: RushHourPuzzle, result: Optional[SolveResult],
+                  configs: Sequence[str], require: str, elapsed: float):
+    """Ajoute une ligne JSON (puzzle, profil, gagnant, temps) au fichier des gagnants."""
+    record = {
+        "puzzle": name,
+        "profile": puzzle_profile(puzzle),
+        "winner": result.solver if result is not None and result.solved else None,
+        "moves": result.moves if result is not None else None,
+        "time": round(elapsed, 6),
+        "require": require,
+        "configs": list(configs),
+    }
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _run_config(puzzle: RushHourPuzzle, algorithm: str, options: SolveOptions, conn):
+    """Exécuté dans un processus du portefeuille : résout et renvoie as_dict() (ou l'erreur) par le tube."""
+    try:
+        result = solve(puzzle, algorithm, options)
+        conn.send((result.as_dict(), None))
+    except Exception as e:
+        conn.send((None, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _result_from_dict(puzzle: RushHourPuzzle, algorithm: str, data: dict) -> SolveResult:
+    from solution_optimizer import solution_to_node
+    node = None
+    if data["solution"] is not None:
+        node = solution_to_node(puzzle, [(vid, int(d)) for vid, d in data["solution"]])
+    result = SolveResult(algorithm, node, data["explored"], data["expanded"], data["generated"],
+                         data["stored"], data["timings"], data["bound"])
+    result.peak_memory = data["peak_memory"]
+    result.budget_exhausted = data.get("budget_exhausted", False)
+    return result
+
+
+def solve_portfolio(puzzle: RushHourPuzzle,
+                    configs: Sequence[str] = DEFAULT_CONFIGS,
+                    require: str = "any",
+                    workers: Optional[int] = None,
+                    time_budget: Optional[float] = None,
+                    selector: Optional[PortfolioSelector] = None,
+                    errors: Optional[Dict[str, str]] = None) -> Optional[SolveResult]:
+    """
+    Course entre configs (noms du catalogue). Retourne le résultat du gagnant
+    (result.solver = configuration gagnante), ou None si aucune configuration ne
+    satisfait require dans time_budget secondes. Si aucune ne trouve de solution
+    mais qu'au moins une termine, son résultat (non résolu) est retourné.
+    errors, s'il est fourni, reçoit {configuration: message} des échecs.
+    """
+    if require not in GUARANTEES:
+        raise ValueError(f"Garantie inconnue : {require} (choix : {', '.join(GUARANTEES)})")
+    catalog = algorithm_catalog()
+    unknown = [c for c in configs if c not in catalog]
+    if unknown:
+        raise ValueError(f"Configurations inconnues : {', '.join(unknown)}")
+    candidates = [c for c in configs if c != "portfolio" and (require == "any" or is_optimal(c))]
+    if not candidates:
+        raise ValueError(f"Aucune configuration ne garantit : {require}")
+    if selector is not None:
+        candidates = selector.order(puzzle, candidates)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(candidates)))
+
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    pending = list(candidates)
+    running = {}  # tube -> (configuration, processus)
+    fallback: Optional[SolveResult] = None
+
+    def launch():
+        while pending and len(running) < workers:
+            algorithm = pending.pop(0)
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_config, args=(puzzle, algorithm, SolveOptions(), writer),
+                                              daemon=True)
+            process.start()
+            writer.close()
+            running[reader] = (algorithm, process)
+
+    def stop_all():
+        for _, process in running.values():
+            process.terminate()
+        for reader, (_, process) in running.items():
+            process.join()
+            reader.close()
+        running.clear()
+
+    try:
+        launch()
+        while running:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            ready = wait(list(running), timeout)
+            if not ready:
+                return fallback  # budget épuisé
+            for reader in ready:
+                algorithm, process = running.pop(reader)
+                try:
+                    data, error = reader.recv()
+                except EOFError:
+                    data, error = None, f"processus terminé (code {process.exitcode})"
+                reader.close()
+                process.join()
+                if error is not None:
+                    if errors is not None:
+                        errors[algorithm] = error
+                    continue
+                result = _result_from_dict(puzzle, algorithm, data)
+                if result.solved:
+                    return result
+                if fallback is None:
+                    fallback = result
+            launch()
+        return fallback
+    finally:
+        stop_all()
+
+
+@register_solver("portfolio", "Portefeuille (course entre solveurs)")
+def _solve_portfolio(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    start = time.perf_counter()
+    extra = options.extra
+    records = extra.get("record")
+    selector = PortfolioSelector.from_records(records) if records else None
+    result = solve_portfolio(puzzle, extra.get("configs", DEFAULT_CONFIGS), extra.get("require", "any"),
+                             extra.get("workers"), options.time_budget, selector)
+    if result is None:
+        result = SolveResult("portfolio", None, 0, 0, 0)
+        result.budget_exhausted = True
+    if records:
+        record_winner(records, extra.get("name", ""), puzzle, result, extra.get("configs", DEFAULT_CONFIGS),
+                      extra.get("require", "any"), time.perf_counter() - start)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from puzzle_corpus import iter_named_puzzles
+
+    parser = argparse.ArgumentParser(description="Course entre solveurs ; enregistre le gagnant de chaque puzzle.")
+    parser.add_argument("puzzle", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    parser.add_argument("--configs", default=",".join(DEFAULT_CONFIGS),
+                        help="Configurations du catalogue, séparées par des virgules")
+    parser.add_argument("--require", choices=GUARANTEES, default="any")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--time-budget", type=float, default=None, help="Secondes par puzzle")
+    parser.add_argument("--record", default=None, help="Fichier JSON lines des gagnants (lu puis complété)")
+    args = parser.parse_args()
+
+    configs = [c.strip() for c in args.configs.split(",") if c.strip()]
+    selector = PortfolioSelector.from_records(args.record) if args.record else None
+    for name, game in iter_named_puzzles(args.puzzle):
+        start = time.perf_counter()
+        failures: Dict[str, str] = {}
+        result = solve_portfolio(game, configs, args.require, args.workers, args.time_budget, selector, failures)
+        elapsed = time.perf_counter() - start
+        if result is None or not result.solved:
+            print(f"{name} : aucune solution ({elapsed:.3f}s)")
+        else:
+            print(f"{name} : {result.solver} gagne, {result.moves} mouvements ({elapsed:.3f}s)")
+        for algorithm, message in failures.items():
+            print(f"  {algorithm} : {message}")
+        if args.record:
+            record_winner(args.record, name, game, result, configs, args.require, elapsed)
+            if result is not None and result.solved:
+                selector.update(puzzle_profile(game), result.solver)
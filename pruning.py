@@ -0,0 +1,132 @@
+#pruning.py
+"""
+Détection rapide des puzzles insolubles, par analyse statique de la
+disposition (murs, orientations, longueurs), avant toute recherche.
+
+Les mouvements étant réversibles, tous les états atteignables depuis un état
+donné partagent sa solubilité : un test par état n'élague donc jamais rien
+dans une recherche partie d'un état soluble. Le test est donc appliqué une
+seule fois, sur l'état de départ, par les solveurs.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from rush_hour_puzzle import RushHourPuzzle, Vehicle
+
+
+def _to_exit_frame(puzzle: RushHourPuzzle):
+    """
+    Change de repère pour que la sortie soit toujours "à droite" :
+    a = coordonnée le long de la ligne de sortie (croissante vers la sortie),
+    b = coordonnée transverse (index de la ligne de sortie = exit_index).
+    Retourne (longueur de la ligne, largeur transverse, murs, fonction véhicule -> (parallèle, a0, b0)).
+    """
+    geo = puzzle.geometry()
+    side = geo.exit_side
+    width, height = puzzle.board_width, puzzle.board_height
+    along, across = (width, height) if geo.horizontal_exit else (height, width)
+    parallel_orientation = 'H' if geo.horizontal_exit else 'V'
+
+    def cell(x: int, y: int) -> Tuple[int, int]:
+        if side == 'E':
+            return x, y
+        if side == 'W':
+            return width - 1 - x, y
+        if side == 'S':
+            return y, x
+        return height - 1 - y, x
+
+    def vehicle(v: Vehicle) -> Tuple[bool, int, int]:
+        parallel = v.orientation == parallel_orientation
+        ends = [(v.x + k, v.y) if v.orientation == 'H' else (v.x, v.y + k) for k in (0, v.length - 1)]
+        if parallel:
+            a0 = min(cell(*end)[0] for end in ends)
+            b0 = cell(*ends[0])[1]
+        else:
+            a0 = cell(*ends[0])[0]
+            b0 = min(cell(*end)[1] for end in ends)
+        return parallel, a0, b0
+
+    walls = {cell(x, y) for x, y in puzzle.walls}
+    return along, across, walls, vehicle
+
+
+def _free_segment(walls, across: int, column: int, row: int) -> Tuple[int, int]:
+    """Plus grand intervalle transverse sans mur contenant row sur la colonne column."""
+    top = row
+    while top - 1 >= 0 and (column, top - 1) not in walls:
+        top -= 1
+    bottom = row
+    while bottom + 1 < across and (column, bottom + 1) not in walls:
+        bottom += 1
+    return top, bottom
+
+
+def _column_can_clear(lengths: List[int], top: int, bottom: int, exit_row: int) -> bool:
+    """
+    Les véhicules transverses d'une colonne (dans l'ordre, ils ne peuvent pas se croiser)
+    peuvent-ils tous quitter la ligne de sortie ? Il faut une coupure j telle que les j
+    premiers tiennent d'un côté de la ligne et les autres de l'autre.
+    """
+    above_room = exit_row - top
+    below_room = bottom - exit_row
+    total = sum(lengths)
+    prefix = 0
+    for j in range(len(lengths) + 1):
+        if prefix <= above_room and total - prefix <= below_room:
+            return True
+        if j < len(lengths):
+            prefix += lengths[j]
+    return False
+
+
+def unsolvable_reason(puzzle: RushHourPuzzle) -> Optional[str]:
+    """Retourne la raison pour laquelle le puzzle est prouvé insoluble, ou None si rien n'est prouvé."""
+    geo = puzzle.geometry()
+    target_id = geo.target_id
+    target = puzzle.target_vehicle()
+    if target is None:
+        return f"Aucune voiture cible '{target_id}'."
+    expected = 'H' if geo.horizontal_exit else 'V'
+    if target.orientation != expected:
+        return f"La voiture cible '{target_id}' n'est pas orientée vers la sortie ({geo.exit_side})."
+    exit_row = geo.exit_index
+    if geo.goal is None:
+        return f"La voiture cible '{target_id}' n'est pas sur la ligne de sortie ({exit_row})."
+
+    along, across, walls, frame = _to_exit_frame(puzzle)
+    if target.length > along:
+        return f"La voiture cible '{target_id}' est plus longue que le plateau."
+    _, target_a, _ = frame(target)
+    path_start = target_a + target.length
+
+    for a, b in walls:
+        if b == exit_row and path_start <= a < along:
+            return f"Mur sur le chemin de la sortie (ligne {exit_row})."
+
+    columns: Dict[int, List[Tuple[int, Vehicle]]] = {}
+    for v in puzzle.vehicles:
+        if v.id == target_id:
+            continue
+        parallel, a0, b0 = frame(v)
+        if parallel:
+            if b0 == exit_row and a0 >= path_start:
+                return f"Le véhicule {v.id} bloque définitivement la ligne de sortie."
+        elif path_start <= a0 < along:
+            columns.setdefault(a0, []).append((b0, v))
+
+    for column, vehicles in columns.items():
+        if (column, exit_row) in walls:
+            continue
+        top, bottom = _free_segment(walls, across, column, exit_row)
+        in_segment = sorted(((b0, v) for b0, v in vehicles if top <= b0 and b0 + v.length - 1 <= bottom),
+                            key=lambda item: item[0])
+        if not in_segment:
+            continue
+        if not _column_can_clear([v.length for _, v in in_segment], top, bottom, exit_row):
+            ids = ", ".join(v.id for _, v in in_segment)
+            return f"{ids} ne peuvent jamais libérer la ligne de sortie."
+    return None
+
+
+def is_unsolvable(puzzle: RushHourPuzzle) -> bool:
+    return unsolvable_reason(puzzle) is not None
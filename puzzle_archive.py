@@ -0,0 +1,215 @@
+#puzzle_archive.py
+"""
+Format binaire compact pour stocker de nombreux puzzles dans un seul fichier.
+
+Disposition du fichier (little-endian) :
+    en-tête  : magic 'RHPZ' | version u16 | réservé u16 | nombre de puzzles u32 | offset de l'index u64
+    puzzles  : largeur u8 | hauteur u8 | nb murs u8 | nb véhicules u8
+               sortie   : côté u8 'E'/'W'/'N'/'S' | index u8 (255 = défaut) | len(id cible) u8, id cible   (version 2)
+               murs     : (x u8, y u8) * nb murs
+               véhicules: (len(id) u8, id, x u8, y u8, orientation u8 'H'/'V', longueur u8) * nb véhicules
+    index    : offset u64 de chaque puzzle
+
+La lecture passe par mmap : l'index et les enregistrements sont décodés
+directement depuis la mémoire projetée, sans copie ni parsing texte.
+"""
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, List
+
+from rush_hour_puzzle import RushHourPuzzle, Vehicle
+
+MAGIC = b'RHPZ'
+VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+DEFAULT_INDEX = 255
+HEADER = struct.Struct('<4sHHIQ')
+RECORD_HEADER = struct.Struct('<BBBB')
+WALL = struct.Struct('<BB')
+EXIT = struct.Struct('<cBB')
+VEHICLE_TAIL = struct.Struct('<BBcB')
+OFFSET = struct.Struct('<Q')
+
+
+def encode_puzzle(puzzle: RushHourPuzzle) -> bytes:
+    """Encode un puzzle (dimensions, murs, véhicules) en un enregistrement binaire."""
+    if puzzle.board_width > 255 or puzzle.board_height > 255:
+        raise ValueError("Les dimensions du plateau doivent tenir sur un octet.")
+    if len(puzzle.walls) > 255 or len(puzzle.vehicles) > 255:
+        raise ValueError("Trop de murs ou de véhicules pour le format binaire.")
+    parts = [RECORD_HEADER.pack(puzzle.board_width, puzzle.board_height,
+                                len(puzzle.walls), len(puzzle.vehicles))]
+    target = puzzle.target_id.encode('utf-8')
+    exit_index = DEFAULT_INDEX if puzzle.exit_index is None else puzzle.exit_index
+    parts.append(EXIT.pack(puzzle.exit_side.encode('ascii'), exit_index, len(target)) + target)
+    for x, y in puzzle.walls:
+        parts.append(WALL.pack(x, y))
+    for v in puzzle.vehicles:
+        vid = v.id.encode('utf-8')
+        parts.append(bytes((len(vid),)) + vid)
+        parts.append(VEHICLE_TAIL.pack(v.x, v.y, v.orientation.encode('ascii'), v.length))
+    return b''.join(parts)
+
+
+def decode_puzzle(buffer, offset: int = 0, version: int = VERSION) -> RushHourPuzzle:
+    """Décode l'enregistrement situé à offset dans buffer (bytes, memoryview ou mmap)."""
+    width, height, n_walls, n_vehicles = RECORD_HEADER.unpack_from(buffer, offset)
+    offset += RECORD_HEADER.size
+    puzzle = RushHourPuzzle(height, width)
+    if version >= 2:
+        side, exit_index, target_len = EXIT.unpack_from(buffer, offset)
+        offset += EXIT.size
+        puzzle.exit_side = side.decode('ascii')
+        puzzle.exit_index = None if exit_index == DEFAULT_INDEX else exit_index
+        puzzle.target_id = bytes(buffer[offset:offset + target_len]).decode('utf-8')
+        offset += target_len
+    walls = []
+    for _ in range(n_walls):
+        walls.append(WALL.unpack_from(buffer, offset))
+        offset += WALL.size
+    vehicles = []
+    for _ in range(n_vehicles):
+        id_len = buffer[offset]
+        vid = bytes(buffer[offset + 1:offset + 1 + id_len]).decode('utf-8')
+        offset += 1 + id_len
+        x, y, orientation, length = VEHICLE_TAIL.unpack_from(buffer, offset)
+        offset += VEHICLE_TAIL.size
+        vehicles.append(Vehicle(vid, x, y, orientation.decode('ascii'), length))
+    puzzle.walls = walls
+    puzzle.vehicles = vehicles
+    return puzzle
+
+
+class PuzzleArchiveWriter:
+    """
+    Écrit les puzzles au fil de l'eau ; l'index et l'en-tête définitif
+    sont écrits à la fermeture.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets: List[int] = []
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+
+    def add(self, puzzle: RushHourPuzzle):
+        self.offsets.append(self._file.tell())
+        self._file.write(encode_puzzle(puzzle))
+
+    def add_all(self, puzzles: Iterable[RushHourPuzzle]):
+        for puzzle in puzzles:
+            self.add(puzzle)
+
+    def close(self):
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(b''.join(OFFSET.pack(o) for o in self.offsets))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, len(self.offsets), index_offset))
+        self._file.close()
+
+    def __enter__(self) -> 'PuzzleArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PuzzleArchive:
+    """
+    Lecteur à accès aléatoire d'une archive de puzzles, projetée en mémoire.
+    archive[i] décode uniquement le i-ème puzzle.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Archive vide ou invalide : {path}")
+        self._view = memoryview(self._mmap)
+        magic, version, _, count, index_offset = HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Fichier {path} : ce n'est pas une archive de puzzles.")
+        if version not in SUPPORTED_VERSIONS:
+            self.close()
+            raise ValueError(f"Fichier {path} : version {version} non supportée.")
+        self.count = count
+        self.version = version
+        self._index_offset = index_offset
+
+    def __len__(self) -> int:
+        return self.count
+
+    def offset(self, i: int) -> int:
+        return OFFSET.unpack_from(self._view, self._index_offset + i * OFFSET.size)[0]
+
+    def __getitem__(self, i: int) -> RushHourPuzzle:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("Indice de puzzle hors limites.")
+        return decode_puzzle(self._view, self.offset(i), self.version)
+
+    def __iter__(self) -> Iterator[RushHourPuzzle]:
+        for i in range(self.count):
+            yield decode_puzzle(self._view, self.offset(i), self.version)
+
+    def close(self):
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> 'PuzzleArchive':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_archive(path: str, puzzles: Iterable[RushHourPuzzle]) -> int:
+    """Écrit tous les puzzles dans une archive et retourne leur nombre."""
+    with PuzzleArchiveWriter(path) as writer:
+        writer.add_all(puzzles)
+        return len(writer.offsets)
+
+
+def load_archive(path: str) -> List[RushHourPuzzle]:
+    """Charge d'un coup tous les puzzles d'une archive."""
+    with PuzzleArchive(path) as archive:
+        return list(archive)
+
+
+def convert_csv_files(csv_paths: Iterable[str], out_path: str) -> int:
+    """Convertit des fichiers CSV (format setVehicles) en une archive binaire."""
+    def puzzles():
+        for csv_path in csv_paths:
+            puzzle = RushHourPuzzle()
+            puzzle.setVehicles(csv_path)
+            yield puzzle
+    return write_archive(out_path, puzzles())
+
+
+def find_csv_files(directory: str) -> List[str]:
+    return sorted(os.path.join(root, name)
+                  for root, _, files in os.walk(directory)
+                  for name in files if name.lower().endswith('.csv'))
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 3:
+        print("Usage : python puzzle_archive.py <sortie.rhpz> <fichier.csv|dossier> ...")
+        sys.exit(1)
+    sources: List[str] = []
+    for arg in sys.argv[2:]:
+        sources.extend(find_csv_files(arg) if os.path.isdir(arg) else [arg])
+    n = convert_csv_files(sources, sys.argv[1])
+    print(f"{n} puzzles écrits dans {sys.argv[1]}")
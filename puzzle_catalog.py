@@ -0,0 +1,409 @@
+#puzzle_catalog.py
+"""
+Catalogue local de puzzles dans un fichier SQLite (bibliothèque standard).
+
+Chaque puzzle est stocké une fois, sous son nom dans la source (chemin CSV,
+membre de zip...), au format texte de setVehicles, avec ses caractéristiques
+(dimensions, véhicules, murs, bloqueurs de la sortie) et deux empreintes :
+    layout     disposition sans les positions (dimensions, murs, voies des
+               véhicules, sortie) : les puzzles de même disposition sont des
+               états d'un même plateau ;
+    canonical  état canonique (rush_hour_puzzle.canonical_key), indépendant de
+               l'ordre des véhicules et des murs dans la source.
+Les solutions sont rangées par empreinte canonique : longueur, optimalité,
+solveur, statistiques de recherche et liste des mouvements. Deux fichiers
+décrivant le même puzzle partagent donc la même solution.
+
+    python puzzle_catalog.py rush_hour.db import data
+    python puzzle_catalog.py rush_hour.db solve --algo bfs
+    python puzzle_catalog.py rush_hour.db query --min-moves 30 --walls
+
+Les filtres de longueur (min_moves, max_moves) portent sur la longueur
+optimale : une solution non optimale ne dit rien de la difficulté du puzzle.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rush_hour_puzzle import RushHourPuzzle, canonical_key
+
+SCHEMA_VERSION = 1
+BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS puzzles (
+    id        INTEGER PRIMARY KEY,
+    name      TEXT NOT NULL UNIQUE,
+    source    TEXT,
+    mtime     REAL,
+    width     INTEGER NOT NULL,
+    height    INTEGER NOT NULL,
+    vehicles  INTEGER NOT NULL,
+    walls     INTEGER NOT NULL,
+    blockers  INTEGER NOT NULL,
+    layout    TEXT NOT NULL,
+    canonical TEXT NOT NULL,
+    csv       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS puzzles_layout ON puzzles (layout);
+CREATE INDEX IF NOT EXISTS puzzles_canonical ON puzzles (canonical);
+CREATE INDEX IF NOT EXISTS puzzles_source ON puzzles (source);
+CREATE TABLE IF NOT EXISTS solutions (
+    canonical TEXT PRIMARY KEY,
+    solvable  INTEGER NOT NULL,
+    moves     INTEGER,
+    optimal   INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    explored  INTEGER,
+    expanded  INTEGER,
+    generated INTEGER,
+    stored    INTEGER,
+    time      REAL,
+    solution  TEXT,
+    solved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solutions_moves ON solutions (moves);
+"""
+
+PUZZLE_COLUMNS = ("name", "source", "mtime", "width", "height", "vehicles", "walls", "blockers",
+                  "layout", "canonical", "csv")
+
+
+def _digest(key: Tuple) -> str:
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+
+def layout_signature(puzzle: RushHourPuzzle) -> str:
+    """Empreinte de la disposition : dimensions, murs, voies (orientation, longueur, cible) et sortie."""
+    geo = puzzle.geometry()
+    lanes = sorted((v.orientation, v.length, v.y if v.orientation == 'H' else v.x, v.id == geo.target_id)
+                   for v in puzzle.vehicles)
+    return _digest((puzzle.board_width, puzzle.board_height, tuple(sorted(puzzle.walls)), tuple(lanes),
+                    geo.exit_side, geo.exit_index))
+
+
+def canonical_hash(puzzle: RushHourPuzzle) -> str:
+    """Empreinte de l'état canonique (même puzzle quel que soit l'ordre des lignes de la source)."""
+    return _digest(canonical_key(puzzle))
+
+
+def puzzle_to_csv(puzzle: RushHourPuzzle) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(puzzle.csv_rows())
+    return buffer.getvalue()
+
+
+def puzzle_from_csv(text: str) -> RushHourPuzzle:
+    puzzle = RushHourPuzzle()
+    puzzle.setVehiclesFromLines(io.StringIO(text))
+    return puzzle
+
+
+def _puzzle_row(name: str, puzzle: RushHourPuzzle, source: Optional[str], mtime: Optional[float]) -> tuple:
+    return (name, source, mtime, puzzle.board_width, puzzle.board_height, len(puzzle.vehicles),
+            len(puzzle.walls), len(puzzle.exit_lane_vehicles()), layout_signature(puzzle),
+            canonical_hash(puzzle), puzzle_to_csv(puzzle))
+
+
+class PuzzleCatalog:
+    """
+    Catalogue SQLite : insertion en masse, requêtes sur les caractéristiques
+    et les solutions connues, sans relire ni re-résoudre les puzzles.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None:
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+            elif int(row[0]) != SCHEMA_VERSION:
+                raise ValueError(f"Catalogue {path} : schéma {row[0]} non supporté (attendu {SCHEMA_VERSION}).")
+
+    # ------------------------------------------------------------------ insertion
+
+    def add(self, name: str, puzzle: RushHourPuzzle, source: Optional[str] = None,
+            mtime: Optional[float] = None):
+        """Ajoute ou remplace le puzzle name."""
+        self.add_many([(name, puzzle)], source, {name: mtime} if mtime is not None else None)
+
+    def add_many(self, puzzles: Iterable[Tuple[str, RushHourPuzzle]], source: Optional[str] = None,
+                 mtimes: Optional[Dict[str, float]] = None) -> int:
+        """Insertion en masse (une transaction par BATCH_SIZE puzzles) ; retourne le nombre de puzzles."""
+        sql = (f"INSERT INTO puzzles ({', '.join(PUZZLE_COLUMNS)}) VALUES ({', '.join('?' * len(PUZZLE_COLUMNS))}) "
+               f"ON CONFLICT (name) DO UPDATE SET "
+               + ", ".join(f"{c} = excluded.{c}" for c in PUZZLE_COLUMNS[1:]))
+        count = 0
+        batch = []
+        for name, puzzle in puzzles:
+            batch.append(_puzzle_row(name, puzzle, source, mtimes.get(name) if mtimes else None))
+            if len(batch) >= BATCH_SIZE:
+                with self.conn:
+                    self.conn.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            with self.conn:
+                self.conn.executemany(sql, batch)
+            count += len(batch)
+        return count
+
+    def import_source(self, source: str, width: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Importe une source de puzzle_corpus. Pour un dossier, seuls les CSV
+        nouveaux ou modifiés (date de modification) sont relus, et ceux qui ont
+        disparu sont retirés. Retourne (puzzles importés, puzzles inchangés).
+        """
+        from puzzle_archive import find_csv_files
+        from puzzle_corpus import iter_named_puzzles
+        if not os.path.isdir(source):
+            return self.add_many(iter_named_puzzles(source, width), source), 0
+
+        known = {row["name"]: row["mtime"] for row in
+                 self.conn.execute("SELECT name, mtime FROM puzzles WHERE source = ?", (source,))}
+        paths = find_csv_files(source)
+        mtimes = {path: os.path.getmtime(path) for path in paths}
+        changed = [path for path in paths if known.get(path) != mtimes[path]]
+        removed = [(name,) for name in known if name not in mtimes]
+        if removed:
+            with self.conn:
+                self.conn.executemany("DELETE FROM puzzles WHERE name = ?", removed)
+
+        def parsed():
+            for path in changed:
+                puzzle = RushHourPuzzle()
+                puzzle.setVehicles(path)
+                yield path, puzzle
+        return self.add_many(parsed(), source, mtimes), len(paths) - len(changed)
+
+    # ------------------------------------------------------------------ lecture
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    def __contains__(self, name: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM puzzles WHERE name = ?", (name,)).fetchone() is not None
+
+    def names(self, source: Optional[str] = None) -> List[str]:
+        if source is None:
+            rows = self.conn.execute("SELECT name FROM puzzles ORDER BY id")
+        else:
+            rows = self.conn.execute("SELECT name FROM puzzles WHERE source = ? ORDER BY id", (source,))
+        return [row[0] for row in rows]
+
+    def get(self, name: str) -> RushHourPuzzle:
+        row = self.conn.execute("SELECT csv FROM puzzles WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Erreur: Puzzle {name} absent du catalogue {self.path}")
+        return puzzle_from_csv(row[0])
+
+    def __iter__(self):
+        """Couples (nom, puzzle), dans l'ordre d'insertion (lus un par un : aucun verrou gardé entre deux)."""
+        ids = [row[0] for row in self.conn.execute("SELECT id FROM puzzles ORDER BY id")]
+        for puzzle_id in ids:
+            row = self.conn.execute("SELECT name, csv FROM puzzles WHERE id = ?", (puzzle_id,)).fetchone()
+            if row is not None:
+                yield row[0], puzzle_from_csv(row[1])
+
+    def query(self, min_moves: Optional[int] = None, max_moves: Optional[int] = None,
+              walls: Optional[bool] = None, solved: Optional[bool] = None, optimal: Optional[bool] = None,
+              width: Optional[int] = None, height: Optional[int] = None,
+              min_vehicles: Optional[int] = None, max_vehicles: Optional[int] = None,
+              layout: Optional[str] = None, canonical: Optional[str] = None, source: Optional[str] = None,
+              order_by: str = "id", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Puzzles filtrés sur leurs caractéristiques et leur solution connue
+        (ex. query(min_moves=30, walls=True)). min_moves et max_moves impliquent
+        optimal=True, sauf si optimal=False est demandé explicitement. Chaque
+        entrée est un dict des colonnes de puzzles (sans le CSV) et de
+        solutions (sans les mouvements).
+        """
+        clauses, params = [], []
+        if optimal is None and (min_moves is not None or max_moves is not None):
+            optimal = True
+
+        def where(clause, *values):
+            clauses.append(clause)
+            params.extend(values)
+
+        if min_moves is not None:
+            where("s.moves >= ?", min_moves)
+        if max_moves is not None:
+            where("s.moves <= ?", max_moves)
+        if walls is not None:
+            where("p.walls > 0" if walls else "p.walls = 0")
+        if solved is not None:
+            where("s.moves IS NOT NULL" if solved else "s.moves IS NULL")
+        if optimal is not None:
+            where("s.optimal = ?", int(optimal))
+        for column, value in (("width", width), ("height", height), ("layout", layout),
+                              ("canonical", canonical), ("source", source)):
+            if value is not None:
+                where(f"p.{column} = ?", value)
+        if min_vehicles is not None:
+            where("p.vehicles >= ?", min_vehicles)
+        if max_vehicles is not None:
+            where("p.vehicles <= ?", max_vehicles)
+        if order_by not in ("id", "name", "moves", "vehicles", "time"):
+            raise ValueError(f"Tri inconnu : {order_by}")
+        sql = ("SELECT p.id, p.name, p.source, p.width, p.height, p.vehicles, p.walls, p.blockers, "
+               "p.layout, p.canonical, s.solvable, s.moves, s.optimal, s.algorithm, s.explored, "
+               "s.expanded, s.generated, s.stored, s.time "
+               "FROM puzzles p LEFT JOIN solutions s ON s.canonical = p.canonical")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {'s.' if order_by in ('moves', 'time') else 'p.'}{order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def same_layout(self, puzzle: RushHourPuzzle) -> List[str]:
+        """Noms des puzzles qui partagent la disposition de puzzle."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM puzzles WHERE layout = ? ORDER BY id", (layout_signature(puzzle),))]
+
+    def duplicates(self, puzzle: RushHourPuzzle) -> List[str]:
+        """Noms des puzzles identiques à puzzle (même état canonique)."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM puzzles WHERE canonical = ? ORDER BY id", (canonical_hash(puzzle),))]
+
+    # ------------------------------------------------------------------ solutions
+
+    def record_solution(self, puzzle: RushHourPuzzle, algorithm: str, result, optimal: bool,
+                        exhaustive: bool = False) -> bool:
+        """
+        Enregistre le résultat (SolveResult) d'un solveur pour l'état canonique
+        de puzzle. Un échec n'est retenu que si exhaustive (recherche complète
+        d'un solveur optimal, sans budget) : le puzzle est alors insoluble. Une
+        solution optimale n'est jamais remplacée par une solution qui ne l'est
+        pas ; à optimalité égale, la plus courte l'emporte. Retourne True si
+        l'enregistrement a changé.
+        """
+        if not result.solved and not (exhaustive and optimal):
+            return False
+        key = canonical_hash(puzzle)
+        current = self.conn.execute("SELECT solvable, moves, optimal FROM solutions WHERE canonical = ?",
+                                    (key,)).fetchone()
+        moves = result.moves
+        if current is not None:
+            if current["optimal"] and not optimal:
+                return False
+            if current["optimal"] == int(optimal) and current["solvable"] and result.solved \
+                    and current["moves"] <= moves:
+                return False
+        solution = json.dumps([[vid, d] for vid, d in result.path]) if result.solved else None
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO solutions (canonical, solvable, moves, optimal, algorithm, explored, "
+                "expanded, generated, stored, time, solution, solved_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, int(result.solved), moves, int(optimal), algorithm, result.explored, result.expanded,
+                 result.generated, result.stored, result.time, solution, time.time()))
+        return True
+
+    def solution(self, name: str) -> Optional[Dict[str, Any]]:
+        """Solution connue du puzzle name (dict, mouvements décodés dans "solution"), ou None."""
+        row = self.conn.execute("SELECT s.* FROM puzzles p JOIN solutions s ON s.canonical = p.canonical "
+                                "WHERE p.name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        if entry["solution"] is not None:
+            entry["solution"] = [(vid, d) for vid, d in json.loads(entry["solution"])]
+        return entry
+
+    def solve_missing(self, algorithm: str = "bfs", time_budget: Optional[float] = None,
+                      limit: Optional[int] = None, verbose: bool = False) -> int:
+        """Résout une fois chaque état canonique sans solution enregistrée ; retourne le nombre de résolutions."""
+        from portfolio import is_optimal
+        from solver import SolveOptions, solve
+        optimal = is_optimal(algorithm)
+        sql = ("SELECT name, csv FROM puzzles WHERE id IN (SELECT MIN(p.id) FROM puzzles p "
+               "LEFT JOIN solutions s ON s.canonical = p.canonical WHERE s.canonical IS NULL "
+               "GROUP BY p.canonical) ORDER BY id")
+        rows = self.conn.execute(sql + (" LIMIT ?" if limit is not None else ""),
+                                 (limit,) if limit is not None else ()).fetchall()
+        for name, text in rows:
+            puzzle = puzzle_from_csv(text)
+            result = solve(puzzle, algorithm, SolveOptions(time_budget=time_budget))
+            self.record_solution(puzzle, algorithm, result, optimal, exhaustive=not result.budget_exhausted)
+            if verbose:
+                moves = result.moves if result.solved else "-"
+                print(f"{name:<32} {moves:>5} coups {result.time:9.3f}s")
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS puzzles, COUNT(DISTINCT p.canonical) AS distinct_puzzles, "
+            "COUNT(DISTINCT p.layout) AS layouts, COUNT(s.canonical) AS solved_entries, "
+            "SUM(s.solvable = 0) AS unsolvable, MAX(s.moves) AS max_moves "
+            "FROM puzzles p LEFT JOIN solutions s ON s.canonical = p.canonical").fetchone()
+        return dict(row)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'PuzzleCatalog':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Catalogue SQLite de puzzles et de leurs solutions.")
+    parser.add_argument("catalog", help="Fichier SQLite (créé s'il n'existe pas)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p_import = commands.add_parser("import", help="Importe des sources de puzzles (dossier, .zip, .rhpz, texte)")
+    p_import.add_argument("sources", nargs="+")
+    p_import.add_argument("--width", type=int, default=None, help="Largeur des plateaux des fichiers texte")
+    p_solve = commands.add_parser("solve", help="Résout les puzzles sans solution enregistrée")
+    p_solve.add_argument("--algo", default="bfs", help="Algorithme du catalogue de solveurs (défaut : bfs)")
+    p_solve.add_argument("--time-budget", type=float, default=None)
+    p_solve.add_argument("--limit", type=int, default=None)
+    p_query = commands.add_parser("query", help="Liste les puzzles qui satisfont les filtres")
+    p_query.add_argument("--min-moves", type=int, default=None, help="Longueur optimale minimale")
+    p_query.add_argument("--max-moves", type=int, default=None, help="Longueur optimale maximale")
+    p_query.add_argument("--walls", dest="walls", action="store_true", default=None)
+    p_query.add_argument("--no-walls", dest="walls", action="store_false")
+    p_query.add_argument("--unsolved", action="store_true", help="Puzzles sans solution enregistrée")
+    p_query.add_argument("--width", type=int, default=None)
+    p_query.add_argument("--height", type=int, default=None)
+    p_query.add_argument("--order-by", default="id", choices=["id", "name", "moves", "vehicles", "time"])
+    p_query.add_argument("--limit", type=int, default=None)
+    commands.add_parser("stats", help="Résumé du catalogue")
+    args = parser.parse_args()
+
+    with PuzzleCatalog(args.catalog) as catalog:
+        if args.command == "import":
+            for source in args.sources:
+                start = time.perf_counter()
+                imported, unchanged = catalog.import_source(source, args.width)
+                print(f"{source} : {imported} importés, {unchanged} inchangés ({time.perf_counter() - start:.2f}s)")
+        elif args.command == "solve":
+            n = catalog.solve_missing(args.algo, args.time_budget, args.limit, verbose=True)
+            print(f"{n} puzzles résolus")
+        elif args.command == "query":
+            rows = catalog.query(args.min_moves, args.max_moves, args.walls, solved=False if args.unsolved else None,
+                                 width=args.width, height=args.height, order_by=args.order_by, limit=args.limit)
+            for row in rows:
+                moves = row["moves"] if row["moves"] is not None else "-"
+                print(f"{row['name']:<40} {row['width']}x{row['height']} {row['vehicles']:>3} véhicules "
+                      f"{row['walls']:>3} murs {moves:>5} coups")
+            print(f"{len(rows)} puzzles")
+        else:
+            for key, value in catalog.stats().items():
+                print(f"{key:<18} {value}")
@@ -0,0 +1,196 @@
+#puzzle_corpus.py
+"""
+Lecture en flux de corpus de puzzles : les puzzles sont produits un par un
+par des générateurs, sans jamais charger tout le corpus en mémoire.
+
+Sources reconnues :
+    - dossier       : tous les *.csv (récursivement, ordre trié)
+    - archive .zip  : les membres *.csv, lus sans extraction (ex. data.zip)
+    - archive .rhpz : format binaire de puzzle_archive
+    - catalogue SQLite (.db, .sqlite) : voir puzzle_catalog
+    - fichier texte : un puzzle par ligne, encodé en chaîne de plateau
+      (ex. 36 caractères pour un 6x6 : 'o' ou '.' = vide, 'x' = mur,
+      lettres = véhicules, 'A' = voiture cible). Les lignes au format
+      "<coups> <plateau> <taille_cluster>" sont aussi acceptées.
+"""
+import io
+import math
+import os
+import zipfile
+from typing import Iterator, List, Optional, Tuple
+
+from rush_hour_puzzle import RushHourPuzzle, Vehicle
+
+EMPTY_CELLS = ('o', '.')
+WALL_CELL = 'x'
+TEXT_TARGET_ID = 'A'
+CATALOG_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+def parse_board_string(board: str, width: Optional[int] = None) -> RushHourPuzzle:
+    """
+    Construit un RushHourPuzzle depuis une chaîne de plateau ligne par ligne.
+    Sans largeur explicite, le plateau est supposé carré. La voiture cible 'A'
+    est renommée 'X' (convention de ce projet) ; un éventuel 'X' existant prend la place de 'A'.
+    """
+    board = board.strip()
+    if width is None:
+        width = math.isqrt(len(board))
+        if width * width != len(board):
+            raise ValueError(f"Plateau non carré de {len(board)} cases : précisez la largeur.")
+    if width <= 0 or len(board) % width != 0:
+        raise ValueError(f"Longueur de plateau {len(board)} incompatible avec la largeur {width}.")
+    height = len(board) // width
+
+    puzzle = RushHourPuzzle(height, width)
+    cells = {}
+    for i, c in enumerate(board):
+        x, y = i % width, i // width
+        if c in EMPTY_CELLS:
+            continue
+        if c == WALL_CELL:
+            puzzle.walls.append((x, y))
+            continue
+        cells.setdefault(c, []).append((x, y))
+
+    for c, positions in cells.items():
+        xs = {x for x, _ in positions}
+        ys = {y for _, y in positions}
+        if len(ys) == 1:
+            orientation = 'H'
+        elif len(xs) == 1:
+            orientation = 'V'
+        else:
+            raise ValueError(f"Véhicule {c} ni horizontal ni vertical.")
+        x0, y0 = min(xs), min(ys)
+        if c == TEXT_TARGET_ID:
+            vid = 'X'
+        elif c == 'X':
+            vid = TEXT_TARGET_ID
+        else:
+            vid = c
+        vehicle = Vehicle(vid, x0, y0, orientation, len(positions))
+        if vid == 'X':
+            puzzle.vehicles.insert(0, vehicle)
+        else:
+            puzzle.vehicles.append(vehicle)
+    return puzzle
+
+
+def parse_text_line(line: str, width: Optional[int] = None) -> Optional[RushHourPuzzle]:
+    """Décode une ligne de corpus texte ; retourne None pour les lignes vides ou commentaires."""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    tokens = line.split()
+    board = tokens[1] if len(tokens) >= 2 and tokens[0].isdigit() else tokens[0]
+    return parse_board_string(board, width)
+
+
+def iter_csv_directory(directory: str) -> Iterator[Tuple[str, RushHourPuzzle]]:
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith('.csv'):
+                continue
+            path = os.path.join(root, name)
+            puzzle = RushHourPuzzle()
+            puzzle.setVehicles(path)
+            yield path, puzzle
+
+
+def iter_zip(path: str) -> Iterator[Tuple[str, RushHourPuzzle]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = info.filename
+            with archive.open(info) as raw:
+                text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+                if name.lower().endswith('.csv'):
+                    puzzle = RushHourPuzzle()
+                    puzzle.setVehiclesFromLines(text)
+                    yield f"{path}:{name}", puzzle
+                elif name.lower().endswith('.txt'):
+                    for i, (_, puzzle) in enumerate(_iter_text_lines(text)):
+                        yield f"{path}:{name}:{i}", puzzle
+
+
+def _iter_text_lines(lines, width: Optional[int] = None) -> Iterator[Tuple[int, RushHourPuzzle]]:
+    for lineno, line in enumerate(lines, 1):
+        puzzle = parse_text_line(line, width)
+        if puzzle is not None:
+            yield lineno, puzzle
+
+
+def iter_text_file(path: str, width: Optional[int] = None) -> Iterator[Tuple[str, RushHourPuzzle]]:
+    with open(path, 'r', encoding='utf-8') as file:
+        for lineno, puzzle in _iter_text_lines(file, width):
+            yield f"{path}:{lineno}", puzzle
+
+
+def iter_rhpz(path: str) -> Iterator[Tuple[str, RushHourPuzzle]]:
+    from puzzle_archive import PuzzleArchive
+    with PuzzleArchive(path) as archive:
+        for i, puzzle in enumerate(archive):
+            yield f"{path}:{i}", puzzle
+
+
+def iter_catalog(path: str) -> Iterator[Tuple[str, RushHourPuzzle]]:
+    from puzzle_catalog import PuzzleCatalog
+    with PuzzleCatalog(path) as catalog:
+        yield from catalog
+
+
+def is_catalog(source: str) -> bool:
+    return source.lower().endswith(CATALOG_EXTENSIONS) and os.path.isfile(source)
+
+
+def iter_named_puzzles(source: str, width: Optional[int] = None) -> Iterator[Tuple[str, RushHourPuzzle]]:
+    """
+    Produit des couples (nom, puzzle) depuis une source quelconque.
+    Le nom identifie le puzzle dans sa source (chemin, membre de zip, numéro de ligne...).
+    """
+    if os.path.isdir(source):
+        return iter_csv_directory(source)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Erreur: Source non trouvée à {source}")
+    lower = source.lower()
+    if lower.endswith('.zip'):
+        return iter_zip(source)
+    if lower.endswith('.rhpz'):
+        return iter_rhpz(source)
+    if lower.endswith(CATALOG_EXTENSIONS):
+        return iter_catalog(source)
+    if lower.endswith('.csv'):
+        puzzle = RushHourPuzzle()
+        puzzle.setVehicles(source)
+        return iter([(source, puzzle)])
+    return iter_text_file(source, width)
+
+
+def iter_puzzles(source: str, width: Optional[int] = None) -> Iterator[RushHourPuzzle]:
+    """Produit uniquement les puzzles d'une source (voir iter_named_puzzles)."""
+    for _, puzzle in iter_named_puzzles(source, width):
+        yield puzzle
+
+
+def list_puzzle_names(source: str) -> List[str]:
+    """Noms des puzzles d'une source, dans l'ordre de lecture (sans relecture pour un catalogue)."""
+    if is_catalog(source):
+        from puzzle_catalog import PuzzleCatalog
+        with PuzzleCatalog(source) as catalog:
+            return catalog.names()
+    return [name for name, _ in iter_named_puzzles(source)]
+
+
+def load_named_puzzle(source: str, name: str) -> RushHourPuzzle:
+    """Retourne le puzzle nommé name dans source (arrêt dès qu'il est trouvé)."""
+    if is_catalog(source):
+        from puzzle_catalog import PuzzleCatalog
+        with PuzzleCatalog(source) as catalog:
+            return catalog.get(name)
+    for puzzle_name, puzzle in iter_named_puzzles(source):
+        if puzzle_name == name:
+            return puzzle
+    raise FileNotFoundError(f"Erreur: Puzzle {name} introuvable dans {source}")
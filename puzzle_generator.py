@@ -0,0 +1,284 @@
+#puzzle_generator.py
+"""
+Générateur de puzzles difficiles guidé par la recherche.
+
+Principe :
+    1. On tire au hasard une disposition valide (dimensions, murs, véhicules
+       avec leur orientation, leur longueur et leur voie fixe).
+    2. On explore la composante connexe de cette configuration (les
+       mouvements sont réversibles : BFS avant = BFS arrière).
+    3. Un BFS multi-sources depuis tous les états but de la composante donne
+       la distance optimale de chaque état ; l'état le plus éloigné est la
+       configuration la plus difficile, avec sa longueur optimale connue.
+
+Chaque disposition tirée sert à starts_per_layout configurations de départ
+(véhicules replacés au hasard sur leurs voies). Les véhicules de même voie et
+de même longueur sont interchangeables : chaque départ est ramené à sa forme
+canonique (canonical_state), sans quoi un simple échange de lettres donnerait
+une autre composante et le même puzzle une seconde fois. Les distances au but
+des composantes déjà explorées sont gardées par disposition, dans un LRU
+borné : un départ qui retombe dans une composante connue est écarté sans
+nouveau BFS. Les puzzles identiques aux lettres près (shape_key) ne sont
+retournés qu'une fois.
+La génération est répartie sur plusieurs processus.
+"""
+import os
+import random
+import string
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from board_layout import TARGET_ID, Layout, State, VehicleSpec
+from rush_hour_puzzle import RushHourPuzzle
+
+VEHICLE_IDS = [c for c in string.ascii_uppercase if c != TARGET_ID]
+STARTS_PER_LAYOUT = 20
+MAX_CACHED_LAYOUTS = 64
+MAX_CACHED_STATES = 4_000_000
+# Distance des états d'une composante sans état but
+UNSOLVABLE = -1
+
+
+def canonical_state(layout: Layout, state: State) -> State:
+    """
+    Forme canonique de state : dans chaque groupe de véhicules interchangeables
+    (hors cible, même orientation, longueur et voie), les positions sont
+    rangées dans l'ordre des véhicules de la disposition. Ces véhicules ne
+    pouvant pas se croiser sur leur voie, toute la composante d'un état
+    canonique est canonique.
+    """
+    groups: Dict[Tuple, List[int]] = {}
+    for i, (vid, orientation, length, fixed) in enumerate(layout.specs):
+        if vid != layout.target_id:
+            groups.setdefault((orientation, length, fixed), []).append(i)
+    canonical = list(state)
+    for indices in groups.values():
+        if len(indices) > 1:
+            for i, p in zip(indices, sorted(state[i] for i in indices)):
+                canonical[i] = p
+    return tuple(canonical)
+
+
+def shape_key(puzzle: RushHourPuzzle) -> Tuple:
+    """Clé d'un puzzle indépendante des lettres des véhicules (seule la cible est distinguée)."""
+    geo = puzzle.geometry()
+    return (puzzle.board_width,
+            puzzle.board_height,
+            tuple(sorted(puzzle.walls)),
+            tuple(sorted((v.orientation, v.length, v.x, v.y, v.id == geo.target_id) for v in puzzle.vehicles)),
+            geo.exit_side,
+            geo.exit_index)
+
+
+def random_layout(rng: random.Random,
+                  width: int = 6,
+                  height: int = 6,
+                  n_vehicles: int = 12,
+                  n_walls: int = 0,
+                  truck_ratio: float = 0.25,
+                  max_attempts: int = 500) -> Tuple[Layout, State]:
+    """Tire une disposition valide et une configuration initiale sans collision."""
+    exit_row = (height // 2) - 1
+    occupied = set()
+    specs: List[VehicleSpec] = []
+    state: List[int] = []
+
+    def cells(orientation, length, x, y):
+        return [(x + k, y) if orientation == 'H' else (x, y + k) for k in range(length)]
+
+    x0 = rng.randrange(0, width - 2)
+    occupied.update(cells('H', 2, x0, exit_row))
+    specs.append((TARGET_ID, 'H', 2, exit_row))
+    state.append(x0)
+
+    for _ in range(n_walls):
+        free = [(x, y) for x in range(width) for y in range(height)
+                if (x, y) not in occupied and y != exit_row]
+        if not free:
+            break
+        occupied.add(rng.choice(free))
+    walls = [c for c in occupied if c not in cells('H', 2, x0, exit_row)]
+
+    ids = iter(VEHICLE_IDS * (1 + n_vehicles // len(VEHICLE_IDS)))
+    attempts = 0
+    while len(specs) < n_vehicles and attempts < max_attempts:
+        attempts += 1
+        orientation = rng.choice('HV')
+        length = 3 if rng.random() < truck_ratio else 2
+        lane = width if orientation == 'H' else height
+        if length > lane:
+            continue
+        fixed = rng.randrange(height if orientation == 'H' else width)
+        # Pas de véhicule horizontal supplémentaire dans la rangée de sortie
+        if orientation == 'H' and fixed == exit_row:
+            continue
+        p = rng.randrange(lane - length + 1)
+        x, y = (p, fixed) if orientation == 'H' else (fixed, p)
+        new_cells = cells(orientation, length, x, y)
+        if any(c in occupied for c in new_cells):
+            continue
+        occupied.update(new_cells)
+        specs.append((next(ids), orientation, length, fixed))
+        state.append(p)
+    return Layout(width, height, walls, specs), tuple(state)
+
+
+def random_state(rng: random.Random, layout: Layout, max_attempts: int = 100) -> Optional[State]:
+    """Replace chaque véhicule au hasard sur sa voie, sans collision ; None après max_attempts échecs."""
+    order = list(range(len(layout.specs)))
+    for _ in range(max_attempts):
+        rng.shuffle(order)
+        occupied = layout.wall_mask
+        state = [0] * len(order)
+        for i in order:
+            free = [p for p, mask in enumerate(layout.masks[i]) if not mask & occupied]
+            if not free:
+                break
+            state[i] = rng.choice(free)
+            occupied |= layout.masks[i][state[i]]
+        else:
+            return tuple(state)
+    return None
+
+
+class HardestFinder:
+    """
+    Cherche la configuration la plus difficile des dispositions tirées.
+    distances[signature de disposition] = distance au but de chaque état des
+    composantes déjà explorées (UNSOLVABLE si la composante n'a pas d'état but) :
+    les départs d'une même disposition partagent ce BFS. Le cache est un LRU
+    borné en dispositions (max_layouts) et en états mémorisés (max_cached_states).
+    """
+    def __init__(self,
+                 max_states: Optional[int] = 2_000_000,
+                 max_layouts: int = MAX_CACHED_LAYOUTS,
+                 max_cached_states: int = MAX_CACHED_STATES):
+        self.max_states = max_states
+        self.max_layouts = max_layouts
+        self.max_cached_states = max_cached_states
+        self.distances: "OrderedDict[Tuple, Dict[State, int]]" = OrderedDict()
+        self.cached_states = 0
+
+    def distance(self, layout: Layout, state: State) -> Optional[int]:
+        """Longueur optimale de state (UNSOLVABLE si insoluble) si sa composante est en cache, sinon None."""
+        dist = self.distances.get(layout.signature())
+        return dist.get(state) if dist is not None else None
+
+    def hardest(self, layout: Layout, start: State) -> Optional[Tuple[State, int, int]]:
+        """Retourne (état le plus difficile, longueur optimale, taille de la composante) ou None."""
+        key = layout.signature()
+        dist = self.distances.get(key)
+        if dist is None:
+            dist = self.distances[key] = {}
+        self.distances.move_to_end(key)
+        if start in dist:
+            return None
+        states = layout.component(start, self.max_states)
+        if states is None:
+            return None
+        component = layout.goal_distances(states)
+        dist.update(component or dict.fromkeys(states, UNSOLVABLE))
+        self.cached_states += len(states)
+        self._evict()
+        if not component:
+            return None
+        best = max(component, key=lambda s: (component[s], s))
+        return best, component[best], len(states)
+
+    def _evict(self):
+        """Retire les dispositions les moins récemment utilisées (jamais la dernière) au-delà des limites."""
+        while len(self.distances) > 1 and (len(self.distances) > self.max_layouts or
+                                           self.cached_states > self.max_cached_states):
+            _, dist = self.distances.popitem(last=False)
+            self.cached_states -= len(dist)
+
+
+def generate_batch(seed: int,
+                   count: int,
+                   width: int = 6,
+                   height: int = 6,
+                   n_vehicles: int = 12,
+                   n_walls: int = 0,
+                   min_moves: int = 1,
+                   max_samples: int = 10000,
+                   starts_per_layout: int = STARTS_PER_LAYOUT) -> List[Tuple[RushHourPuzzle, int, int]]:
+    """
+    Génère jusqu'à count puzzles distincts (puzzle, longueur optimale, taille de
+    composante) d'au moins min_moves coups, en au plus max_samples
+    configurations de départ, tirées par starts_per_layout sur chaque disposition.
+    """
+    rng = random.Random(seed)
+    finder = HardestFinder()
+    results = []
+    seen = set()
+    samples = 0
+    while samples < max_samples and len(results) < count:
+        layout, start = random_layout(rng, width, height, n_vehicles, n_walls)
+        for k in range(starts_per_layout):
+            if k:
+                start = random_state(rng, layout)
+                if start is None:
+                    break
+            samples += 1
+            found = finder.hardest(layout, canonical_state(layout, start))
+            if found is not None:
+                state, moves, size = found
+                if moves >= min_moves:
+                    puzzle = layout.to_puzzle(state)
+                    key = shape_key(puzzle)
+                    if key not in seen:
+                        seen.add(key)
+                        results.append((puzzle, moves, size))
+            if samples >= max_samples or len(results) >= count:
+                break
+    return results
+
+
+def generate(count: int,
+             workers: Optional[int] = None,
+             seed: int = 0,
+             **options) -> List[Tuple[RushHourPuzzle, int, int]]:
+    """
+    Répartit la génération sur plusieurs processus ; résultats distincts (shape_key),
+    triés du plus difficile au plus facile.
+    """
+    workers = workers or os.cpu_count() or 1
+    per_worker = -(-count // workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_batch, seed * 1000003 + i, per_worker, **options)
+                   for i in range(workers)]
+        unique = {}
+        for f in futures:
+            for r in f.result():
+                unique.setdefault(shape_key(r[0]), r)
+    results = sorted(unique.values(), key=lambda r: -r[1])
+    return results[:count]
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Génère des puzzles Rush Hour difficiles.")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--height", type=int, default=6)
+    parser.add_argument("--vehicles", type=int, default=12)
+    parser.add_argument("--walls", type=int, default=0)
+    parser.add_argument("--min-moves", type=int, default=1)
+    parser.add_argument("--max-samples", type=int, default=10000)
+    parser.add_argument("--starts-per-layout", type=int, default=STARTS_PER_LAYOUT,
+                        help="Configurations de départ tirées sur chaque disposition")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="generated", help="Dossier de sortie des CSV")
+    args = parser.parse_args()
+
+    puzzles = generate(args.count, workers=args.workers, seed=args.seed,
+                       width=args.width, height=args.height, n_vehicles=args.vehicles,
+                       n_walls=args.walls, min_moves=args.min_moves, max_samples=args.max_samples,
+                       starts_per_layout=args.starts_per_layout)
+    os.makedirs(args.out, exist_ok=True)
+    for i, (puzzle, moves, size) in enumerate(puzzles):
+        path = os.path.join(args.out, f"gen-{i:04d}-{moves}.csv")
+        puzzle.saveVehicles(path)
+        print(f"{path} : {moves} coups optimaux ({size} états dans la composante)")
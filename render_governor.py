@@ -0,0 +1,119 @@
+#render_governor.py
+"""
+Régulateur de qualité du rendu (sans dépendance à pygame).
+
+Le temps de travail de chaque image (de la fin de clock.tick jusqu'avant
+pygame.display.flip) est comparé au budget 1000 / FPS. Toutes les WINDOW
+images, le 90e percentile de la fenêtre décide :
+    - au-delà de DOWNGRADE_AT × budget : un niveau de qualité en moins ;
+    - sous UPGRADE_AT × budget pendant assez de fenêtres : un niveau en plus.
+Un niveau qui vient d'échouer demande deux fois plus de fenêtres calmes
+avant d'être retenté, ce qui évite d'osciller entre deux niveaux.
+
+Niveaux, du plus riche au plus sobre : toutes les particules, particules
+réduites, lueur de la grille figée (fond précalculé), sans reflets ni ombres,
+véhicules précalculés (sprites) sans particules.
+"""
+import time
+from typing import List, Optional
+
+from render_profiler import percentile
+
+WINDOW = 30
+DOWNGRADE_AT = 0.85
+UPGRADE_AT = 0.5
+MAX_BACKOFF = 5
+
+
+class RenderQuality:
+    """Réglages d'un niveau : part des particules, lueur animée, reflets/ombres, sprites."""
+    def __init__(self, name: str, particles: float, animated_glow: bool, effects: bool, sprites: bool):
+        self.name = name
+        self.particles = particles
+        self.animated_glow = animated_glow
+        self.effects = effects
+        self.sprites = sprites
+
+    def max_particles(self, limit: int) -> int:
+        return int(limit * self.particles)
+
+    def __repr__(self):
+        return f"RenderQuality({self.name!r})"
+
+
+# Du plus sobre (0) au plus riche
+QUALITY_LEVELS = (
+    RenderQuality("minimal", 0.0, False, False, True),
+    RenderQuality("bas", 0.25, False, False, False),
+    RenderQuality("moyen", 0.5, False, True, False),
+    RenderQuality("élevé", 0.5, True, True, False),
+    RenderQuality("maximal", 1.0, True, True, False),
+)
+QUALITY_NAMES = tuple(q.name for q in QUALITY_LEVELS)
+
+
+class QualityGovernor:
+    """
+    Choisit le niveau de QUALITY_LEVELS d'après le temps de travail des images.
+    adaptive=False fige le niveau de départ (level, maximal par défaut).
+    """
+    def __init__(self, fps: int = 60, level: Optional[int] = None, adaptive: bool = True,
+                 window: int = WINDOW):
+        self.budget_ms = 1000.0 / fps
+        self.level = len(QUALITY_LEVELS) - 1 if level is None else level
+        self.adaptive = adaptive
+        self.window = window
+        self.samples: List[float] = []
+        self.calm_windows = 0
+        self.failures = [0] * len(QUALITY_LEVELS)
+        self.changes = 0
+        self._frame_start = 0.0
+
+    @classmethod
+    def from_name(cls, name: str, fps: int = 60) -> 'QualityGovernor':
+        """ "auto" : adaptatif depuis le niveau maximal ; sinon niveau fixe (QUALITY_NAMES)."""
+        if name == "auto":
+            return cls(fps)
+        if name not in QUALITY_NAMES:
+            raise ValueError(f"Qualité inconnue : {name} (choix : auto, {', '.join(QUALITY_NAMES)})")
+        return cls(fps, QUALITY_NAMES.index(name), adaptive=False)
+
+    @property
+    def quality(self) -> RenderQuality:
+        return QUALITY_LEVELS[self.level]
+
+    def begin_frame(self):
+        if self.adaptive:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> bool:
+        """À appeler avant flip ; retourne True si le niveau vient de changer."""
+        if not self.adaptive:
+            return False
+        return self.record((time.perf_counter() - self._frame_start) * 1000)
+
+    def record(self, work_ms: float) -> bool:
+        """Ajoute le temps de travail d'une image ; décide à chaque fenêtre complète."""
+        self.samples.append(work_ms)
+        if len(self.samples) < self.window:
+            return False
+        p90 = percentile(self.samples, 90)
+        self.samples = []
+
+        if p90 > DOWNGRADE_AT * self.budget_ms and self.level > 0:
+            # Le niveau quitté devra attendre plus longtemps avant d'être retenté
+            self.failures[self.level] = min(MAX_BACKOFF, self.failures[self.level] + 1)
+            return self._set_level(self.level - 1)
+        if p90 < UPGRADE_AT * self.budget_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.calm_windows += 1
+            if self.calm_windows >= 2 ** self.failures[self.level + 1]:
+                return self._set_level(self.level + 1)
+        else:
+            self.calm_windows = 0
+        return False
+
+    def _set_level(self, level: int) -> bool:
+        self.level = level
+        self.calm_windows = 0
+        self.changes += 1
+        return True
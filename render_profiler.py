@@ -0,0 +1,176 @@
+#render_profiler.py
+"""
+Profileur de rendu image par image (sans dépendance à pygame).
+
+Chaque image est découpée en phases (fond, grille, véhicules, particules,
+messages, HUD, affichage) chronométrées avec time.perf_counter :
+
+    profiler.begin_frame()
+    with profiler.phase("grid"):
+        draw_glowing_grid(...)
+    profiler.end_frame()
+
+Les RING_SIZE dernières images servent aux percentiles de l'incrustation ;
+si trace_path est donné, chaque image est aussi écrite dans un CSV
+(image, instant, période, travail, une colonne par phase, en millisecondes).
+Désactivé, phase() rend un contexte vide partagé et begin/end_frame ne font
+qu'un test : le coût est négligeable.
+"""
+import csv
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+PHASES = ("gradient", "grid", "vehicles", "particles", "messages", "hud", "flip")
+RING_SIZE = 240
+SUMMARY_EVERY = 15
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Chronomètre d'une phase ; réutilisé d'une image à l'autre."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: 'RenderProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler._current
+        current[self.name] = current.get(self.name, 0.0) + (time.perf_counter() - self.start) * 1000
+        return False
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentile q (0-100) par rang le plus proche ; 0 si values est vide."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class RenderProfiler:
+    """Temps par phase de chaque image, percentiles glissants et trace CSV optionnelle."""
+    def __init__(self, enabled: bool = False, trace_path: Optional[str] = None,
+                 phases: Sequence[str] = PHASES, ring_size: int = RING_SIZE):
+        self.phases = tuple(phases)
+        self.trace_path = trace_path
+        self.enabled = enabled or trace_path is not None
+        self.overlay = enabled
+        self.frames: Deque[Dict[str, float]] = deque(maxlen=ring_size)
+        self.frame_count = 0
+        self._timers = {name: _Phase(self, name) for name in self.phases}
+        self._current: Dict[str, float] = {}
+        self._frame_start = 0.0
+        self._last_start: Optional[float] = None
+        self._origin = time.perf_counter()
+        self._summary: Dict[str, Dict[str, float]] = {}
+        self._trace_file = None
+        self._writer = None
+
+    def toggle_overlay(self):
+        """Affiche ou masque l'incrustation ; la mesure reste active tant qu'une trace est écrite."""
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.trace_path is not None
+        if not self.enabled:
+            self._last_start = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = time.perf_counter()
+        self._current = {}
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _NULL_PHASE
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _Phase(self, name)
+        return timer
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        frame = self._current
+        frame["work"] = (now - self._frame_start) * 1000
+        # Période : d'un début d'image au suivant (attente de clock.tick comprise)
+        frame["period"] = (self._frame_start - self._last_start) * 1000 if self._last_start is not None else 0.0
+        self._last_start = self._frame_start
+        self.frames.append(frame)
+        self.frame_count += 1
+        if self.trace_path is not None:
+            self._write(frame)
+        if self.frame_count % SUMMARY_EVERY == 0 or not self._summary:
+            self._summary = self.summarize()
+
+    def _write(self, frame: Dict[str, float]):
+        if self._writer is None:
+            self._trace_file = open(self.trace_path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._trace_file)
+            self._writer.writerow(["frame", "time_s", "period_ms", "work_ms"] + [f"{p}_ms" for p in self.phases])
+        self._writer.writerow([self.frame_count, round(self._frame_start - self._origin, 6),
+                               round(frame["period"], 4), round(frame["work"], 4)]
+                              + [round(frame.get(p, 0.0), 4) for p in self.phases])
+
+    def summarize(self, quantiles: Sequence[float] = (50, 95, 99)) -> Dict[str, Dict[str, float]]:
+        """{phase ou "work"/"period": {"p50": ms, ...}} sur les dernières images."""
+        frames = list(self.frames)
+        summary = {}
+        for name in ("period", "work") + self.phases:
+            values = [f.get(name, 0.0) for f in frames]
+            if name == "period":
+                values = [v for v in values if v > 0]
+            summary[name] = {f"p{q:g}": percentile(values, q) for q in quantiles}
+        return summary
+
+    @property
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Dernier résumé calculé (rafraîchi toutes les SUMMARY_EVERY images)."""
+        return self._summary
+
+    def slowest_phases(self, count: int = 3) -> List[str]:
+        return sorted(self.phases, key=lambda p: -self._summary.get(p, {}).get("p95", 0.0))[:count]
+
+    def close(self):
+        if self._trace_file is not None:
+            self._trace_file.close()
+            self._trace_file = None
+            self._writer = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Résume une trace CSV écrite par RenderProfiler.")
+    parser.add_argument("trace", help="Fichier CSV (main.py --render-trace)")
+    args = parser.parse_args()
+    with open(args.trace, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    columns = [c for c in rows[0] if c.endswith("_ms")] if rows else []
+    print(f"{len(rows)} images")
+    print(f"{'colonne':<16} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for column in columns:
+        values = [float(r[column]) for r in rows]
+        if column == "period_ms":
+            values = [v for v in values if v > 0]
+        print(f"{column:<16} {percentile(values, 50):>8.2f} {percentile(values, 95):>8.2f} "
+              f"{percentile(values, 99):>8.2f} {max(values, default=0.0):>8.2f}")
@@ -0,0 +1,383 @@
+#resumable_search.py
+"""
+Recherche bfs / astar pas à pas, interruptible et reprenable dans un autre processus.
+
+Les états sont rangés dans des tableaux indexés par un numéro d'état :
+    keys      position de chaque véhicule + 1 (un octet par véhicule, dans
+              l'ordre des véhicules du puzzle initial ; +1 car la cible peut
+              dépasser la sortie vers la position -1)
+    parents   numéro de l'état parent (array 'i', -1 pour l'état initial)
+    g         profondeur (array 'H')
+    closed    1 si l'état a été développé (astar)
+La frontière ne contient que des numéros (bfs) ou des triplets (f, g, numéro)
+(astar, même ordre que Node : f puis g). Un RushHourPuzzle n'est construit que
+pour l'état développé et, pour astar, pour les enfants à évaluer.
+
+step(n) développe au plus n états ; steps() est un générateur qui rend la main
+après chaque paquet (boucle d'événements, interface pygame) ; run() s'arrête
+après N expansions ou T millisecondes. save() écrit un point de reprise
+(écriture dans un fichier temporaire puis os.replace) :
+    en-tête : magic 'RHCK' | version u16 | algorithme u8 | terminé u8 | trouvé i32
+              | len(heuristique) u16 | len(puzzle) u32 | nb états u32 | len(frontière) u32
+              | expansions u64 | générés u64 | temps f64
+    corps (zlib) : heuristique | puzzle (puzzle_archive.encode_puzzle) | keys | parents
+                   | g | closed | frontière (ids u32, puis f f64 pour astar)
+"""
+import heapq
+import os
+import struct
+import time
+import zlib
+from array import array
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from node import Node
+from pruning import is_unsolvable
+from puzzle_archive import decode_puzzle, encode_puzzle
+from rush_hour_puzzle import RushHourPuzzle
+from solver import SolveOptions, SolveResult, load_plugins, make_heuristic, register_solver
+
+MAGIC = b'RHCK'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBiHIIIQQd')
+ALGORITHMS = ("bfs", "astar")
+
+
+class ResumableSearch:
+    """
+    Recherche bfs ou astar dont tout l'état tient dans des tableaux compacts.
+    heuristic est un nom du registre (make_heuristic) pour pouvoir être recréée à la reprise.
+    """
+    def __init__(self, puzzle: RushHourPuzzle, algorithm: str = "bfs", heuristic: Optional[str] = None):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Algorithme inconnu : {algorithm} (choix : {', '.join(ALGORITHMS)})")
+        if max(puzzle.board_width, puzzle.board_height) > 254:
+            raise ValueError("Les positions doivent tenir sur un octet (plateau de 254 cases au plus).")
+        self.puzzle = puzzle
+        self.algorithm = algorithm
+        self.heuristic_name = heuristic or ("h2" if algorithm == "astar" else "")
+        self._heuristic = None
+        if algorithm == "astar":
+            load_plugins()
+            self._heuristic = make_heuristic(self.heuristic_name, puzzle)
+        self.start_key = bytes(self._position(v) + 1 for v in puzzle.vehicles)
+        geo = puzzle.geometry()
+        self.target = geo.target_index
+        self.goal_byte = None
+        if geo.goal is not None and self.target is not None:
+            self.goal_byte = (geo.goal[0] if geo.horizontal_exit else geo.goal[1]) + 1
+
+        self.keys: List[bytes] = []
+        self.index = {}
+        self.parents = array('i')
+        self.g = array('H')
+        self.closed = bytearray()
+        self.frontier = deque() if algorithm == "bfs" else []
+        self.expanded = 0
+        self.generated = 0
+        self.elapsed = 0.0
+        self.found: Optional[int] = None
+        self.done = False
+        self._start()
+
+    @staticmethod
+    def _position(v) -> int:
+        return v.x if v.orientation == 'H' else v.y
+
+    def _add(self, key: bytes, parent: int, g: int) -> int:
+        i = len(self.keys)
+        self.keys.append(key)
+        self.index[key] = i
+        self.parents.append(parent)
+        self.g.append(g)
+        self.closed.append(0)
+        return i
+
+    def _is_goal(self, key: bytes) -> bool:
+        return self.goal_byte is not None and key[self.target] == self.goal_byte
+
+    def _start(self):
+        root = self._add(self.start_key, -1, 0)
+        self.generated = 1
+        if self.algorithm == "bfs" and self._is_goal(self.start_key):
+            self.found, self.done = root, True
+        elif is_unsolvable(self.puzzle):
+            self.done = True
+        elif self.algorithm == "bfs":
+            self.frontier.append(root)
+        else:
+            heapq.heappush(self.frontier, (self.g[root] + self._heuristic(self.puzzle), 0, root))
+
+    def state(self, i: int) -> RushHourPuzzle:
+        """RushHourPuzzle de l'état numéro i (véhicules inchangés partagés avec le puzzle initial)."""
+        puzzle = self.puzzle.copy()
+        puzzle.vehicles = [v if p == q else v.moved(p - q)
+                           for v, p, q in zip(self.puzzle.vehicles, self.keys[i], self.start_key)]
+        puzzle.setBoard()
+        return puzzle
+
+    @property
+    def explored(self) -> int:
+        """Valeur historique de bfs (états découverts) ou de astar (états développés)."""
+        return len(self.keys) if self.algorithm == "bfs" else self.expanded
+
+    def step(self, max_expansions: int = 256) -> bool:
+        """Développe au plus max_expansions états ; retourne True si la recherche est terminée."""
+        start = time.perf_counter()
+        if not self.done:
+            expand = self._expand_bfs if self.algorithm == "bfs" else self._expand_astar
+            for _ in range(max_expansions):
+                if not self.frontier:
+                    self.done = True
+                    break
+                if expand():
+                    self.done = True
+                    break
+        self.elapsed += time.perf_counter() - start
+        return self.done
+
+    def steps(self, batch: int = 256) -> Iterator[int]:
+        """Générateur : développe batch états par itération et rend le nombre d'expansions."""
+        while not self.step(batch):
+            yield self.expanded
+        yield self.expanded
+
+    def run(self, max_expansions: Optional[int] = None, max_ms: Optional[float] = None,
+            batch: int = 256) -> bool:
+        """Avance jusqu'à la fin, max_expansions expansions ou max_ms millisecondes ; True si terminée."""
+        deadline = time.perf_counter() + max_ms / 1000 if max_ms is not None else None
+        limit = self.expanded + max_expansions if max_expansions is not None else None
+        while not self.done:
+            n = batch if limit is None else min(batch, limit - self.expanded)
+            if n <= 0 or (deadline is not None and time.perf_counter() >= deadline):
+                break
+            self.step(n)
+        return self.done
+
+    def _children(self, i: int):
+        """(état i, numéro du véhicule, déplacement, clé) de chaque successeur, dans l'ordre de successorFunction."""
+        puzzle = self.state(i)
+        key = self.keys[i]
+        for j, vehicle in enumerate(puzzle.vehicles):
+            back, forward = puzzle.lane_moves(vehicle)
+            for d in list(range(-1, -back - 1, -1)) + list(range(1, forward + 1)):
+                yield puzzle, j, d, key[:j] + bytes((key[j] + d,)) + key[j + 1:]
+
+    def _expand_bfs(self) -> bool:
+        i = self.frontier.popleft()
+        self.expanded += 1
+        g = self.g[i] + 1
+        for _, _, _, key in self._children(i):
+            self.generated += 1
+            if key in self.index:
+                continue
+            child = self._add(key, i, g)
+            if self._is_goal(key):
+                self.found = child
+                return True
+            self.frontier.append(child)
+        return False
+
+    def _expand_astar(self) -> bool:
+        f, g, i = heapq.heappop(self.frontier)
+        if self.closed[i] or g > self.g[i]:
+            return False  # entrée périmée : l'état a été retrouvé par un chemin plus court
+        if self._is_goal(self.keys[i]):
+            self.found = i
+            return True
+        self.closed[i] = 1
+        self.expanded += 1
+        g += 1
+        pending = []
+        parent = None
+        for puzzle, j, d, key in self._children(i):
+            parent = puzzle
+            self.generated += 1
+            child = self.index.get(key)
+            if child is None:
+                child = self._add(key, i, g)
+            elif self.closed[child] or g >= self.g[child]:
+                continue
+            else:
+                self.parents[child] = i
+                self.g[child] = g
+            pending.append((child, (puzzle.vehicles[j].id, d), puzzle.create_new_state(j, d)))
+        delta = getattr(self._heuristic, "delta", None)
+        batch = getattr(self._heuristic, "batch", None)
+        if delta is not None:
+            values = [delta(parent, f - g + 1, action, state) for _, action, state in pending]
+        elif batch is not None and pending:
+            values = batch([state for _, _, state in pending])
+        else:
+            values = [self._heuristic(state) for _, _, state in pending]
+        for (child, _, _), value in zip(pending, values):
+            heapq.heappush(self.frontier, (g + value, g, child))
+        return False
+
+    def solution_node(self) -> Optional[Node]:
+        """Chaîne de Node de l'état initial à la solution (None si aucune solution trouvée)."""
+        if self.found is None:
+            return None
+        chain = []
+        i = self.found
+        while i != -1:
+            chain.append(i)
+            i = self.parents[i]
+        node = Node(self.puzzle)
+        for prev, i in zip(chain[::-1], chain[-2::-1]):
+            before, after = self.keys[prev], self.keys[i]
+            j = next(k for k in range(len(before)) if before[k] != after[k])
+            action = (self.puzzle.vehicles[j].id, after[j] - before[j])
+            node = Node(node.state.create_new_state(j, action[1]), node, action, node.g + 1)
+        return node
+
+    def result(self, solver: Optional[str] = None) -> SolveResult:
+        return SolveResult(solver or f"{self.algorithm}-resumable", self.solution_node(), self.explored,
+                           expanded=self.expanded, generated=self.generated, stored=len(self.keys),
+                           timings={"search": self.elapsed})
+
+    # ------------------------------------------------------------------ points de reprise
+
+    def save(self, path: str):
+        puzzle = encode_puzzle(self.puzzle)
+        heuristic = self.heuristic_name.encode('utf-8')
+        ids = array('I')
+        fs = array('d')
+        if self.algorithm == "bfs":
+            ids.extend(self.frontier)
+        else:
+            for f, _, i in self.frontier:
+                fs.append(f)
+                ids.append(i)
+        body = b''.join([heuristic, puzzle, b''.join(self.keys), self.parents.tobytes(),
+                         self.g.tobytes(), bytes(self.closed), ids.tobytes(), fs.tobytes()])
+        header = HEADER.pack(MAGIC, VERSION, ALGORITHMS.index(self.algorithm), self.done,
+                             -1 if self.found is None else self.found, len(heuristic), len(puzzle),
+                             len(self.keys), len(ids), self.expanded, self.generated, self.elapsed)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(header)
+            f.write(zlib.compress(body, 6))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ResumableSearch':
+        with open(path, 'rb') as f:
+            data = f.read()
+        (magic, version, algorithm, done, found, h_len, p_len, n, n_frontier,
+         expanded, generated, elapsed) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} n'est pas un point de reprise Rush Hour.")
+        if version != VERSION:
+            raise ValueError(f"Version de point de reprise non supportée : {version}")
+        body = memoryview(zlib.decompress(data[HEADER.size:]))
+        offset = 0
+        heuristic = bytes(body[:h_len]).decode('utf-8')
+        offset += h_len
+        puzzle = decode_puzzle(body[offset:offset + p_len])
+        offset += p_len
+        search = cls(puzzle, ALGORITHMS[algorithm], heuristic or None)
+
+        k = len(search.start_key)
+        keys = bytes(body[offset:offset + n * k])
+        offset += n * k
+        search.keys = [keys[i * k:(i + 1) * k] for i in range(n)]
+        search.index = {key: i for i, key in enumerate(search.keys)}
+        search.parents = array('i')
+        search.parents.frombytes(body[offset:offset + n * search.parents.itemsize])
+        offset += n * search.parents.itemsize
+        search.g = array('H')
+        search.g.frombytes(body[offset:offset + n * search.g.itemsize])
+        offset += n * search.g.itemsize
+        search.closed = bytearray(body[offset:offset + n])
+        offset += n
+        ids = array('I')
+        ids.frombytes(body[offset:offset + n_frontier * ids.itemsize])
+        offset += n_frontier * ids.itemsize
+        if search.algorithm == "bfs":
+            search.frontier = deque(ids)
+        else:
+            fs = array('d')
+            fs.frombytes(body[offset:offset + n_frontier * fs.itemsize])
+            # Le tableau sauvegardé est déjà un tas : l'ordre est conservé tel quel
+            search.frontier = [(f, search.g[i], i) for f, i in zip(fs, ids)]
+        search.expanded, search.generated, search.elapsed = expanded, generated, elapsed
+        search.found = None if found < 0 else found
+        search.done = bool(done)
+        return search
+
+
+def solve_resumable(puzzle: RushHourPuzzle, algorithm: str = "bfs", heuristic: Optional[str] = None,
+                    checkpoint: Optional[str] = None, checkpoint_every: int = 50000,
+                    max_expansions: Optional[int] = None,
+                    max_ms: Optional[float] = None) -> Tuple[ResumableSearch, bool]:
+    """
+    Reprend checkpoint s'il existe (sinon démarre), avance en sauvegardant toutes les
+    checkpoint_every expansions, et s'arrête à la fin ou au budget. Retourne (recherche, terminée).
+    """
+    if checkpoint is not None and os.path.exists(checkpoint):
+        search = ResumableSearch.load(checkpoint)
+    else:
+        search = ResumableSearch(puzzle, algorithm, heuristic)
+    deadline = time.perf_counter() + max_ms / 1000 if max_ms is not None else None
+    limit = search.expanded + max_expansions if max_expansions is not None else None
+    while not search.done:
+        n = checkpoint_every if limit is None else min(checkpoint_every, limit - search.expanded)
+        remaining = None if deadline is None else (deadline - time.perf_counter()) * 1000
+        if n <= 0 or (remaining is not None and remaining <= 0):
+            break
+        search.run(n, remaining)
+        if checkpoint is not None:
+            search.save(checkpoint)
+    return search, search.done
+
+
+def _solve(puzzle: RushHourPuzzle, options: SolveOptions, algorithm: str) -> SolveResult:
+    max_ms = options.time_budget * 1000 if options.time_budget is not None else None
+    search, _ = solve_resumable(puzzle, algorithm, options.heuristic,
+                                checkpoint=options.extra.get("checkpoint"),
+                                checkpoint_every=options.extra.get("checkpoint_every", 50000),
+                                max_expansions=options.node_budget, max_ms=max_ms)
+    result = search.result()
+    result.budget_exhausted = not search.done
+    return result
+
+
+@register_solver("bfs-resumable", "BFS (reprenable)", optimal=True)
+def _solve_bfs_resumable(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    return _solve(puzzle, options, "bfs")
+
+
+@register_solver("astar-resumable", "A* (reprenable)", uses_heuristic=True, optimal_if_admissible=True)
+def _solve_astar_resumable(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    return _solve(puzzle, options, "astar")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recherche interruptible : reprend le point de reprise s'il existe.")
+    parser.add_argument("puzzle", help="Fichier CSV du puzzle")
+    parser.add_argument("checkpoint", help="Fichier de point de reprise (créé ou repris)")
+    parser.add_argument("--algo", choices=ALGORITHMS, default="bfs")
+    parser.add_argument("--heuristic", default=None, help="Nom d'heuristique pour astar (défaut : h2)")
+    parser.add_argument("--every", type=int, default=50000, help="Expansions entre deux sauvegardes")
+    parser.add_argument("--max-expansions", type=int, default=None)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    game = RushHourPuzzle()
+    game.setVehicles(args.puzzle)
+    game.setBoard()
+    search, finished = solve_resumable(game, args.algo, args.heuristic, args.checkpoint, args.every,
+                                       args.max_expansions, args.max_ms)
+    size = os.path.getsize(args.checkpoint) if os.path.exists(args.checkpoint) else 0
+    if not finished:
+        print(f"Pause après {search.expanded} expansions ({len(search.keys)} états, "
+              f"point de reprise {size} octets). Relancez la même commande pour reprendre.")
+    elif search.found is None:
+        print(f"Aucune solution ({search.explored} nœuds explorés, {search.elapsed:.2f}s).")
+    else:
+        result = search.result()
+        print(f"Solution en {result.moves} mouvements, {search.explored} nœuds explorés, {search.elapsed:.2f}s.")
@@ -1,12 +1,78 @@
 #rush hour_puzzle.py
 import csv
-from typing import Literal, List, Tuple, Optional
+from typing import Iterable, Literal, List, Tuple, Optional
 
 Action = Tuple[str, int]
 Orientation = Literal['H', 'V']
+ExitSide = Literal['E', 'W', 'N', 'S']
+
+DEFAULT_TARGET_ID = 'X'
+DEFAULT_EXIT_SIDE = 'E'
+EXIT_KEYWORD = 'EXIT'
+# Au-delà de cette longueur de voie, les tables de déplacement sont remplies à la demande
+MAX_TABLE_LANE = 12
+
+# runs[masque] = (bas, haut) : bas[c] (haut[c]) = nombre de cases libres consécutives
+# depuis la case c incluse, vers les indices décroissants (croissants) de la voie
+LaneRuns = Tuple[Tuple[int, ...], Tuple[int, ...]]
+# Clé d'un puzzle (canonical_key) : dimensions, murs, véhicules, sortie et cible
+PuzzleKey = Tuple
+
+
+def _compute_lane_runs(length: int, mask: int) -> LaneRuns:
+    down = [0] * length
+    up = [0] * length
+    run = 0
+    for c in range(length):
+        run = 0 if mask >> c & 1 else run + 1
+        down[c] = run
+    run = 0
+    for c in range(length - 1, -1, -1):
+        run = 0 if mask >> c & 1 else run + 1
+        up[c] = run
+    return tuple(down), tuple(up)
+
+
+class _LazyLaneRuns(dict):
+    """Table des longues voies : une entrée par masque effectivement rencontré."""
+    def __init__(self, length: int):
+        super().__init__()
+        self.length = length
+
+    def __missing__(self, mask: int) -> LaneRuns:
+        runs = self[mask] = _compute_lane_runs(self.length, mask)
+        return runs
+
+
+_LANE_TABLES = {}
+
+
+def lane_run_table(length: int):
+    """Table (masque d'occupation de la voie -> LaneRuns), partagée par toutes les voies de cette longueur."""
+    table = _LANE_TABLES.get(length)
+    if table is None:
+        if length <= MAX_TABLE_LANE:
+            table = [_compute_lane_runs(length, mask) for mask in range(1 << length)]
+        else:
+            table = _LazyLaneRuns(length)
+        _LANE_TABLES[length] = table
+    return table
+
+
+def _span_bits(pos: int, size: int, length: int) -> int:
+    """Bits des cases [pos, pos + size) tronquées à la voie [0, length)."""
+    lo, hi = max(pos, 0), min(pos + size, length)
+    return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
 
 
 class Vehicle:
+    """
+    Véhicule d'un état. Les états issus d'un même puzzle partagent leurs Vehicle
+    (copie sur écriture) : un Vehicle ne doit pas être modifié après sa création,
+    déplacer un véhicule produit un nouvel objet (voir moved).
+    """
+    __slots__ = ('id', 'x', 'y', 'orientation', 'length')
+
     def __init__(self,
                  id: str,
                  x: str,
@@ -27,14 +93,80 @@ class Vehicle:
     def __repr__(self) -> str:
         return f"Vehicle('{self.id}', pos=({self.x},{self.y}), orient='{self.orientation}', len={self.length})"
 
+    def key(self) -> Tuple[str, int, int, str, int]:
+        return (self.id, self.x, self.y, self.orientation, self.length)
+
+    def moved(self, displacement: int) -> 'Vehicle':
+        """Nouveau véhicule décalé de displacement cases le long de son orientation."""
+        v = Vehicle.__new__(Vehicle)
+        v.id, v.orientation, v.length = self.id, self.orientation, self.length
+        if self.orientation == 'H':
+            v.x, v.y = self.x + displacement, self.y
+        else:
+            v.x, v.y = self.x, self.y + displacement
+        return v
+
     def __hash__(self):
-        return hash((self.id, self.x, self.y, self.orientation, self.length))
+        return hash(self.key())
 
     def __eq__(self, other):
         if not isinstance(other, Vehicle):
             return NotImplemented
-        return (self.id, self.x, self.y, self.orientation, self.length) == \
-               (other.id, other.x, other.y, other.orientation, other.length)
+        return self.key() == other.key()
+
+
+class BoardGeometry:
+    """
+    Données figées d'une disposition, partagées par tous les états issus d'un même puzzle :
+    sortie (côté, index de rangée ou de colonne), véhicule cible, position but,
+    murs de chaque voie et tables de déplacement (voir lane_run_table).
+    """
+    def __init__(self,
+                 width: int,
+                 height: int,
+                 walls: List[Tuple[int, int]],
+                 vehicles: List[Vehicle],
+                 exit_side: str = DEFAULT_EXIT_SIDE,
+                 exit_index: Optional[int] = None,
+                 target_id: str = DEFAULT_TARGET_ID):
+        self.width = width
+        self.height = height
+        self.exit_side = exit_side
+        self.horizontal_exit = exit_side in ('E', 'W')
+        if exit_index is None:
+            exit_index = (height // 2) - 1 if self.horizontal_exit else (width // 2) - 1
+        self.exit_index = exit_index
+        self.target_id = target_id
+        self.wall_set = frozenset(walls)
+
+        self.target_index: Optional[int] = None
+        self.goal: Optional[Tuple[int, int]] = None
+        for i, v in enumerate(vehicles):
+            if v.id != target_id:
+                continue
+            self.target_index = i
+            if self.horizontal_exit and v.orientation == 'H' and v.y == exit_index:
+                self.goal = (width - v.length if exit_side == 'E' else 0, exit_index)
+            elif not self.horizontal_exit and v.orientation == 'V' and v.x == exit_index:
+                self.goal = (exit_index, height - v.length if exit_side == 'S' else 0)
+            break
+
+        # Murs par voie (bit x de wall_rows[y], bit y de wall_cols[x]) et tables de déplacement
+        self.wall_rows = [0] * height
+        self.wall_cols = [0] * width
+        for x, y in self.wall_set:
+            if 0 <= x < width and 0 <= y < height:
+                self.wall_rows[y] |= 1 << x
+                self.wall_cols[x] |= 1 << y
+        self.row_runs = lane_run_table(width)
+        self.col_runs = lane_run_table(height)
+        self.exit_forward = exit_side in ('E', 'S')
+
+    def exits_through(self, vehicle: Vehicle, direction: int) -> bool:
+        """Vrai si vehicle est la cible et que direction la fait sortir par la sortie."""
+        if vehicle.id != self.target_id or self.goal is None:
+            return False
+        return direction == (+1 if self.exit_side in ('E', 'S') else -1)
 
 
 class RushHourPuzzle:
@@ -44,42 +176,178 @@ class RushHourPuzzle:
         self.board_width: int = board_width
         self.vehicles: List[Vehicle] = []
         self.walls: List[Tuple[int, int]] = []
-        self.board: Optional[List[List[str]]] = None
+        self._board: Optional[List[List[str]]] = None
+        self._board_stale: bool = False
+        self.exit_side: ExitSide = DEFAULT_EXIT_SIDE
+        self.exit_index: Optional[int] = None
+        self.target_id: str = DEFAULT_TARGET_ID
+        self._geometry: Optional[BoardGeometry] = None
+        self._lane_masks: Optional[Tuple[List[int], List[int]]] = None
+        self._parent_move = None
+        # Clé d'état (véhicules triés par id) et position de chaque véhicule dans la clé
+        self._key: Optional[Tuple[Tuple[str, int, int, str, int], ...]] = None
+        self._key_slots: Optional[List[int]] = None
+        self._hash: Optional[int] = None
+
+    def geometry(self) -> BoardGeometry:
+        """
+        Géométrie de la disposition, calculée une fois puis partagée avec les états
+        successeurs. Appeler invalidate_geometry() après avoir modifié murs, sortie ou cible.
+        """
+        if self._geometry is None:
+            self._geometry = BoardGeometry(self.board_width, self.board_height, self.walls, self.vehicles,
+                                           self.exit_side, self.exit_index, self.target_id)
+        return self._geometry
+
+    def invalidate_geometry(self):
+        self._geometry = None
+
+    @property
+    def exit_row(self) -> int:
+        """Index de la rangée (sortie E/W) ou de la colonne (sortie N/S) de la sortie."""
+        return self.geometry().exit_index
+
+    def target_vehicle(self) -> Optional[Vehicle]:
+        geo = self.geometry()
+        i = geo.target_index
+        if i is not None and i < len(self.vehicles) and self.vehicles[i].id == geo.target_id:
+            return self.vehicles[i]
+        return next((v for v in self.vehicles if v.id == geo.target_id), None)
+
+    def exit_lane_vehicles(self) -> List[Vehicle]:
+        """Véhicules dont l'origine est sur la ligne de sortie, entre la cible et la sortie."""
+        target = self.target_vehicle()
+        if target is None:
+            return []
+        geo = self.geometry()
+        tid, idx = geo.target_id, geo.exit_index
+        side = geo.exit_side
+        if side == 'E':
+            return [v for v in self.vehicles if v.id != tid and v.y == idx and v.x > target.x]
+        if side == 'W':
+            return [v for v in self.vehicles if v.id != tid and v.y == idx and v.x < target.x]
+        if side == 'S':
+            return [v for v in self.vehicles if v.id != tid and v.x == idx and v.y > target.y]
+        return [v for v in self.vehicles if v.id != tid and v.x == idx and v.y < target.y]
+
+    def distance_to_exit(self) -> int:
+        """
+        Nombre de cases entre la cible et sa position but, compté vers la sortie
+        (négatif si la cible a dépassé la sortie ; 0 si la cible ne peut pas sortir).
+        """
+        target = self.target_vehicle()
+        geo = self.geometry()
+        if target is None or geo.goal is None:
+            return 0
+        side = geo.exit_side
+        if side == 'E':
+            return geo.goal[0] - target.x
+        if side == 'W':
+            return target.x - geo.goal[0]
+        if side == 'S':
+            return geo.goal[1] - target.y
+        return target.y - geo.goal[1]
 
     def setVehicles(self, csv_file_path: str):
+        try:
+            with open(csv_file_path, mode='r', newline='') as file:
+                self.setVehiclesFromLines(file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Erreur: Fichier non trouvé à {csv_file_path}")
+
+    def setVehiclesFromLines(self, lines: Iterable[str]):
+        """Même format que setVehicles, mais lu depuis n'importe quelle source de lignes (zip, flux...)."""
         self.vehicles = []
         self.walls = []
+        self.exit_side = DEFAULT_EXIT_SIDE
+        self.exit_index = None
+        self.target_id = DEFAULT_TARGET_ID
+        self._geometry = None
+        self._key = self._key_slots = self._hash = None
         try:
-            with open(csv_file_path, mode='r', newline='') as file:
-                reader = csv.reader(file)
-                dims = next(reader)
-                if len(dims) < 2:
-                    raise ValueError("Dimensions manquantes.")
-                self.board_width, self.board_height = int(dims[0]), int(dims[1])
-                for row in reader:
-                    if not row: continue
-                    if row[0].strip() == '#':
-                        if len(row) >= 3:
-                            try:
-                                self.walls.append((int(row[1]), int(row[2])))
-                            except ValueError:
-                                pass
-                    elif len(row) >= 5:
+            reader = csv.reader(lines)
+            dims = next(reader)
+            if len(dims) < 2:
+                raise ValueError("Dimensions manquantes.")
+            self.board_width, self.board_height = int(dims[0]), int(dims[1])
+            for row in reader:
+                if not row: continue
+                if row[0].strip().upper() == EXIT_KEYWORD:
+                    # EXIT,<côté E/W/N/S>[,<index>[,<id cible>]]
+                    side = row[1].strip().upper() if len(row) >= 2 else DEFAULT_EXIT_SIDE
+                    if side not in ('E', 'W', 'N', 'S'):
+                        raise ValueError(f"Côté de sortie invalide : {side}")
+                    self.exit_side = side
+                    if len(row) >= 3 and row[2].strip():
+                        self.exit_index = int(row[2])
+                    if len(row) >= 4 and row[3].strip():
+                        self.target_id = row[3].strip()
+                elif row[0].strip() == '#':
+                    if len(row) >= 3:
                         try:
-                            self.vehicles.append(Vehicle(row[0], row[1], row[2], row[3], row[4]))
+                            self.walls.append((int(row[1]), int(row[2])))
                         except ValueError:
                             pass
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Erreur: Fichier non trouvé à {csv_file_path}")
+                elif len(row) >= 5:
+                    try:
+                        self.vehicles.append(Vehicle(row[0], row[1], row[2], row[3], row[4]))
+                    except ValueError:
+                        pass
         except Exception as e:
             raise Exception(f"Erreur lors du parsing du CSV: {e}")
 
+    def saveVehicles(self, csv_file_path: str):
+        """Écrit le puzzle au format lu par setVehicles."""
+        with open(csv_file_path, mode='w', newline='') as file:
+            csv.writer(file).writerows(self.csv_rows())
+
+    def csv_rows(self) -> List[list]:
+        """Lignes du format setVehicles (dimensions, sortie éventuelle, murs, véhicules)."""
+        rows = [[self.board_width, self.board_height]]
+        if self.has_custom_exit():
+            rows.append([EXIT_KEYWORD, self.exit_side, self.exit_row, self.target_id])
+        for x, y in self.walls:
+            rows.append(['#', x, y])
+        for v in self.vehicles:
+            rows.append([v.id, v.x, v.y, v.orientation, v.length])
+        return rows
+
+    def has_custom_exit(self) -> bool:
+        return (self.exit_side != DEFAULT_EXIT_SIDE or self.exit_index is not None
+                or self.target_id != DEFAULT_TARGET_ID)
+
     def setBoard(self):
-        self.board = [[' ' for _ in range(self.board_width)] for _ in range(self.board_height)]
+        """
+        Marque le plateau et les caches de l'état (masques de voie, clé) à recalculer
+        après une modification des véhicules ; la grille est reconstruite au premier accès à board.
+        """
+        self._lane_masks = None
+        self._parent_move = None
+        self._key = None
+        self._key_slots = None
+        self._hash = None
+        self._board = None
+        self._board_stale = True
+
+    @property
+    def board(self) -> Optional[List[List[str]]]:
+        """Grille des identifiants (' ' vide, '#' mur) ; None tant que setBoard n'a pas été appelé."""
+        if self._board_stale:
+            self._board = self._build_board()
+            self._board_stale = False
+        return self._board
+
+    @board.setter
+    def board(self, value: Optional[List[List[str]]]):
+        self._board = value
+        self._board_stale = False
+
+    def _build_board(self) -> List[List[str]]:
+        board = [[' ' for _ in range(self.board_width)] for _ in range(self.board_height)]
 
         for x, y in self.walls:
             if 0 <= x < self.board_width and 0 <= y < self.board_height:
-                self.board[y][x] = '#'
+                board[y][x] = '#'
 
         for v in self.vehicles:
             for i in range(v.length):
@@ -87,16 +355,17 @@ class RushHourPuzzle:
                 y = v.y + i if v.orientation == 'V' else v.y
 
                 if 0 <= x < self.board_width and 0 <= y < self.board_height:
-                    self.board[y][x] = v.id
+                    board[y][x] = v.id
+        return board
 
     def isGoal(self) -> bool:
-        red_car = next((v for v in self.vehicles if v.id == 'X'), None)
-        if not red_car or red_car.orientation != 'H':
+        geo = self.geometry()
+        if geo.goal is None:
             return False
-        exit_row = (self.board_height // 2) - 1
-        target_x_start = self.board_width - red_car.length
-
-        return (red_car.y == exit_row and red_car.x == target_x_start)
+        target = self.target_vehicle()
+        if target is None:
+            return False
+        return target.x == geo.goal[0] and target.y == geo.goal[1]
 
     def __str__(self):
         if self.board is None:
@@ -107,85 +376,173 @@ class RushHourPuzzle:
         board_str.append(col_indices)
         board_str.append("  " + "—" * (self.board_width * 2 - 1))
 
-        exit_row_index = (self.board_height // 2) - 1
+        geo = self.geometry()
+        exit_row_index = geo.exit_index if geo.horizontal_exit else None
 
         for i, row in enumerate(self.board):
             row_display = f"{i}|" + " ".join(row) + "|"
             if i == exit_row_index:
-                row_display += " <- EXIT"
+                row_display += " <- EXIT" if geo.exit_side == 'E' else " <- EXIT (gauche)"
 
             board_str.append(row_display)
 
+        if not geo.horizontal_exit:
+            marker = "  " + "  " * geo.exit_index + ("^ EXIT" if geo.exit_side == 'N' else "v EXIT")
+            if geo.exit_side == 'N':
+                board_str.insert(0, marker)
+            else:
+                board_str.append("  " + "—" * (self.board_width * 2 - 1))
+                board_str.append(marker)
+                return "\n".join(board_str)
         board_str.append("  " + "—" * (self.board_width * 2 - 1))
 
         return "\n".join(board_str)
 
+    def state_key(self) -> Tuple[Tuple[str, int, int, str, int], ...]:
+        """Véhicules (id, x, y, orientation, longueur) triés par id ; dérivée de celle du parent pour un successeur."""
+        if self._key is None:
+            order = sorted(range(len(self.vehicles)), key=lambda i: self.vehicles[i].id)
+            slots = [0] * len(order)
+            for slot, i in enumerate(order):
+                slots[i] = slot
+            self._key_slots = slots
+            self._key = tuple(self.vehicles[i].key() for i in order)
+        return self._key
+
     def __eq__(self, other):
         if not isinstance(other, RushHourPuzzle):
             return NotImplemented
-        return sorted(self.vehicles, key=lambda v: v.id) == sorted(other.vehicles, key=lambda v: v.id)
+        return self is other or self.state_key() == other.state_key()
 
     def __hash__(self):
-        return hash(tuple(sorted(v.__hash__() for v in self.vehicles)))
-
-    def get_potential_moves(self, vehicle: 'Vehicle', direction: int) -> int:
-        max_moves = 0
-        if self.board is None:
-            self.setBoard()
-
-        if direction == -1:
-            start_offset = -1
+        if self._hash is None:
+            self._hash = hash(self._key or self.state_key())
+        return self._hash
+
+    def lane_masks(self) -> Tuple[List[int], List[int]]:
+        """Occupation (murs et véhicules) de chaque rangée et de chaque colonne, en bits."""
+        if self._lane_masks is None and self._parent_move is not None:
+            self._lane_masks = self._moved_lane_masks(*self._parent_move)
+            self._parent_move = None
+        if self._lane_masks is None:
+            geo = self.geometry()
+            width, height = self.board_width, self.board_height
+            rows = list(geo.wall_rows)
+            cols = list(geo.wall_cols)
+            for v in self.vehicles:
+                if v.orientation == 'H':
+                    if 0 <= v.y < height:
+                        rows[v.y] |= _span_bits(v.x, v.length, width)
+                        for x in range(max(v.x, 0), min(v.x + v.length, width)):
+                            cols[x] |= 1 << v.y
+                elif 0 <= v.x < width:
+                    cols[v.x] |= _span_bits(v.y, v.length, height)
+                    for y in range(max(v.y, 0), min(v.y + v.length, height)):
+                        rows[y] |= 1 << v.x
+            self._lane_masks = (rows, cols)
+        return self._lane_masks
+
+    def lane_moves(self, vehicle: 'Vehicle') -> Tuple[int, int]:
+        """(déplacements max en arrière, en avant) du véhicule, par consultation des tables de voie."""
+        geo = self._geometry or self.geometry()
+        rows, cols = self._lane_masks or self.lane_masks()
+        if vehicle.orientation == 'H':
+            if not 0 <= vehicle.y < self.board_height:
+                return 0, 0
+            down, up = geo.row_runs[rows[vehicle.y]]
+            pos, lane = vehicle.x, self.board_width
         else:
-            start_offset = vehicle.length
-
-        while True:
-            if vehicle.orientation == 'H':
-                next_x = vehicle.x + start_offset + (direction * max_moves)
-                next_y = vehicle.y
-            else:
-                next_x = vehicle.x
-                next_y = vehicle.y + start_offset + (direction * max_moves)
-
-            is_out_of_bounds = not (0 <= next_x < self.board_width and 0 <= next_y < self.board_height)
-
-            if is_out_of_bounds:
-                exit_row = (self.board_height // 2) - 1
-                if vehicle.id == 'X' and vehicle.orientation == 'H' and next_x == self.board_width and next_y == exit_row:
-                    max_moves += 1
-                break
-
-            cell_content = self.board[next_y][next_x]
-
-            if cell_content == ' ':
-                max_moves += 1
-            elif cell_content == '#':
-                break
-            else:
-                break
+            if not 0 <= vehicle.x < self.board_width:
+                return 0, 0
+            down, up = geo.col_runs[cols[vehicle.x]]
+            pos, lane = vehicle.y, self.board_height
+        end = pos + vehicle.length
+        back = down[pos - 1] if 0 < pos <= lane else 0
+        forward = up[end] if 0 <= end < lane else 0
+
+        # La voiture cible peut glisser d'une case au-delà de la sortie
+        if vehicle.id == geo.target_id and geo.goal is not None:
+            if geo.exit_forward:
+                if end + forward == lane:
+                    forward += 1
+            elif pos - back == 0:
+                back += 1
+        return back, forward
 
-        return max_moves
+    def get_potential_moves(self, vehicle: 'Vehicle', direction: int) -> int:
+        back, forward = self.lane_moves(vehicle)
+        return back if direction == -1 else forward
 
     def create_new_state(self, vehicle_index: int, displacement: int) -> 'RushHourPuzzle':
+        """
+        Successeur où seul le véhicule vehicle_index est déplacé : les autres Vehicle,
+        les murs et la géométrie sont partagés avec cet état, qui reste inchangé.
+        """
         new_puzzle = RushHourPuzzle(self.board_height, self.board_width)
-        new_puzzle.walls = list(self.walls)
+        new_puzzle.walls = self.walls
+        new_puzzle.exit_side = self.exit_side
+        new_puzzle.exit_index = self.exit_index
+        new_puzzle.target_id = self.target_id
+        new_puzzle._geometry = self._geometry
 
-        new_vehicles = []
         old_v = self.vehicles[vehicle_index]
+        moved_v = old_v.moved(displacement)
+        new_vehicles = self.vehicles[:]
+        new_vehicles[vehicle_index] = moved_v
+        new_puzzle.vehicles = new_vehicles
+        new_puzzle._board_stale = True
 
-        for j, v in enumerate(self.vehicles):
-            if j == vehicle_index:
-                new_x = old_v.x + displacement if old_v.orientation == 'H' else old_v.x
-                new_y = old_v.y + displacement if old_v.orientation == 'V' else old_v.y
-                moved_v = Vehicle(old_v.id, str(new_x), str(new_y), old_v.orientation, str(old_v.length))
-                new_vehicles.append(moved_v)
-            else:
-                new_vehicles.append(Vehicle(v.id, str(v.x), str(v.y), v.orientation, str(v.length)))
+        if self._key is not None:
+            slots = self._key_slots
+            slot = slots[vehicle_index]
+            new_puzzle._key = self._key[:slot] + (moved_v.key(),) + self._key[slot + 1:]
+            new_puzzle._key_slots = slots
+        if self._lane_masks is not None:
+            # Masques dérivés de ceux du parent, seulement si cet état est développé
+            new_puzzle._parent_move = (self._lane_masks, old_v, displacement)
 
-        new_puzzle.vehicles = new_vehicles
-        new_puzzle.setBoard()
+        return new_puzzle
 
+    def copy(self) -> 'RushHourPuzzle':
+        """Copie modifiable (move_vehicle) de cet état ; les Vehicle sont partagés, pas dupliqués."""
+        new_puzzle = RushHourPuzzle(self.board_height, self.board_width)
+        new_puzzle.walls = list(self.walls)
+        new_puzzle.exit_side = self.exit_side
+        new_puzzle.exit_index = self.exit_index
+        new_puzzle.target_id = self.target_id
+        new_puzzle._geometry = self._geometry
+        new_puzzle.vehicles = list(self.vehicles)
+        if self._board_stale or self._board is not None:
+            new_puzzle.setBoard()
         return new_puzzle
 
+    def _moved_lane_masks(self, masks, v: Vehicle, displacement: int) -> Tuple[List[int], List[int]]:
+        """Masques de voie après déplacement de v : seules les cases quittées et atteintes changent."""
+        rows, cols = masks
+        rows, cols = rows[:], cols[:]
+        width, height = self.board_width, self.board_height
+        if not (0 <= v.y < height if v.orientation == 'H' else 0 <= v.x < width):
+            return rows, cols
+        if v.orientation == 'H':
+            old = _span_bits(v.x, v.length, width)
+            new = _span_bits(v.x + displacement, v.length, width)
+            rows[v.y] ^= old ^ new
+            bit = 1 << v.y
+        else:
+            old = _span_bits(v.y, v.length, height)
+            new = _span_bits(v.y + displacement, v.length, height)
+            cols[v.x] ^= old ^ new
+            bit = 1 << v.x
+        cross = cols if v.orientation == 'H' else rows
+        changed = old ^ new
+        c = 0
+        while changed:
+            if changed & 1:
+                cross[c] ^= bit
+            changed >>= 1
+            c += 1
+        return rows, cols
+
     def get_vehicle_index(self, vehicle_id: str) -> Optional[int]:
         try:
             return next(i for i, v in enumerate(self.vehicles) if v.id == vehicle_id)
@@ -197,75 +554,73 @@ class RushHourPuzzle:
         vehicle_index = self.get_vehicle_index(vehicle_id)
         if vehicle_index is None:
             return
-        old_v = self.vehicles[vehicle_index]
-        new_x = old_v.x + displacement if old_v.orientation == 'H' else old_v.x
-        new_y = old_v.y + displacement if old_v.orientation == 'V' else old_v.y
-        self.vehicles[vehicle_index].x = new_x
-        self.vehicles[vehicle_index].y = new_y
+        # Copie sur écriture : le Vehicle peut être partagé avec d'autres états
+        self.vehicles[vehicle_index] = self.vehicles[vehicle_index].moved(displacement)
         self.setBoard()
 
-    def successorFunction(self) -> List[Tuple[Action, 'RushHourPuzzle']]:
-        successors: List[Tuple[Action, 'RushHourPuzzle']] = []
-
-        if self.board is None:
-            self.setBoard()
-
+    def legal_moves(self) -> List[Tuple[int, Action]]:
+        """(index du véhicule, action) de chaque successeur, dans l'ordre de successorFunction, sans créer d'état."""
+        moves: List[Tuple[int, Action]] = []
         for i, vehicle in enumerate(self.vehicles):
-            moves_backward = self.get_potential_moves(vehicle, direction=-1)
+            moves_backward, moves_forward = self.lane_moves(vehicle)
             for d in range(1, moves_backward + 1):
-                new_state = self.create_new_state(vehicle_index=i, displacement=-d)
-                action: Action = (vehicle.id, -d)
-                successors.append((action, new_state))
-
-            moves_forward = self.get_potential_moves(vehicle, direction=+1)
+                moves.append((i, (vehicle.id, -d)))
             for d in range(1, moves_forward + 1):
-                new_state = self.create_new_state(vehicle_index=i, displacement=+d)
-                action: Action = (vehicle.id, +d)
-                successors.append((action, new_state))
+                moves.append((i, (vehicle.id, d)))
+        return moves
 
-        return successors
+    def successorFunction(self) -> List[Tuple[Action, 'RushHourPuzzle']]:
+        """(action, état) de chaque mouvement légal ; les déplacements viennent des masques de voie, sans grille."""
+        return [(action, self.create_new_state(i, action[1])) for i, action in self.legal_moves()]
 
     # Méthodes ajoutées pour h3 améliorée
 
-    def get_blockers_of_vehicle_by_id(self, vehicle_id: str) -> List[str]:
-        if self.board is None:
-            self.setBoard()
+    def vehicle_at(self, x: int, y: int) -> Optional[str]:
+        """Identifiant du véhicule qui occupe la case (x, y), None si elle est vide ou murée (sans grille)."""
+        geo = self._geometry or self.geometry()
+        bit = 1 << x
+        rows = self.lane_masks()[0]
+        if not (0 <= y < self.board_height and 0 <= x < self.board_width) \
+                or not rows[y] & bit or geo.wall_rows[y] & bit:
+            return None
+        for v in self.vehicles:
+            if v.orientation == 'H':
+                if v.y == y and v.x <= x < v.x + v.length:
+                    return v.id
+            elif v.x == x and v.y <= y < v.y + v.length:
+                return v.id
+        return None
 
+    def get_blockers_of_vehicle_by_id(self, vehicle_id: str) -> List[str]:
         vehicle = next((v for v in self.vehicles if v.id == vehicle_id), None)
         if not vehicle:
             return []
-        blockers = set()
-
         if vehicle.orientation == 'H':
-            start_x = vehicle.x + vehicle.length
-            y = vehicle.y
-            if start_x < self.board_width:
-                cell = self.board[y][start_x]
-                if cell != ' ' and cell != '#':
-                    blockers.add(cell)
+            cells = [(vehicle.x + vehicle.length, vehicle.y)]
         else:
-            x = vehicle.x
-            start_y = vehicle.y - 1
-            if start_y >= 0:
-                cell = self.board[start_y][x]
-                if cell != ' ' and cell != '#':
-                    blockers.add(cell)
-            start_y = vehicle.y + vehicle.length
-            if start_y < self.board_height:
-                cell = self.board[start_y][x]
-                if cell != ' ' and cell != '#':
-                    blockers.add(cell)
+            cells = [(vehicle.x, vehicle.y - 1), (vehicle.x, vehicle.y + vehicle.length)]
+        blockers = {self.vehicle_at(x, y) for x, y in cells}
+        blockers.discard(None)
         return list(blockers)
 
     def no_moves_possible(self, vehicle: Vehicle) -> bool:
-        moves_back = self.get_potential_moves(vehicle, direction=-1)
-        moves_forw = self.get_potential_moves(vehicle, direction=+1)
-        return moves_back == 0 and moves_forw == 0
+        return self.lane_moves(vehicle) == (0, 0)
 
     def estimate_mobility(self, vehicle: Vehicle) -> int:
         """
         Nouvelle fonction pour estimer la mobilité locale du véhicule (utile pour l'heuristique).
         """
-        moves_back = self.get_potential_moves(vehicle, direction=-1)
-        moves_forw = self.get_potential_moves(vehicle, direction=+1)
+        moves_back, moves_forw = self.lane_moves(vehicle)
         return moves_back + moves_forw
+
+
+def canonical_key(puzzle: RushHourPuzzle) -> PuzzleKey:
+    """Clé indépendante de l'ordre des véhicules et des murs dans la source."""
+    geo = puzzle.geometry()
+    return (puzzle.board_width,
+            puzzle.board_height,
+            tuple(sorted(puzzle.walls)),
+            tuple(sorted((v.id, v.x, v.y, v.orientation, v.length) for v in puzzle.vehicles)),
+            geo.exit_side,
+            geo.exit_index,
+            geo.target_id)
@@ -0,0 +1,187 @@
+#solution_optimizer.py
+"""
+Post-optimisation d'une solution (liste d'actions (id, déplacement)).
+
+Trois réécritures, répétées tant que la solution raccourcit :
+    1. fusion des mouvements consécutifs d'un même véhicule (déplacement nul supprimé) ;
+    2. suppression des boucles : si un état est revisité, le détour est retiré ;
+    3. re-recherche par fenêtre : depuis chaque état du chemin, un BFS borné
+       cherche un raccourci vers un état situé jusqu'à window coups plus loin.
+Le résultat est ensuite rejoué par solution_verifier.verify_solution ; s'il
+n'est pas valide, la solution d'origine est retournée telle quelle.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from board_layout import Layout, State
+from node import Node
+from rush_hour_puzzle import Action, RushHourPuzzle
+from solution_verifier import verify_solution
+
+
+def merge_moves(solution: List[Action]) -> List[Action]:
+    """Fusionne les mouvements consécutifs d'un même véhicule."""
+    merged: List[Action] = []
+    for vehicle_id, displacement in solution:
+        if merged and merged[-1][0] == vehicle_id:
+            total = merged.pop()[1] + displacement
+            if total != 0:
+                merged.append((vehicle_id, total))
+        elif displacement != 0:
+            merged.append((vehicle_id, displacement))
+    return merged
+
+
+class SolutionOptimizer:
+    """Raccourcit les solutions d'une disposition donnée."""
+    def __init__(self, puzzle: RushHourPuzzle, window: int = 6, max_nodes: int = 50000):
+        self.puzzle = puzzle
+        self.layout, self.start = Layout.from_puzzle(puzzle)
+        self._index = {spec[0]: i for i, spec in enumerate(self.layout.specs)}
+        self.window = window
+        self.max_nodes = max_nodes
+
+    def states_of(self, solution: List[Action]) -> Optional[List[State]]:
+        """Suite des états visités, ou None si un mouvement sort de la disposition ou entre en collision."""
+        layout = self.layout
+        state = self.start
+        path = [state]
+        for vehicle_id, displacement in solution:
+            i = self._index.get(vehicle_id)
+            if i is None:
+                return None
+            q = state[i] + displacement
+            row = layout.masks[i]
+            if not 0 <= q < len(row):
+                return None
+            free = layout.occupancy(state) & ~row[state[i]]
+            lo, hi = min(state[i], q), max(state[i], q)
+            if any(row[p] & free for p in range(lo, hi + 1)):
+                return None
+            state = state[:i] + (q,) + state[i + 1:]
+            path.append(state)
+        return path
+
+    def actions_of(self, path: List[State]) -> List[Action]:
+        return [self.layout.action_between(a, b) for a, b in zip(path, path[1:])]
+
+    @staticmethod
+    def remove_loops(path: List[State]) -> List[State]:
+        """Retire les détours : à chaque état revisité, le chemin repart de sa première occurrence."""
+        result: List[State] = []
+        seen: Dict[State, int] = {}
+        for state in path:
+            k = seen.get(state)
+            if k is not None:
+                for removed in result[k + 1:]:
+                    del seen[removed]
+                del result[k + 1:]
+            else:
+                seen[state] = len(result)
+                result.append(state)
+        return result
+
+    def _shortcut_from(self, path: List[State], i: int) -> Optional[Tuple[int, List[State]]]:
+        """BFS borné depuis path[i] ; retourne (j, raccourci) vers le path[j] le plus lointain gagnant au moins un coup."""
+        layout = self.layout
+        end = min(i + self.window, len(path) - 1)
+        targets = {path[j]: j for j in range(i + 2, end + 1)}
+        if not targets:
+            return None
+        parents: Dict[State, Optional[State]] = {path[i]: None}
+        depth = {path[i]: 0}
+        queue = deque([path[i]])
+        best: Optional[State] = None
+        while queue and len(parents) < self.max_nodes:
+            s = queue.popleft()
+            if depth[s] + 1 >= end - i:
+                break
+            for n in layout.neighbors(s):
+                if n in parents:
+                    continue
+                parents[n] = s
+                depth[n] = depth[s] + 1
+                queue.append(n)
+                j = targets.get(n)
+                if j is not None and depth[n] < j - i and (best is None or j > targets[best]):
+                    best = n
+        if best is None:
+            return None
+        shortcut = [best]
+        while parents[shortcut[-1]] is not None:
+            shortcut.append(parents[shortcut[-1]])
+        return targets[best], shortcut[::-1]
+
+    def window_search(self, path: List[State]) -> List[State]:
+        result = list(path)
+        i = 0
+        while i < len(result) - 2:
+            found = self._shortcut_from(result, i)
+            if found is not None:
+                j, shortcut = found
+                result[i:j + 1] = shortcut
+            i += 1
+        return result
+
+    def optimize(self, solution: List[Action]) -> List[Action]:
+        """Solution raccourcie et vérifiée ; solution d'origine si rien n'est gagné ou si elle est hors disposition."""
+        current = merge_moves(solution)
+        path = self.states_of(current)
+        if path is None:
+            return solution
+        while True:
+            path = self.window_search(self.remove_loops(path))
+            candidate = merge_moves(self.actions_of(path))
+            if len(candidate) >= len(current):
+                break
+            current = candidate
+            path = self.states_of(current)
+        if len(current) < len(solution) and verify_solution(self.puzzle, current):
+            return current
+        return solution
+
+
+def optimize_solution(puzzle: RushHourPuzzle, solution: List[Action],
+                      window: int = 6, max_nodes: int = 50000) -> List[Action]:
+    return SolutionOptimizer(puzzle, window, max_nodes).optimize(solution)
+
+
+def solution_to_node(puzzle: RushHourPuzzle, solution: List[Action]) -> Node:
+    """Chaîne de Node rejouant solution (compatible getSolution/animate_solution)."""
+    node = Node(puzzle)
+    for action in solution:
+        index = node.state.get_vehicle_index(action[0])
+        node = Node(node.state.create_new_state(index, action[1]), node, action, node.g + 1)
+    return node
+
+
+def optimize_node(puzzle: RushHourPuzzle, node: Node, window: int = 6, max_nodes: int = 50000) -> Node:
+    solution = node.getSolution()
+    optimized = optimize_solution(puzzle, solution, window, max_nodes)
+    if len(optimized) == len(solution):
+        return node
+    return solution_to_node(puzzle, optimized)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from puzzle_corpus import iter_named_puzzles
+    from solver import astar, heuristic_h3
+
+    parser = argparse.ArgumentParser(description="Raccourcit les solutions de astar (h3) par réécriture locale.")
+    parser.add_argument("puzzle", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    parser.add_argument("--window", type=int, default=6)
+    parser.add_argument("--max-nodes", type=int, default=50000)
+    args = parser.parse_args()
+    for name, game in iter_named_puzzles(args.puzzle):
+        target = game.target_vehicle()
+        init = target.x if target else 0
+        node, _, _ = astar(game, lambda p: heuristic_h3(p, init))
+        if node is None:
+            print(f"{name} : aucune solution")
+            continue
+        solution = node.getSolution()
+        start = time.perf_counter()
+        optimized = optimize_solution(game, solution, args.window, args.max_nodes)
+        print(f"{name} : {len(solution)} -> {len(optimized)} mouvements ({time.perf_counter() - start:.3f}s)")
@@ -0,0 +1,266 @@
+#solution_verifier.py
+"""
+Vérification rapide de solutions (listes d'actions (id, déplacement)).
+
+L'occupation du plateau est un entier (bit y * largeur + x) ; un mouvement est
+légal si les cases balayées par le véhicule, hors les siennes, sont libres
+(ni véhicule ni mur) et si sa nouvelle position reste sur le plateau. Comme
+dans get_potential_moves, la voiture cible peut glisser d'une case au-delà de
+la sortie lorsque celle-ci est dégagée. Aucun objet Vehicle n'est modifié et
+setBoard n'est jamais appelé.
+
+Lignes de commande :
+    python solution_verifier.py <puzzles> <résultats.jsonl> [--workers N]
+où résultats.jsonl est la sortie de `main.py -f json` (champs "puzzle" et "solution").
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from puzzle_archive import decode_puzzle, encode_puzzle
+from rush_hour_puzzle import Action, RushHourPuzzle
+
+# (nom, puzzle ou enregistrement puzzle_archive.encode_puzzle, solution)
+VerificationItem = Tuple[str, Union[RushHourPuzzle, bytes], List[Action]]
+
+
+class VerificationResult:
+    """Verdict d'une solution ; move_index est l'index du premier mouvement illégal (-1 : état initial)."""
+    def __init__(self, valid: bool, moves: int, move_index: Optional[int] = None,
+                 action: Optional[Action] = None, reason: str = ""):
+        self.valid = valid
+        self.moves = moves
+        self.move_index = move_index
+        self.action = action
+        self.reason = reason
+
+    def __bool__(self) -> bool:
+        return self.valid
+
+    def __repr__(self) -> str:
+        if self.valid:
+            return f"VerificationResult(valide, {self.moves} mouvements)"
+        return f"VerificationResult(invalide au mouvement {self.move_index} {self.action} : {self.reason})"
+
+
+class SolutionVerifier:
+    """Vérificateur d'une disposition ; réutilisable pour plusieurs solutions du même puzzle."""
+    def __init__(self, puzzle: RushHourPuzzle):
+        geo = puzzle.geometry()
+        self.width, self.height = puzzle.board_width, puzzle.board_height
+        self.wall_mask = 0
+        for x, y in puzzle.walls:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                self.wall_mask |= 1 << (y * self.width + x)
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.start: List[int] = []
+        self.limits: List[Tuple[int, int]] = []
+        # cells[i][p - lo] : cases (tronquées au plateau) du véhicule i à la position p
+        self.cells: List[List[int]] = []
+        for i, v in enumerate(puzzle.vehicles):
+            horizontal = v.orientation == 'H'
+            lane = self.width if horizontal else self.height
+            lo, hi = 0, lane - v.length
+            if v.id == geo.target_id and geo.goal is not None:
+                if geo.exit_forward:
+                    hi += 1
+                else:
+                    lo -= 1
+            pos = v.x if horizontal else v.y
+            lo, hi = min(lo, pos), max(hi, pos)
+            row = []
+            for p in range(lo, hi + 1):
+                m = 0
+                for k in range(v.length):
+                    x, y = (p + k, v.y) if horizontal else (v.x, p + k)
+                    if 0 <= x < self.width and 0 <= y < self.height:
+                        m |= 1 << (y * self.width + x)
+                row.append(m)
+            self.ids.append(v.id)
+            self.index[v.id] = i
+            self.start.append(pos)
+            self.limits.append((lo, hi))
+            self.cells.append(row)
+        self.target = self.index.get(geo.target_id)
+        self.goal: Optional[int] = None
+        if self.target is not None and geo.goal is not None:
+            self.goal = geo.goal[0] if geo.horizontal_exit else geo.goal[1]
+        self.strict_limits = [(0, (self.width if v.orientation == 'H' else self.height) - v.length)
+                              for v in puzzle.vehicles]
+
+    def _blocker(self, positions: List[int], mask: int) -> str:
+        """Nom de ce qui occupe mask (appelé seulement en cas d'échec)."""
+        if mask & self.wall_mask:
+            return "un mur"
+        for j, p in enumerate(positions):
+            if self.cells[j][p - self.limits[j][0]] & mask:
+                return f"le véhicule {self.ids[j]}"
+        return "une case occupée"
+
+    def verify(self, solution: Iterable[Action]) -> VerificationResult:
+        positions = list(self.start)
+        occupied = self.wall_mask
+        for i, p in enumerate(positions):
+            m = self.cells[i][p - self.limits[i][0]]
+            if occupied & m or not self.strict_limits[i][0] <= p <= self.strict_limits[i][1]:
+                return VerificationResult(False, 0, -1, None, f"état initial invalide (véhicule {self.ids[i]})")
+            occupied |= m
+
+        count = 0
+        for k, action in enumerate(solution):
+            count += 1
+            vehicle_id, displacement = action
+            i = self.index.get(vehicle_id)
+            if i is None:
+                return VerificationResult(False, count, k, action, f"véhicule {vehicle_id} inconnu")
+            if displacement == 0:
+                return VerificationResult(False, count, k, action, "déplacement nul")
+            lo, hi = self.limits[i]
+            p = positions[i]
+            q = p + displacement
+            if not lo <= q <= hi:
+                return VerificationResult(False, count, k, action, "sortie du plateau")
+            row = self.cells[i]
+            own = row[p - lo]
+            swept = 0
+            for r in range(min(p, q) - lo, max(p, q) - lo + 1):
+                swept |= row[r]
+            collision = swept & ~own & occupied
+            if collision:
+                return VerificationResult(False, count, k, action,
+                                          f"collision avec {self._blocker(positions, collision)}")
+            occupied = (occupied & ~own) | row[q - lo]
+            positions[i] = q
+
+        if self.goal is None or positions[self.target] != self.goal:
+            return VerificationResult(False, count, count, None, "l'état final n'est pas un but")
+        return VerificationResult(True, count)
+
+
+def verify_solution(puzzle: RushHourPuzzle, solution: Iterable[Action]) -> VerificationResult:
+    return SolutionVerifier(puzzle).verify(solution)
+
+
+def _verify_chunk(items: List[VerificationItem]) -> List[Tuple[str, VerificationResult]]:
+    return [(name, verify_solution(decode_puzzle(puzzle) if isinstance(puzzle, bytes) else puzzle, solution))
+            for name, puzzle, solution in items]
+
+
+def _encoded(item: VerificationItem) -> VerificationItem:
+    """Remplace le puzzle par son enregistrement binaire, bien plus court à sérialiser vers un processus."""
+    name, puzzle, solution = item
+    return name, puzzle if isinstance(puzzle, bytes) else encode_puzzle(puzzle), solution
+
+
+def _chunks(items: Iterable[VerificationItem], size: int) -> Iterator[List[VerificationItem]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def verify_batch(items: Iterable[VerificationItem],
+                 workers: Optional[int] = None,
+                 chunk_size: int = 256,
+                 max_pending: Optional[int] = None) -> Iterator[Tuple[str, VerificationResult]]:
+    """
+    Vérifie un corpus (nom, puzzle, solution) dans un pool de processus, dans l'ordre d'entrée.
+    items est lu au fur et à mesure : au plus max_pending paquets (2 par processus par défaut)
+    sont soumis à la fois, et les puzzles voyagent encodés (puzzle_archive.encode_puzzle).
+    """
+    if workers == 1:
+        for chunk in _chunks(items, chunk_size):
+            yield from _verify_chunk(chunk)
+        return
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(map(_encoded, items), chunk_size):
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+            pending.append(pool.submit(_verify_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def join_results(puzzles: Iterable[Tuple[str, RushHourPuzzle]],
+                 results: Iterable[Tuple[str, Optional[List[Action]]]],
+                 missing: List[str]) -> Iterator[VerificationItem]:
+    """
+    Associe par nom les puzzles et les solutions en lisant les deux flux en parallèle.
+    Quand ils sont dans le même ordre (main.py -f json sur la même source), seuls quelques
+    éléments attendent leur partenaire ; les puzzles en attente sont gardés encodés.
+    Les résultats sans solution sont ignorés ; ceux dont le puzzle n'apparaît jamais
+    sont ajoutés à missing une fois les puzzles épuisés.
+    """
+    puzzles = iter(puzzles)
+    waiting_puzzles: Dict[str, bytes] = {}
+    waiting_results: Dict[str, Optional[List[Action]]] = {}
+    for name, solution in results:
+        if name in waiting_puzzles:
+            data = waiting_puzzles.pop(name)
+            if solution is not None:
+                yield name, data, solution
+            continue
+        waiting_results[name] = solution
+        for puzzle_name, puzzle in puzzles:
+            if puzzle_name in waiting_results:
+                found = waiting_results.pop(puzzle_name)
+                if found is not None:
+                    yield puzzle_name, encode_puzzle(puzzle), found
+                if puzzle_name == name:
+                    break
+            else:
+                waiting_puzzles[puzzle_name] = encode_puzzle(puzzle)
+    missing.extend(name for name, solution in waiting_results.items() if solution is not None)
+
+
+def iter_results_file(path: str) -> Iterator[Tuple[str, Optional[List[Action]]]]:
+    """Lit les lignes JSON de `main.py -f json` : (nom du puzzle, solution ou None)."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            solution = record.get("solution")
+            yield record["puzzle"], [(vid, int(d)) for vid, d in solution] if solution is not None else None
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+    from puzzle_corpus import iter_named_puzzles
+
+    parser = argparse.ArgumentParser(description="Vérifie en masse des solutions Rush Hour.")
+    parser.add_argument("puzzles", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    parser.add_argument("results", help="Fichier JSON lines produit par main.py -f json")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    missing = []
+    items = join_results(iter_named_puzzles(args.puzzles), iter_results_file(args.results), missing)
+
+    start = time.perf_counter()
+    checked = invalid = 0
+    for name, result in verify_batch(items, args.workers, args.chunk_size):
+        checked += 1
+        if not result:
+            invalid += 1
+            print(f"{name} : mouvement {result.move_index} {result.action} illégal : {result.reason}")
+    elapsed = time.perf_counter() - start
+    for name in missing:
+        print(f"{name} : puzzle introuvable dans {args.puzzles}")
+    print(f"{checked} solutions vérifiées en {elapsed:.3f}s, {invalid} invalides, "
+          f"{len(missing)} puzzles introuvables.")
+    sys.exit(1 if invalid or missing else 0)
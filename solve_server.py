@@ -0,0 +1,265 @@
+#solve_server.py
+"""
+Service de résolution asyncio (HTTP minimal, bibliothèque standard uniquement).
+
+    POST /solve   corps JSON : {"csv": "6,6\nX,0,2,H,2\n..."} ou {"board": "<chaîne de plateau>"}
+                  options    : "algorithm" (défaut "astar2"), "deadline" (secondes)
+    GET  /stats   compteurs du service
+
+Les résolutions sont exécutées dans un pool de processus. Les requêtes
+identiques en vol (même état canonique, même algorithme) partagent un seul
+calcul ; les résultats récents sont gardés dans un LRU borné. Une échéance
+dépassée renvoie 504 sans annuler le calcul partagé par les autres clients.
+L'échéance sert aussi de budget de temps au calcul : un client dont l'échéance
+dépasse celle du calcul en vol en lance un plus long, qui devient le calcul
+partagé. Un calcul que plus aucun client n'attend est retiré des calculs en vol
+et s'arrête à la fin de son budget ; un résultat interrompu n'est pas mis en cache.
+"""
+import asyncio
+import io
+import json
+import math
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from rush_hour_puzzle import PuzzleKey, RushHourPuzzle, Vehicle, canonical_key
+from solver import algorithm_catalog
+
+DEFAULT_ALGORITHM = "astar2"
+MAX_BODY = 1 << 20
+
+
+def puzzle_from_request(payload: dict) -> RushHourPuzzle:
+    if "csv" in payload:
+        puzzle = RushHourPuzzle()
+        puzzle.setVehiclesFromLines(io.StringIO(payload["csv"]))
+        return puzzle
+    if "board" in payload:
+        from puzzle_corpus import parse_board_string
+        return parse_board_string(payload["board"], payload.get("width"))
+    raise ValueError("Champ 'csv' ou 'board' attendu.")
+
+
+def _solve_in_worker(key: PuzzleKey, algorithme: str, deadline_at: Optional[float] = None) -> dict:
+    """
+    Exécuté dans un processus du pool : reconstruit le puzzle depuis sa clé et le résout.
+    deadline_at (time.time() absolu) borne la recherche, attente dans la file du pool comprise.
+    """
+    from main import construire_solveur
+    width, height, walls, vehicles, exit_side, exit_index, target_id = key
+    puzzle = RushHourPuzzle(height, width)
+    puzzle.walls = list(walls)
+    puzzle.exit_side, puzzle.exit_index, puzzle.target_id = exit_side, exit_index, target_id
+    puzzle.vehicles = [Vehicle(vid, x, y, o, length) for vid, x, y, o, length in vehicles]
+    puzzle.setBoard()
+    time_budget = max(0.0, deadline_at - time.time()) if deadline_at is not None else None
+    search = construire_solveur(puzzle, algorithme, time_budget)
+    if search is None:
+        raise ValueError(f"Algorithme inconnu : {algorithme}")
+    result = search(puzzle)
+    solution_node, explored_count, exec_time = result
+    solution = solution_node.getSolution() if solution_node else None
+    return {
+        "solved": solution is not None,
+        "moves": len(solution) if solution is not None else None,
+        "solution": [list(a) for a in solution] if solution is not None else None,
+        "explored": explored_count,
+        "time": exec_time,
+        "budget_exhausted": getattr(result, "budget_exhausted", False),
+    }
+
+
+class _Computation:
+    """Calcul en vol : future du pool, fin de son budget (loop.time(), None : illimité), clients en attente."""
+    def __init__(self, future: asyncio.Future, budget_end: Optional[float]):
+        self.future = future
+        self.budget_end = budget_end
+        self.waiters = 0
+
+
+class SolveService:
+    """Coalescence des requêtes en vol, LRU des résultats et échéances par requête."""
+    def __init__(self, workers: Optional[int] = None, cache_size: int = 1024):
+        # spawn : un processus créé par fork pendant une requête hériterait des sockets
+        # clients ouverts, et leur fermeture par le serveur ne terminerait pas la connexion
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[Tuple, dict]" = OrderedDict()
+        self.in_flight: Dict[Tuple, _Computation] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "computed": 0, "timeouts": 0,
+                      "abandoned": 0, "errors": 0}
+
+    def _cache_put(self, key, result: dict):
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def solve(self, puzzle: RushHourPuzzle, algorithme: str = DEFAULT_ALGORITHM,
+                    deadline: Optional[float] = None) -> dict:
+        self.stats["requests"] += 1
+        if algorithme not in algorithm_catalog():
+            raise ValueError(f"Algorithme inconnu : {algorithme}")
+        key = (canonical_key(puzzle), algorithme)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline if deadline is not None else None
+        computation = self.in_flight.get(key)
+        if computation is not None and computation.budget_end is not None and \
+                (end is None or end > computation.budget_end):
+            # Le calcul en vol s'arrêtera avant l'échéance de ce client : on en lance un plus long
+            computation = None
+        if computation is None:
+            deadline_at = time.time() + deadline if deadline is not None else None
+            future = loop.run_in_executor(self.pool, _solve_in_worker, key[0], algorithme, deadline_at)
+            computation = _Computation(future, end)
+            self.in_flight[key] = computation
+            self.stats["computed"] += 1
+            future.add_done_callback(lambda f, c=computation: self._on_done(key, c))
+        else:
+            self.stats["coalesced"] += 1
+
+        computation.waiters += 1
+        try:
+            # shield : l'échéance d'un client n'annule pas le calcul partagé
+            if deadline is None:
+                return await asyncio.shield(computation.future)
+            return await asyncio.wait_for(asyncio.shield(computation.future), timeout=deadline)
+        finally:
+            computation.waiters -= 1
+            if computation.waiters == 0 and not computation.future.done():
+                self._abandon(key, computation)
+
+    def _abandon(self, key, computation: _Computation):
+        """Plus aucun client n'attend : retire le calcul ; s'il tourne déjà, son budget l'arrêtera."""
+        if self.in_flight.get(key) is computation:
+            del self.in_flight[key]
+        computation.future.cancel()
+        self.stats["abandoned"] += 1
+
+    def _on_done(self, key, computation: _Computation):
+        if self.in_flight.get(key) is computation:
+            del self.in_flight[key]
+        future = computation.future
+        if not future.cancelled() and future.exception() is None:
+            result = future.result()
+            if not result.get("budget_exhausted"):
+                self._cache_put(key, result)
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SolveServer:
+    """Serveur HTTP/1.1 minimal (une requête par connexion) au-dessus de SolveService."""
+    def __init__(self, service: SolveService, host: str = "127.0.0.1", port: int = 8765):
+        self.service = service
+        self.host = host
+        self.port = port
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, body = await self._dispatch(reader)
+        except Exception as e:
+            self.service.stats["errors"] += 1
+            status, body = 500, {"error": str(e)}
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  500: "Internal Server Error", 504: "Gateway Timeout"}.get(status, "OK")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(data)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("ascii") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            return 400, {"error": "Requête invalide."}
+        method, path = request_line[0], request_line[1]
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if method == "GET" and path == "/stats":
+            stats = dict(self.service.stats, in_flight=len(self.service.in_flight),
+                         cached=len(self.service.cache))
+            return 200, stats
+        if method != "POST" or path != "/solve":
+            return 404, {"error": f"{method} {path} inconnu."}
+
+        length = int(headers.get("content-length", "0"))
+        if length > MAX_BODY:
+            return 413, {"error": "Corps trop volumineux."}
+        try:
+            payload = json.loads(await reader.readexactly(length))
+            puzzle = puzzle_from_request(payload)
+        except Exception as e:
+            return 400, {"error": f"Puzzle invalide : {e}"}
+
+        algorithme = payload.get("algorithm", DEFAULT_ALGORITHM)
+        if not isinstance(algorithme, str):
+            return 400, {"error": "Champ 'algorithm' : chaîne attendue."}
+        deadline = payload.get("deadline")
+        if deadline is not None:
+            try:
+                deadline = float(deadline)
+            except (TypeError, ValueError):
+                return 400, {"error": f"Champ 'deadline' : nombre de secondes attendu, pas {deadline!r}."}
+            if not (math.isfinite(deadline) and deadline > 0):
+                return 400, {"error": "Champ 'deadline' : nombre de secondes positif attendu."}
+
+        start = time.perf_counter()
+        try:
+            result = await self.service.solve(puzzle, algorithme, deadline)
+        except asyncio.TimeoutError:
+            self.service.stats["timeouts"] += 1
+            return 504, {"error": "Échéance dépassée."}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        if result.get("budget_exhausted") and not result["solved"]:
+            # Le calcul s'est arrêté sur son budget, juste avant l'échéance du client
+            self.service.stats["timeouts"] += 1
+            return 504, {"error": "Échéance dépassée."}
+        return 200, dict(result, latency=time.perf_counter() - start)
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Service HTTP de résolution Rush Hour.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+    service = SolveService(args.workers, args.cache_size)
+    print(f"Service de résolution sur http://{args.host}:{args.port}")
+    try:
+        asyncio.run(SolveServer(service, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
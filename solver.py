@@ -1,34 +1,31 @@
 #solver.py
 # solver.py
-from typing import Optional, Callable, Tuple
+from typing import Any, Dict, List, Optional, Callable, Tuple
+import copy
 import heapq
+import importlib
+import itertools
+import os
 import time  # Ajouté pour mesurer le temps
+import tracemalloc
 from collections import deque
 from node import Node
-from rush_hour_puzzle import RushHourPuzzle
+from rush_hour_puzzle import Action, RushHourPuzzle, Vehicle
+from pruning import is_unsolvable
 
 def heuristic_h1(puzzle: RushHourPuzzle) -> int:
     """
-    Heuristique h1 : Distance de la voiture rouge (X) à la sortie.
-    La voiture rouge est horizontale, donc la distance est board_width - (x + length).
+    Heuristique h1 : Distance de la voiture cible à la sortie.
+    Pour la sortie par défaut (à droite), la distance est board_width - (x + length).
     """
-    red_car = next((v for v in puzzle.vehicles if v.id == 'X'), None)
-    if not red_car or red_car.orientation != 'H':
-        return 0
-    return puzzle.board_width - (red_car.x + red_car.length)
+    return puzzle.distance_to_exit()
 
 def heuristic_h2(puzzle: RushHourPuzzle) -> int:
     """
-    Heuristique h2 : h1 + nombre de véhicules bloquant le chemin de la voiture rouge vers la sortie.
-    Les véhicules bloquants sont ceux dans la rangée de sortie (board_height//2 - 1) et à droite de la voiture rouge.
+    Heuristique h2 : h1 + nombre de véhicules bloquant le chemin de la voiture cible vers la sortie.
+    Les véhicules bloquants sont ceux sur la ligne de sortie, entre la voiture cible et la sortie.
     """
-    h1 = heuristic_h1(puzzle)
-    red_car = next((v for v in puzzle.vehicles if v.id == 'X'), None)
-    if not red_car:
-        return h1
-    exit_row = (puzzle.board_height // 2) - 1
-    blocking_count = sum(1 for v in puzzle.vehicles if v.id != 'X' and v.y == exit_row and v.x > red_car.x)
-    return h1 + blocking_count
+    return heuristic_h1(puzzle) + len(puzzle.exit_lane_vehicles())
 
 def heuristic_h3(puzzle: RushHourPuzzle, red_car_init_pos: int) -> int:
     """
@@ -36,65 +33,975 @@ def heuristic_h3(puzzle: RushHourPuzzle, red_car_init_pos: int) -> int:
     Cela rend l'heuristique plus informée en considérant les chaînes de blocage, améliorant potentiellement les performances
     (moins de nœuds explorés, temps réduit) tout en gardant un nombre de mouvements proche de BFS.
     """
-    h2 = heuristic_h2(puzzle)
-    red_car = next((v for v in puzzle.vehicles if v.id == 'X'), None)
-    if not red_car:
-        return h2
-    exit_row = (puzzle.board_height // 2) - 1
-    blocking_vehicles = [v for v in puzzle.vehicles if v.id != 'X' and v.y == exit_row and v.x > red_car.x]
+    blocking_vehicles = puzzle.exit_lane_vehicles()
+    h2 = heuristic_h1(puzzle) + len(blocking_vehicles)
     additional_blockers = sum(len(puzzle.get_blockers_of_vehicle_by_id(v.id)) for v in blocking_vehicles)
     return h2 + additional_blockers
 
-def bfs(initial: RushHourPuzzle) -> Tuple[Optional[Node], int, float]:
+def _exit_span(puzzle: RushHourPuzzle) -> Optional[Tuple[int, int]]:
+    """Cases [lo, hi) de la ligne de sortie entre la cible et la sortie ; None si la cible est au but."""
+    target = puzzle.target_vehicle()
+    geo = puzzle.geometry()
+    if target is None or geo.goal is None or (target.x, target.y) == geo.goal:
+        return None
+    horizontal = geo.horizontal_exit
+    start = target.x if horizontal else target.y
+    if geo.exit_side in ('E', 'S'):
+        return start + target.length, puzzle.board_width if horizontal else puzzle.board_height
+    return 0, start
+
+
+def _blocks_exit(geo, x: int, y: int, orientation: str, length: int, span: Tuple[int, int]) -> bool:
+    """Vrai si le véhicule (x, y, orientation, length) occupe une case de span sur la ligne de sortie."""
+    lo, hi = span
+    horizontal = geo.horizontal_exit
+    # a : coordonnée le long de la ligne de sortie, c : en travers
+    a, c = (x, y) if horizontal else (y, x)
+    if (orientation == 'H') == horizontal:
+        return c == geo.exit_index and a < hi and a + length > lo
+    return c <= geo.exit_index < c + length and lo <= a < hi
+
+
+def heuristic_moves(puzzle: RushHourPuzzle) -> int:
+    """
+    Heuristique admissible en nombre de mouvements : 1 si la cible n'est pas au but,
+    plus le nombre de véhicules qui occupent une case de la ligne de sortie entre la
+    cible et la sortie (chacun doit bouger au moins une fois). h1, h2 et h3 comptent
+    des cases et peuvent surestimer. Un mouvement ne change la valeur que d'au plus 1 :
+    elle est aussi cohérente, ce qui garantit les bornes d'anytime_astar.
+    """
+    span = _exit_span(puzzle)
+    if span is None:
+        return 0
+    geo = puzzle.geometry()
+    tid = geo.target_id
+    return 1 + sum(_blocks_exit(geo, v.x, v.y, v.orientation, v.length, span)
+                   for v in puzzle.vehicles if v.id != tid)
+
+
+class MovesHeuristic:
+    """
+    heuristic_moves avec delta(parent, h_parent, action, enfant) (voir IncrementalHeuristic) :
+    si la cible ne bouge pas, seul le véhicule déplacé peut entrer ou sortir de la ligne de sortie.
+    """
+    def __init__(self):
+        self._geometry = None
+        self._parent: Optional[RushHourPuzzle] = None
+        self._span: Optional[Tuple[int, int]] = None
+        self._index: Dict[str, int] = {}
+
+    def __call__(self, puzzle: RushHourPuzzle) -> int:
+        return heuristic_moves(puzzle)
+
+    def delta(self, parent: RushHourPuzzle, parent_value: int, action: Action, child: RushHourPuzzle) -> int:
+        geo = parent.geometry()
+        vehicle_id, displacement = action
+        if vehicle_id == geo.target_id:
+            return heuristic_moves(child)
+        if self._parent is not parent:
+            if self._geometry is not geo:
+                self._geometry = geo
+                self._index = {v.id: i for i, v in enumerate(parent.vehicles)}
+            self._parent = parent
+            self._span = _exit_span(parent)
+        i = self._index.get(vehicle_id)
+        if self._span is None or i is None or i >= len(parent.vehicles) or parent.vehicles[i].id != vehicle_id:
+            return heuristic_moves(child)
+        v = parent.vehicles[i]
+        x, y = (v.x + displacement, v.y) if v.orientation == 'H' else (v.x, v.y + displacement)
+        return (parent_value + _blocks_exit(geo, x, y, v.orientation, v.length, self._span)
+                - _blocks_exit(geo, v.x, v.y, v.orientation, v.length, self._span))
+
+
+class IncrementalHeuristic:
+    """
+    h1, h2 ou h3 (level), appelable comme les fonctions ci-dessus, avec en plus
+    delta(parent, h_parent, action, enfant) : valeur de l'enfant déduite de celle du
+    parent, l'enfant ne différant que par le véhicule déplacé.
+    Seul un mouvement de la cible impose un recalcul complet. Sinon h1 est inchangé,
+    h2 varie de +-1 si le véhicule entre ou sort de la ligne de sortie, et h3 n'est
+    recalculé que si le véhicule est un bloqueur, le devient, ou balaie une case
+    voisine d'un bloqueur. Les données du parent (cible, bloqueurs, cases voisines)
+    sont calculées une fois pour tous ses enfants.
+    """
+    def __init__(self, level: int, red_car_init_pos: int = 0):
+        if level not in (1, 2, 3):
+            raise ValueError(f"Niveau d'heuristique inconnu : {level}")
+        self.level = level
+        self.red_car_init_pos = red_car_init_pos
+        self._geometry = None
+        self._index: Dict[str, int] = {}
+        self._parent: Optional[RushHourPuzzle] = None
+        self._target: Optional[Vehicle] = None
+        self._blocker_ids = frozenset()
+        self._probes: List[Tuple[int, int]] = []
+
+    def __call__(self, puzzle: RushHourPuzzle) -> int:
+        if self.level == 1:
+            return heuristic_h1(puzzle)
+        if self.level == 2:
+            return heuristic_h2(puzzle)
+        return heuristic_h3(puzzle, self.red_car_init_pos)
+
+    def _prepare(self, parent: RushHourPuzzle):
+        geo = parent.geometry()
+        if self._geometry is not geo:
+            # Les états d'une même disposition gardent l'ordre de leurs véhicules
+            self._geometry = geo
+            self._index = {v.id: i for i, v in enumerate(parent.vehicles)}
+        self._parent = parent
+        self._target = parent.target_vehicle()
+        if self.level == 3:
+            blockers = parent.exit_lane_vehicles()
+            self._blocker_ids = frozenset(v.id for v in blockers)
+            # Cases lues par get_blockers_of_vehicle_by_id pour chaque bloqueur
+            probes = []
+            for b in blockers:
+                if b.orientation == 'H':
+                    if b.x + b.length < parent.board_width:
+                        probes.append((b.x + b.length, b.y))
+                else:
+                    if b.y - 1 >= 0:
+                        probes.append((b.x, b.y - 1))
+                    if b.y + b.length < parent.board_height:
+                        probes.append((b.x, b.y + b.length))
+            self._probes = probes
+
+    def _in_exit_lane(self, x: int, y: int) -> bool:
+        """Même critère que RushHourPuzzle.exit_lane_vehicles, pour un véhicule d'origine (x, y)."""
+        geo, target = self._geometry, self._target
+        if geo.exit_side == 'E':
+            return y == geo.exit_index and x > target.x
+        if geo.exit_side == 'W':
+            return y == geo.exit_index and x < target.x
+        if geo.exit_side == 'S':
+            return x == geo.exit_index and y > target.y
+        return x == geo.exit_index and y < target.y
+
+    def delta(self, parent: RushHourPuzzle, parent_value: int, action: Action, child: RushHourPuzzle) -> int:
+        if self._parent is not parent:
+            self._prepare(parent)
+        vehicle_id, displacement = action
+        target = self._target
+        i = self._index.get(vehicle_id)
+        if target is None or vehicle_id == target.id or i is None or i >= len(parent.vehicles):
+            return self(child)
+        if self.level == 1:
+            return parent_value
+        v = parent.vehicles[i]
+        if v.id != vehicle_id:
+            return self(child)
+        horizontal = v.orientation == 'H'
+        x, y = (v.x + displacement, v.y) if horizontal else (v.x, v.y + displacement)
+        change = self._in_exit_lane(x, y) - self._in_exit_lane(v.x, v.y)
+        if self.level == 2:
+            return parent_value + change
+        if change or vehicle_id in self._blocker_ids:
+            return self(child)
+        # Cases balayées par le mouvement (positions de départ et d'arrivée comprises)
+        lo = min(v.x, x) if horizontal else min(v.y, y)
+        hi = lo + v.length + abs(displacement)
+        for px, py in self._probes:
+            if (py == v.y and lo <= px < hi) if horizontal else (px == v.x and lo <= py < hi):
+                return self(child)
+        return parent_value
+
+
+# Callback de progression : (nœuds explorés, taille de la frontière, nœud en cours d'expansion)
+ProgressCallback = Callable[[int, int, Node], None]
+
+
+def _record(stats: Optional[Dict[str, Any]], **values):
+    if stats is not None:
+        stats.update(values)
+
+
+def _child_values(heuristic: Callable[[RushHourPuzzle], int], delta, batch,
+                  parent: Node, parent_value: float, children: List[Node]) -> List[float]:
+    """Heuristique des enfants de parent : par delta si disponible, sinon par batch, sinon une à une."""
+    if delta is not None:
+        return [delta(parent.state, parent_value, child.action, child.state) for child in children]
+    if batch is not None and children:
+        return batch([child.state for child in children])
+    return [heuristic(child.state) for child in children]
+
+
+def _out_of_budget(expansions: int, node_budget: Optional[int], deadline: Optional[float]) -> bool:
+    return (node_budget is not None and expansions >= node_budget) or \
+           (deadline is not None and time.time() >= deadline)
+
+
+def bfs(initial: RushHourPuzzle,
+        on_progress: Optional[ProgressCallback] = None,
+        progress_every: int = 256,
+        stats: Optional[Dict[str, Any]] = None,
+        node_budget: Optional[int] = None,
+        time_budget: Optional[float] = None) -> Tuple[Optional[Node], int, float]:
     """
     Algorithme BFS : Recherche en largeur d'abord pour trouver la solution avec le nombre minimal de mouvements.
+    Les états visités sont mémorisés par rang (state_ranking.CompactVisited), sans garder leurs nœuds.
+    Si on_progress est fourni, il est appelé toutes les progress_every expansions (coût négligeable).
+    Si stats est fourni, il reçoit expanded, generated, stored, prune_time et budget_exhausted.
+    La recherche s'arrête sans solution si node_budget expansions ou time_budget secondes sont épuisés.
     Retourne : (nœud solution, nombre de nœuds explorés, temps d'exécution en secondes)
     """
     start_time = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+    limited = node_budget is not None or deadline is not None
     initial_node = Node(initial)
     if initial.isGoal():
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=0.0)
         return initial_node, 1, time.time() - start_time
-    frontier = deque([initial_node])
-    explored = set([initial_node])
+    if is_unsolvable(initial):
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=time.time() - start_time)
+        return None, 0, time.time() - start_time
+    prune_time = time.time() - start_time
+    from state_ranking import CompactVisited
+    explored = CompactVisited(initial)
+    initial_rank = explored.rank(initial)
+    explored.add(initial_rank)
+    frontier = deque([(initial_node, initial_rank)])
     explored_count = 1  # Compte le nœud initial
+    expansions = 0
+    generated = 1
     while frontier:
-        node = frontier.popleft()
-        for action, successor in node.state.successorFunction():
-            child = Node(successor, node, action, node.g + 1)
-            if child not in explored:
+        if limited and _out_of_budget(expansions, node_budget, deadline):
+            _record(stats, expanded=expansions, generated=generated, stored=len(explored),
+                    prune_time=prune_time, budget_exhausted=True)
+            return None, explored_count, time.time() - start_time
+        node, rank = frontier.popleft()
+        expansions += 1
+        if on_progress is not None and expansions % progress_every == 0:
+            on_progress(explored_count, len(frontier), node)
+        successors = node.state.successorFunction()
+        generated += len(successors)
+        for action, successor in successors:
+            child_rank = explored.child_rank(node.state, rank, action)
+            if child_rank not in explored:
+                child = Node(successor, node, action, node.g + 1)
                 explored_count += 1
                 if successor.isGoal():
+                    _record(stats, expanded=expansions, generated=generated, stored=len(explored) + 1,
+                            prune_time=prune_time)
                     return child, explored_count, time.time() - start_time
-                explored.add(child)
-                frontier.append(child)
+                explored.add(child_rank)
+                frontier.append((child, child_rank))
+    _record(stats, expanded=expansions, generated=generated, stored=len(explored), prune_time=prune_time)
     return None, explored_count, time.time() - start_time
 
-def astar(initial: RushHourPuzzle, heuristic: Callable[[RushHourPuzzle], int]) -> Tuple[Optional[Node], int, float]:
+# Départage des nœuds de même f dans la frontière de astar. "low-g" est l'ordre
+# natif de Node (g le plus faible d'abord) ; les autres enveloppent les nœuds.
+TIE_BREAKING = {
+    "low-g": None,
+    "high-g": lambda node, count: (node.f, -node.g, count, node),
+    "fifo": lambda node, count: (node.f, count, node),
+    "lifo": lambda node, count: (node.f, -count, node),
+}
+
+
+def astar(initial: RushHourPuzzle,
+          heuristic: Callable[[RushHourPuzzle], int],
+          on_progress: Optional[ProgressCallback] = None,
+          progress_every: int = 256,
+          tie_breaking: str = "low-g",
+          stats: Optional[Dict[str, Any]] = None,
+          node_budget: Optional[int] = None,
+          time_budget: Optional[float] = None) -> Tuple[Optional[Node], int, float]:
     """
     Algorithme A* : Recherche avec heuristique pour trouver une solution optimale ou proche.
+    Si on_progress est fourni, il est appelé toutes les progress_every expansions (coût négligeable).
+    tie_breaking choisit l'ordre des nœuds de même f (voir TIE_BREAKING).
+    Si l'heuristique a une méthode delta(parent, h_parent, action, enfant), la valeur
+    d'un enfant est déduite de celle de son parent (voir IncrementalHeuristic) ; sinon,
+    si elle a une méthode batch(états) -> valeurs, tous les enfants d'une
+    expansion sont évalués en un seul appel (ex. modèle appris, voir learned_heuristic).
+    Les ensembles fermé et g sont indexés par rang d'état (state_ranking.CompactVisited).
+    Si stats est fourni, il reçoit expanded, generated, stored, prune_time et budget_exhausted.
+    La recherche s'arrête sans solution si node_budget expansions ou time_budget secondes sont épuisés.
     Retourne : (nœud solution, nombre de nœuds explorés, temps d'exécution en secondes)
     """
+    if tie_breaking not in TIE_BREAKING:
+        raise ValueError(f"Départage inconnu : {tie_breaking} (choix : {', '.join(TIE_BREAKING)})")
+    wrap = TIE_BREAKING[tie_breaking]
+    delta_heuristic = getattr(heuristic, "delta", None)
+    batch_heuristic = getattr(heuristic, "batch", None)
+    counter = itertools.count()
     start_time = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+    limited = node_budget is not None or deadline is not None
+    if is_unsolvable(initial):
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=time.time() - start_time)
+        return None, 0, time.time() - start_time
+    prune_time = time.time() - start_time
     initial_node = Node(initial)
     initial_node.setF(heuristic(initial))
     frontier = []
-    heapq.heappush(frontier, initial_node)
-    explored = set()
-    g_score = {initial_node: 0}
+    heapq.heappush(frontier, initial_node if wrap is None else wrap(initial_node, next(counter)))
+    from state_ranking import CompactVisited
+    explored = CompactVisited(initial)
+    g_score = {explored.rank(initial): 0}
     explored_count = 0  # Sera incrémenté quand on explore
+    generated = 1
     while frontier:
+        if limited and _out_of_budget(explored_count, node_budget, deadline):
+            _record(stats, expanded=explored_count, generated=generated, stored=len(g_score),
+                    prune_time=prune_time, budget_exhausted=True)
+            return None, explored_count, time.time() - start_time
         current = heapq.heappop(frontier)
+        if wrap is not None:
+            current = current[-1]
         if current.state.isGoal():
+            _record(stats, expanded=explored_count, generated=generated, stored=len(g_score),
+                    prune_time=prune_time)
             return current, explored_count, time.time() - start_time
-        explored.add(current)
+        rank = explored.rank(current.state)
+        explored.add(rank)
         explored_count += 1
-        for action, successor in current.state.successorFunction():
-            neighbor = Node(successor, current, action, current.g + 1)
-            if neighbor in explored:
+        if on_progress is not None and explored_count % progress_every == 0:
+            on_progress(explored_count, len(frontier), current)
+        successors = current.state.successorFunction()
+        generated += len(successors)
+        children = []
+        tentative_g = current.g + 1
+        for action, successor in successors:
+            child_rank = explored.child_rank(current.state, rank, action)
+            if child_rank in explored:
                 continue
+            if tentative_g < g_score.get(child_rank, float('inf')):
+                g_score[child_rank] = tentative_g
+                children.append(Node(successor, current, action, tentative_g))
+        values = _child_values(heuristic, delta_heuristic, batch_heuristic, current, current.f - current.g, children)
+        for neighbor, value in zip(children, values):
+            neighbor.setF(value)
+            heapq.heappush(frontier, neighbor if wrap is None else wrap(neighbor, next(counter)))
+    _record(stats, expanded=explored_count, generated=generated, stored=len(g_score), prune_time=prune_time)
+    return None, explored_count, time.time() - start_time
+
+def anytime_astar(initial: RushHourPuzzle,
+                  heuristic: Callable[[RushHourPuzzle], int],
+                  weights: Tuple[float, ...] = (5.0, 3.0, 2.0, 1.5, 1.0),
+                  time_budget: Optional[float] = None,
+                  node_budget: Optional[int] = None,
+                  on_solution: Optional[Callable[[Node, Optional[float]], None]] = None,
+                  on_progress: Optional[ProgressCallback] = None,
+                  progress_every: int = 256,
+                  stats: Optional[Dict[str, Any]] = None,
+                  admissible: bool = False) -> Tuple[Optional[Node], int, float, Optional[float]]:
+    """
+    A* pondéré "anytime" (ARA*) : des passes f = g + w*h de poids w décroissant, qui
+    partagent leurs valeurs g. La première passe (w élevé) trouve vite une solution ;
+    chaque passe suivante repart de la frontière de la précédente, complétée des états
+    fermés dont g a baissé entre-temps (incohérents), au lieu de recommencer à zéro.
+    Une passe s'arrête dès que la plus petite clé de la frontière atteint la longueur de
+    la meilleure solution ; tout nœud dont g + h l'atteint déjà est élagué.
+    Les états sont repérés par rang (state_ranking.CompactVisited) et h de chaque enfant
+    est déduit de celui de son parent si l'heuristique a une méthode delta (voir astar).
+    La recherche s'arrête dès que le budget (secondes ou nœuds explorés) est épuisé.
+    on_solution(nœud, borne) est appelé à chaque nouvelle meilleure solution.
+    Si stats est fourni, il reçoit expanded, generated, stored, prune_time et budget_exhausted.
+    Retourne : (meilleur nœud solution, nœuds explorés, temps, borne d'optimalité)
+    La borne (coût / coût optimal <= borne) n'est calculée que si admissible est vrai,
+    c'est-à-dire si l'heuristique est admissible et cohérente (ADMISSIBLE_HEURISTICS) ;
+    sinon elle vaut None. Une passe de poids w terminée donne min(w, coût / min(g + h))
+    sur la frontière et les états incohérents. Si le budget interrompt la recherche,
+    l'optimum est au moins h(initial) et, pendant la passe w = 1, au moins min(g + h)
+    de la frontière.
+    """
+    start_time = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+    incumbent: Optional[Node] = None
+    bound: Optional[float] = None
+    explored_count = 0
+    generated = 1
+    out_of_budget = False
+
+    def tighten(value: float):
+        nonlocal bound
+        if admissible:
+            bound = value if bound is None else min(bound, value)
+
+    if initial.isGoal():
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=0.0)
+        return Node(initial), 1, time.time() - start_time, 1.0
+    if is_unsolvable(initial):
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=time.time() - start_time)
+        return None, 0, time.time() - start_time, None
+    prune_time = time.time() - start_time
+
+    from state_ranking import CompactVisited
+    delta_heuristic = getattr(heuristic, "delta", None)
+    batch_heuristic = getattr(heuristic, "batch", None)
+    counter = itertools.count()
+    closed = CompactVisited(initial)
+    root = Node(initial)
+    root_rank = closed.rank(initial)
+    h_initial = heuristic(initial)
+    g_score = {root_rank: 0}
+    # Frontière : (g + w*h, -g, compteur, h, rang, nœud) ; incohérents : (h, rang, nœud)
+    frontier = [(0, 0, 0, h_initial, root_rank, root)]
+    inconsistent: List[Tuple[float, int, Node]] = []
+
+    def pending():
+        """États à reprendre (frontière et incohérents), sans les entrées périmées ni élaguées."""
+        states = {}
+        for h, rank, node in itertools.chain(((e[3], e[4], e[5]) for e in frontier), inconsistent):
+            if g_score.get(rank) == node.g and (incumbent is None or node.g + h < incumbent.g):
+                states[rank] = (h, rank, node)
+        return states.values()
+
+    def lower_bound() -> float:
+        """min(g + h) des états à reprendre, plafonné par la meilleure solution."""
+        return min([incumbent.g] + [node.g + h for h, _, node in pending()])
+
+    for w in weights:
+        frontier = [(node.g + w * h, -node.g, next(counter), h, rank, node) for h, rank, node in pending()]
+        heapq.heapify(frontier)
+        inconsistent = []
+        closed.clear()
+        while frontier:
+            if _out_of_budget(explored_count, node_budget, deadline):
+                out_of_budget = True
+                break
+            key, _, _, h, rank, current = frontier[0]
+            if g_score[rank] != current.g or rank in closed:
+                heapq.heappop(frontier)  # entrée périmée
+                continue
+            if incumbent is not None and key >= incumbent.g:
+                break
+            heapq.heappop(frontier)
+            if incumbent is not None and current.g + h >= incumbent.g:
+                continue
+            closed.add(rank)
+            explored_count += 1
+            if on_progress is not None and explored_count % progress_every == 0:
+                on_progress(explored_count, len(frontier), current)
+            # Les états enfants ne sont créés que si leur g s'améliore
+            moves = current.state.legal_moves()
+            generated += len(moves)
             tentative_g = current.g + 1
-            if tentative_g < g_score.get(neighbor, float('inf')):
-                g_score[neighbor] = tentative_g
-                neighbor.setF(heuristic(successor))
-                heapq.heappush(frontier, neighbor)
+            children = []
+            ranks = []
+            for i, action in moves:
+                child_rank = closed.child_rank(current.state, rank, action)
+                if tentative_g >= g_score.get(child_rank, float('inf')):
+                    continue
+                g_score[child_rank] = tentative_g
+                successor = current.state.create_new_state(i, action[1])
+                child = Node(successor, current, action, tentative_g)
+                if successor.isGoal():
+                    if incumbent is None or tentative_g < incumbent.g:
+                        incumbent = child
+                        if on_solution is not None:
+                            on_solution(incumbent, bound)
+                    continue
+                children.append(child)
+                ranks.append(child_rank)
+            values = _child_values(heuristic, delta_heuristic, batch_heuristic, current, h, children)
+            for child, child_rank, value in zip(children, ranks, values):
+                if incumbent is not None and tentative_g + value >= incumbent.g:
+                    continue
+                if child_rank in closed:
+                    inconsistent.append((value, child_rank, child))
+                else:
+                    heapq.heappush(frontier, (tentative_g + w * value, -tentative_g, next(counter),
+                                              value, child_rank, child))
+
+        if out_of_budget:
+            if incumbent is not None:
+                # Borne inférieure sur l'optimum ; les nœuds élagués ont g + h >= incumbent.g
+                lower = h_initial
+                if w == 1.0:
+                    lower = max(lower, lower_bound())
+                if lower > 0:
+                    tighten(max(1.0, incumbent.g / lower))
+            break
+        if incumbent is None:
+            # Frontière épuisée sans solution : puzzle insoluble
+            break
+        # Passe terminée : la solution est à au plus w fois l'optimum
+        lower = lower_bound()
+        tighten(min(w, incumbent.g / lower) if lower > 0 else w)
+        if lower >= incumbent.g:
+            tighten(1.0)
+            break
+
+    _record(stats, expanded=explored_count, generated=generated, stored=len(g_score),
+            prune_time=prune_time, budget_exhausted=out_of_budget)
+    return incumbent, explored_count, time.time() - start_time, bound
+
+
+# Recherches non optimales pour les grands plateaux : seule la valeur h ordonne
+# les nœuds (node.f = h). Les états déjà vus sont ignorés ; seules leurs clés
+# (state_key) sont gardées, pas les nœuds écartés, et max_stored borne leur nombre.
+BEAM_WIDTH = 200
+MAX_STORED = 1000000
+
+
+def greedy_best_first(initial: RushHourPuzzle,
+                      heuristic: Callable[[RushHourPuzzle], int],
+                      max_stored: Optional[int] = MAX_STORED,
+                      node_budget: Optional[int] = None,
+                      time_budget: Optional[float] = None,
+                      on_progress: Optional[ProgressCallback] = None,
+                      progress_every: int = 256,
+                      stats: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Node], int, float]:
+    """
+    Meilleur d'abord glouton : développe toujours le nœud de plus petit h (premier
+    généré en cas d'égalité), sans tenir compte de g. Rapide, sans garantie sur la
+    longueur de la solution. S'arrête sans solution si max_stored états ont été vus
+    ou si le budget (nœuds développés, secondes) est épuisé.
+    Retourne : (nœud solution, nombre de nœuds explorés, temps d'exécution en secondes)
+    """
+    start_time = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+    if initial.isGoal():
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=0.0)
+        return Node(initial), 1, time.time() - start_time
+    if is_unsolvable(initial):
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=time.time() - start_time)
+        return None, 0, time.time() - start_time
+    prune_time = time.time() - start_time
+    delta_heuristic = getattr(heuristic, "delta", None)
+    batch_heuristic = getattr(heuristic, "batch", None)
+    counter = itertools.count()
+    root = Node(initial)
+    root.f = heuristic(initial)
+    frontier = [(root.f, next(counter), root)]
+    seen = {initial.state_key()}
+    expansions = 0
+    generated = 1
+    while frontier:
+        if _out_of_budget(expansions, node_budget, deadline):
+            _record(stats, budget_exhausted=True)
+            break
+        _, _, current = heapq.heappop(frontier)
+        expansions += 1
+        if on_progress is not None and expansions % progress_every == 0:
+            on_progress(len(seen), len(frontier), current)
+        successors = current.state.successorFunction()
+        generated += len(successors)
+        children = []
+        for action, successor in successors:
+            key = successor.state_key()
+            if key in seen:
+                continue
+            seen.add(key)
+            child = Node(successor, current, action, current.g + 1)
+            if successor.isGoal():
+                _record(stats, expanded=expansions, generated=generated, stored=len(seen), prune_time=prune_time)
+                return child, len(seen), time.time() - start_time
+            children.append(child)
+        values = _child_values(heuristic, delta_heuristic, batch_heuristic, current, current.f, children)
+        for child, value in zip(children, values):
+            child.f = value
+            heapq.heappush(frontier, (value, next(counter), child))
+        if max_stored is not None and len(seen) >= max_stored:
+            break
+    _record(stats, expanded=expansions, generated=generated, stored=len(seen), prune_time=prune_time)
+    return None, len(seen), time.time() - start_time
+
+
+def beam_search(initial: RushHourPuzzle,
+                heuristic: Callable[[RushHourPuzzle], int],
+                beam_width: int = BEAM_WIDTH,
+                max_stored: Optional[int] = MAX_STORED,
+                node_budget: Optional[int] = None,
+                time_budget: Optional[float] = None,
+                on_progress: Optional[ProgressCallback] = None,
+                progress_every: int = 256,
+                stats: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Node], int, float]:
+    """
+    Recherche en faisceau : couche par couche, seuls les beam_width enfants de plus
+    petit h sont conservés. La solution a au plus autant de coups que de couches
+    parcourues ; beam_width règle le compromis longueur / temps (1 = descente gloutonne,
+    très grand = BFS). Lorsque les états vus dépassent max_stored, seuls ceux de la
+    dernière couche sont gardés : la mémoire reste bornée, mais la recherche peut
+    alors repasser par un état oublié (le budget borne alors sa durée).
+    Retourne : (nœud solution, nombre de nœuds explorés, temps d'exécution en secondes)
+    """
+    if beam_width < 1:
+        raise ValueError("beam_width doit être au moins 1.")
+    start_time = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+    if initial.isGoal():
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=0.0)
+        return Node(initial), 1, time.time() - start_time
+    if is_unsolvable(initial):
+        _record(stats, expanded=0, generated=1, stored=1, prune_time=time.time() - start_time)
+        return None, 0, time.time() - start_time
+    prune_time = time.time() - start_time
+    delta_heuristic = getattr(heuristic, "delta", None)
+    batch_heuristic = getattr(heuristic, "batch", None)
+    counter = itertools.count()
+    root = Node(initial)
+    root.f = heuristic(initial)
+    beam = [root]
+    seen = {initial.state_key()}
+    explored_count = 1
+    expansions = 0
+    generated = 1
+    stored = 1
+    while beam:
+        candidates = []
+        for current in beam:
+            if _out_of_budget(expansions, node_budget, deadline):
+                _record(stats, budget_exhausted=True)
+                beam = []
+                break
+            expansions += 1
+            if on_progress is not None and expansions % progress_every == 0:
+                on_progress(explored_count, len(candidates), current)
+            successors = current.state.successorFunction()
+            generated += len(successors)
+            children = []
+            for action, successor in successors:
+                key = successor.state_key()
+                if key in seen:
+                    continue
+                seen.add(key)
+                child = Node(successor, current, action, current.g + 1)
+                explored_count += 1
+                if successor.isGoal():
+                    _record(stats, expanded=expansions, generated=generated, stored=max(stored, len(seen)),
+                            prune_time=prune_time)
+                    return child, explored_count, time.time() - start_time
+                children.append(child)
+            values = _child_values(heuristic, delta_heuristic, batch_heuristic, current, current.f, children)
+            for child, value in zip(children, values):
+                child.f = value
+                candidates.append((value, next(counter), child))
+        if not beam:
+            break
+        beam = [child for _, _, child in heapq.nsmallest(beam_width, candidates)]
+        stored = max(stored, len(seen))
+        if max_stored is not None and len(seen) > max_stored:
+            seen = {child.state.state_key() for child in beam}
+    _record(stats, expanded=expansions, generated=generated, stored=max(stored, len(seen)), prune_time=prune_time)
     return None, explored_count, time.time() - start_time
+
+
+# ============================================================================
+# REGISTRE DES SOLVEURS
+# ============================================================================
+# Un solveur du registre est une fonction (puzzle, SolveOptions) -> SolveResult.
+# Les moteurs définis hors de ce fichier s'enregistrent avec @register_solver
+# dans leur propre module, listé dans PLUGIN_MODULES (ou dans la variable
+# d'environnement RUSH_HOUR_SOLVERS, modules séparés par des virgules) :
+# main.py, le service de résolution et les bancs d'essai les découvrent via
+# algorithm_catalog() sans modification.
+
+PLUGIN_MODULES = ["external_bfs", "learned_heuristic", "state_ranking", "resumable_search", "portfolio"]
+PLUGIN_ENV = "RUSH_HOUR_SOLVERS"
+
+
+class SolveOptions:
+    """Options communes à tous les solveurs ; les options propres à un moteur vont dans extra."""
+    def __init__(self,
+                 heuristic: Optional[str] = None,
+                 time_budget: Optional[float] = None,
+                 node_budget: Optional[int] = None,
+                 tie_breaking: str = "low-g",
+                 on_progress: Optional[ProgressCallback] = None,
+                 progress_every: int = 256,
+                 measure_memory: bool = False,
+                 **extra):
+        self.heuristic = heuristic
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.tie_breaking = tie_breaking
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.measure_memory = measure_memory
+        self.extra = extra
+
+
+class SolveResult:
+    """
+    Résultat uniforme d'un solveur du registre.
+    Reste compatible avec l'ancien tuple (nœud solution, nœuds explorés, temps) :
+    `node, explored, elapsed = result` et result[2] fonctionnent toujours.
+    """
+    def __init__(self,
+                 solver: str,
+                 node: Optional[Node],
+                 explored: int,
+                 expanded: int,
+                 generated: int,
+                 stored: Optional[int] = None,
+                 timings: Optional[Dict[str, float]] = None,
+                 bound: Optional[float] = None):
+        self.solver = solver
+        self._node = node
+        self._path: Optional[List[Action]] = None
+        self.explored = explored      # valeur historique affichée par chaque algorithme
+        self.expanded = expanded      # nœuds développés
+        self.generated = generated    # successeurs générés (doublons compris)
+        self.stored = stored          # nœuds conservés en mémoire au maximum
+        self.peak_memory: Optional[int] = None  # octets, si SolveOptions.measure_memory
+        self.timings: Dict[str, float] = dict(timings or {})
+        self.bound = bound            # borne d'optimalité (anytime, heuristique admissible ; sinon None)
+        self.budget_exhausted = False # arrêt sur budget : un échec ne prouve pas l'insolubilité
+
+    @property
+    def node(self) -> Optional[Node]:
+        return self._node
+
+    @node.setter
+    def node(self, node: Optional[Node]):
+        self._node = node
+        self._path = None
+
+    @property
+    def path(self) -> Optional[List[Action]]:
+        if self._path is None and self._node is not None:
+            self._path = self._node.getSolution()
+        return self._path
+
+    @property
+    def solved(self) -> bool:
+        return self._node is not None
+
+    @property
+    def moves(self) -> Optional[int]:
+        return len(self.path) if self.solved else None
+
+    @property
+    def time(self) -> float:
+        return self.timings.get("total", 0.0)
+
+    def as_tuple(self) -> Tuple[Optional[Node], int, float]:
+        return self._node, self.explored, self.time
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __getitem__(self, index):
+        return self.as_tuple()[index]
+
+    def __len__(self) -> int:
+        return 3
+
+    def as_dict(self) -> Dict[str, Any]:
+        path = self.path
+        return {
+            "solver": self.solver,
+            "solved": self.solved,
+            "moves": self.moves,
+            "solution": [list(a) for a in path] if path is not None else None,
+            "explored": self.explored,
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "stored": self.stored,
+            "peak_memory": self.peak_memory,
+            "timings": {k: round(v, 6) for k, v in self.timings.items()},
+            "bound": self.bound,
+            "budget_exhausted": self.budget_exhausted,
+        }
+
+    def __repr__(self) -> str:
+        return (f"SolveResult({self.solver}, moves={self.moves}, expanded={self.expanded}, "
+                f"generated={self.generated}, time={self.time:.4f}s)")
+
+    @classmethod
+    def from_stats(cls, solver: str, node: Optional[Node], explored: int, elapsed: float,
+                   stats: Dict[str, Any], bound: Optional[float] = None) -> 'SolveResult':
+        """Construit le résultat à partir du dictionnaire stats rempli par bfs, astar ou anytime_astar."""
+        prune_time = stats.get("prune_time", 0.0)
+        result = cls(solver, node, explored,
+                     expanded=stats.get("expanded", explored),
+                     generated=stats.get("generated", explored),
+                     stored=stats.get("stored"),
+                     timings={"prune": prune_time, "search": max(0.0, elapsed - prune_time)},
+                     bound=bound)
+        result.budget_exhausted = stats.get("budget_exhausted", False)
+        return result
+
+
+SolverFunction = Callable[[RushHourPuzzle, SolveOptions], SolveResult]
+HeuristicFactory = Callable[[RushHourPuzzle], Callable[[RushHourPuzzle], int]]
+
+
+class SolverEntry:
+    def __init__(self, name: str, function: SolverFunction, description: str,
+                 uses_heuristic: bool = False, optimal: bool = False, optimal_if_admissible: bool = False):
+        self.name = name
+        self.function = function
+        self.description = description
+        self.uses_heuristic = uses_heuristic
+        self.optimal = optimal
+        # optimal seulement avec une heuristique de ADMISSIBLE_HEURISTICS (ex. A*)
+        self.optimal_if_admissible = optimal_if_admissible
+
+    def is_optimal(self, heuristic: Optional[str] = None) -> bool:
+        """Vrai si le solveur, avec cette heuristique, garantit une solution de longueur minimale."""
+        return self.optimal or (self.optimal_if_admissible and heuristic in ADMISSIBLE_HEURISTICS)
+
+
+SOLVERS: Dict[str, SolverEntry] = {}
+# HEURISTICS[nom] = (description, fabrique puzzle initial -> heuristique)
+HEURISTICS: Dict[str, Tuple[str, HeuristicFactory]] = {}
+ADMISSIBLE_HEURISTICS = set()
+_plugins_loaded = False
+
+
+def register_solver(name: str, description: str, uses_heuristic: bool = False, optimal: bool = False,
+                    optimal_if_admissible: bool = False):
+    """Décorateur : enregistre un solveur (puzzle, SolveOptions) -> SolveResult sous name."""
+    def decorator(function: SolverFunction) -> SolverFunction:
+        SOLVERS[name] = SolverEntry(name, function, description, uses_heuristic, optimal, optimal_if_admissible)
+        return function
+    return decorator
+
+
+def register_heuristic(name: str, description: str, factory: HeuristicFactory, admissible: bool = False):
+    """
+    La fabrique reçoit le puzzle initial (ex. h3 a besoin de la position initiale de la cible).
+    admissible : l'heuristique ne surestime jamais le nombre de mouvements restants et
+    varie d'au plus 1 par mouvement (cohérente) ; anytime ne donne une borne que dans ce cas.
+    """
+    HEURISTICS[name] = (description, factory)
+    if admissible:
+        ADMISSIBLE_HEURISTICS.add(name)
+
+
+def make_heuristic(name: str, puzzle: RushHourPuzzle) -> Callable[[RushHourPuzzle], int]:
+    if name not in HEURISTICS:
+        raise ValueError(f"Heuristique inconnue : {name} (choix : {', '.join(HEURISTICS)})")
+    return HEURISTICS[name][1](puzzle)
+
+
+def _target_start(puzzle: RushHourPuzzle) -> int:
+    target = puzzle.target_vehicle()
+    return target.x if target else 0
+
+
+register_heuristic("h1", "h1", lambda puzzle: IncrementalHeuristic(1))
+register_heuristic("h2", "h2", lambda puzzle: IncrementalHeuristic(2))
+register_heuristic("h3", "h3", lambda puzzle: IncrementalHeuristic(3, _target_start(puzzle)))
+register_heuristic("moves", "mouvements, admissible", lambda puzzle: MovesHeuristic(), admissible=True)
+
+
+def load_plugins():
+    """Importe une fois les modules de PLUGIN_MODULES et de RUSH_HOUR_SOLVERS, qui s'enregistrent eux-mêmes."""
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    extra = [m.strip() for m in os.environ.get(PLUGIN_ENV, "").split(",") if m.strip()]
+    for module in PLUGIN_MODULES + extra:
+        importlib.import_module(module)
+
+
+def algorithm_name(solver: str, heuristic: Optional[str] = None) -> str:
+    """Nom d'algorithme de la ligne de commande : astar + h2 -> astar2, astar + learned -> astar-learned."""
+    if heuristic is None:
+        return solver
+    if heuristic[:1] == "h" and heuristic[1:].isdigit():
+        return solver + heuristic[1:]
+    return f"{solver}-{heuristic}"
+
+
+def algorithm_catalog() -> Dict[str, Tuple[str, Optional[str], str]]:
+    """{nom d'algorithme: (solveur, heuristique, libellé)} pour tous les solveurs et heuristiques enregistrés."""
+    load_plugins()
+    catalog = {}
+    for entry in SOLVERS.values():
+        if entry.uses_heuristic:
+            for h, (h_description, _) in HEURISTICS.items():
+                catalog[algorithm_name(entry.name, h)] = (entry.name, h, f"{entry.description} ({h_description})")
+        else:
+            catalog[entry.name] = (entry.name, None, entry.description)
+    return catalog
+
+
+def solve(puzzle: RushHourPuzzle, algorithm: str, options: Optional[SolveOptions] = None) -> SolveResult:
+    """
+    Résout puzzle avec un algorithme du catalogue ("bfs", "astar2"...) ou un solveur
+    du registre ("astar", heuristique prise dans options). Mesure les phases et,
+    si options.measure_memory, le pic mémoire (tracemalloc, qui ralentit la recherche).
+    """
+    options = copy.copy(options) if options is not None else SolveOptions()
+    catalog = algorithm_catalog()
+    if algorithm in catalog:
+        name, heuristic, _ = catalog[algorithm]
+        if heuristic is not None and options.heuristic is None:
+            options.heuristic = heuristic
+    elif algorithm in SOLVERS:
+        name = algorithm
+    else:
+        raise ValueError(f"Algorithme inconnu : {algorithm}")
+    entry = SOLVERS[name]
+    if entry.uses_heuristic and options.heuristic is None:
+        options.heuristic = "h2"
+
+    measure = options.measure_memory and not tracemalloc.is_tracing()
+    peak_memory = None
+    if measure:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = entry.function(puzzle, options)
+        reconstruct_start = time.perf_counter()
+        result.path
+        result.timings["reconstruct"] = time.perf_counter() - reconstruct_start
+    finally:
+        if measure:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    result.peak_memory = peak_memory
+    result.timings["total"] = time.perf_counter() - start
+    return result
+
+
+@register_solver("bfs", "BFS", optimal=True)
+def _solve_bfs(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    stats: Dict[str, Any] = {}
+    node, explored, elapsed = bfs(puzzle, options.on_progress, options.progress_every, stats=stats,
+                                  node_budget=options.node_budget, time_budget=options.time_budget)
+    return SolveResult.from_stats("bfs", node, explored, elapsed, stats)
+
+
+@register_solver("astar", "A*", uses_heuristic=True, optimal_if_admissible=True)
+def _solve_astar(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    stats: Dict[str, Any] = {}
+    heuristic = make_heuristic(options.heuristic, puzzle)
+    node, explored, elapsed = astar(puzzle, heuristic, options.on_progress, options.progress_every,
+                                    tie_breaking=options.tie_breaking, stats=stats,
+                                    node_budget=options.node_budget, time_budget=options.time_budget)
+    return SolveResult.from_stats("astar", node, explored, elapsed, stats)
+
+
+@register_solver("anytime", "A* anytime", uses_heuristic=True)
+def _solve_anytime(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    stats: Dict[str, Any] = {}
+    heuristic = make_heuristic(options.heuristic, puzzle)
+    weights = options.extra.get("weights", (5.0, 3.0, 2.0, 1.5, 1.0))
+    node, explored, elapsed, bound = anytime_astar(puzzle, heuristic, weights,
+                                                   time_budget=options.time_budget,
+                                                   node_budget=options.node_budget,
+                                                   on_progress=options.on_progress,
+                                                   progress_every=options.progress_every,
+                                                   stats=stats,
+                                                   admissible=options.heuristic in ADMISSIBLE_HEURISTICS)
+    return SolveResult.from_stats("anytime", node, explored, elapsed, stats, bound)
+
+
+@register_solver("greedy", "Meilleur d'abord glouton", uses_heuristic=True)
+def _solve_greedy(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    stats: Dict[str, Any] = {}
+    heuristic = make_heuristic(options.heuristic, puzzle)
+    node, explored, elapsed = greedy_best_first(puzzle, heuristic, options.extra.get("max_stored", MAX_STORED),
+                                                options.node_budget, options.time_budget,
+                                                options.on_progress, options.progress_every, stats)
+    return SolveResult.from_stats("greedy", node, explored, elapsed, stats)
+
+
+@register_solver("beam", "Recherche en faisceau", uses_heuristic=True)
+def _solve_beam(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    stats: Dict[str, Any] = {}
+    heuristic = make_heuristic(options.heuristic, puzzle)
+    node, explored, elapsed = beam_search(puzzle, heuristic, options.extra.get("beam_width", BEAM_WIDTH),
+                                          options.extra.get("max_stored", MAX_STORED),
+                                          options.node_budget, options.time_budget,
+                                          options.on_progress, options.progress_every, stats)
+    return SolveResult.from_stats("beam", node, explored, elapsed, stats)
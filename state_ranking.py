@@ -0,0 +1,402 @@
+#state_ranking.py
+"""
+Rang des configurations d'une disposition et ensembles visités compacts.
+
+Les véhicules d'une même voie (même rangée pour les horizontaux, même colonne
+pour les verticaux) ne peuvent pas se croiser : leurs placements légaux sur la
+voie (ordre conservé, sans chevauchement ni mur) sont énumérés une fois et
+numérotés. Le rang d'un état est l'écriture en base mixte des numéros de
+placement de chaque voie ; unrank fait l'inverse. Les collisions entre un
+véhicule horizontal et un vertical ont aussi un rang : l'espace de rangs
+(ranker.size) peut donc dépasser de plusieurs ordres de grandeur la
+composante atteignable (2-a : 244 millions de rangs pour 541 934 états).
+
+Un tableau indexé par rang n'est donc alloué que s'il tient dans DENSE_BYTES ;
+sinon les rangs visités sont stockés tels quels :
+    CompactVisited  ensemble visité (et g) de bfs et astar : un bit par rang
+                    (et deux octets de g) si dense, sinon set / dict d'entiers,
+                    sans garder les Node ni les puzzles des états fermés ;
+    ranked_bfs      profondeur mod 3 sur un octet par rang si dense, sinon
+                    couches de rangs triées (8 octets par état) : un voisin
+                    d'un état de profondeur d est à la profondeur d - 1, d ou
+                    d + 1, ce qui suffit au test de visite et à la remontée.
+"""
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from board_layout import Layout, State
+from node import Node
+from pruning import is_unsolvable
+from rush_hour_puzzle import Action, RushHourPuzzle
+from solver import SolveOptions, SolveResult, register_solver
+
+# Taille maximale d'un tableau indexé par rang (BitSet : 8 rangs par octet, LayerDepths : 1)
+DENSE_BYTES = 1 << 20
+# Nombre maximal d'états visités par ranked_bfs et enumerate_component
+MAX_STATES = 1 << 26
+UNSEEN = 3
+
+
+class StateRanker:
+    """
+    Bijection entre configurations légales voie par voie et entiers [0, size).
+    start fixe l'ordre des véhicules sur chaque voie (il ne change jamais).
+    """
+    def __init__(self, layout: Layout, start: State):
+        self.layout = layout
+        walls = set(layout.walls)
+        lanes: Dict[Tuple[str, int], List[int]] = {}
+        for i, (_, orientation, _, fixed) in enumerate(layout.specs):
+            lanes.setdefault((orientation, fixed), []).append(i)
+        for members in lanes.values():
+            members.sort(key=lambda i: start[i])
+
+        # groups[g] = indices des véhicules de la voie g ; placements[g] = positions possibles
+        self.groups: List[List[int]] = []
+        self.placements: List[List[Tuple[int, ...]]] = []
+        self.index: List[Dict[Tuple[int, ...], int]] = []
+        self.multipliers: List[int] = []
+        self.group_of: List[int] = [0] * len(layout.specs)
+        self.slot_of: List[int] = [0] * len(layout.specs)
+        size = 1
+        for (orientation, fixed), members in lanes.items():
+            lane = layout.width if orientation == 'H' else layout.height
+            blocked = {p for p in range(lane)
+                       if ((p, fixed) if orientation == 'H' else (fixed, p)) in walls}
+            lengths = [layout.specs[i][2] for i in members]
+            placements = self._lane_placements(lane, lengths, blocked)
+            if layout.goal_position is not None and layout.target_index in members:
+                # La cible peut glisser d'une case au-delà de la sortie (voir RushHourPuzzle.lane_moves)
+                slot = members.index(layout.target_index)
+                step = 1 if layout.exit_side in ('E', 'S') else -1
+                placements += [p[:slot] + (p[slot] + step,) + p[slot + 1:]
+                               for p in placements if p[slot] == layout.goal_position]
+            g = len(self.groups)
+            for slot, i in enumerate(members):
+                self.group_of[i] = g
+                self.slot_of[i] = slot
+            self.groups.append(members)
+            self.placements.append(placements)
+            self.index.append({p: k for k, p in enumerate(placements)})
+            self.multipliers.append(size)
+            size *= max(len(placements), 1)
+        self.size = size
+
+    @staticmethod
+    def _lane_placements(lane: int, lengths: List[int], blocked) -> List[Tuple[int, ...]]:
+        """Positions croissantes sans chevauchement ni mur de véhicules de longueurs lengths, dans l'ordre."""
+        result: List[Tuple[int, ...]] = []
+
+        def place(k: int, start: int, prefix: Tuple[int, ...]):
+            if k == len(lengths):
+                result.append(prefix)
+                return
+            room = sum(lengths[k + 1:])
+            for p in range(start, lane - lengths[k] - room + 1):
+                if any(c in blocked for c in range(p, p + lengths[k])):
+                    continue
+                place(k + 1, p + lengths[k], prefix + (p,))
+
+        place(0, 0, ())
+        return result
+
+    def rank(self, state: State) -> int:
+        r = 0
+        for g, members in enumerate(self.groups):
+            r += self.index[g][tuple(state[i] for i in members)] * self.multipliers[g]
+        return r
+
+    def unrank(self, r: int) -> State:
+        state = [0] * len(self.group_of)
+        for g in range(len(self.groups) - 1, -1, -1):
+            k, r = divmod(r, self.multipliers[g])
+            for i, p in zip(self.groups[g], self.placements[g][k]):
+                state[i] = p
+        return tuple(state)
+
+    def neighbors(self, state: State, r: int) -> Iterator[Tuple[State, int]]:
+        """Voisins de state avec leur rang, calculé par différence sur la seule voie modifiée."""
+        layout = self.layout
+        occupied = layout.occupancy(state)
+        for i, p in enumerate(state):
+            row = layout.masks[i]
+            free = occupied & ~row[p]
+            g = self.group_of[i]
+            members = self.groups[g]
+            index = self.index[g]
+            slot = self.slot_of[i]
+            current = tuple(state[j] for j in members)
+            base = r - index[current] * self.multipliers[g]
+            for step in (-1, 1):
+                q = p + step
+                while 0 <= q < len(row) and not (row[q] & free):
+                    placement = current[:slot] + (q,) + current[slot + 1:]
+                    yield state[:i] + (q,) + state[i + 1:], base + index[placement] * self.multipliers[g]
+                    q += step
+
+
+class BitSet:
+    """Ensemble d'entiers [0, size) sur size / 8 octets."""
+    def __init__(self, size: int):
+        self.size = size
+        self.bits = bytearray((size + 7) >> 3)
+
+    def __contains__(self, r: int) -> bool:
+        return bool(self.bits[r >> 3] & (1 << (r & 7)))
+
+    def add(self, r: int):
+        self.bits[r >> 3] |= 1 << (r & 7)
+
+    def test_and_add(self, r: int) -> bool:
+        """Ajoute r ; retourne True s'il était déjà présent."""
+        byte, bit = r >> 3, 1 << (r & 7)
+        if self.bits[byte] & bit:
+            return True
+        self.bits[byte] |= bit
+        return False
+
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+class LayerDepths:
+    """Profondeur BFS modulo 3 de chaque état, sur un octet (UNSEEN = non visité)."""
+    def __init__(self, size: int):
+        self.size = size
+        self.values = bytearray([UNSEEN]) * size
+
+    def __getitem__(self, r: int) -> int:
+        return self.values[r]
+
+    def __setitem__(self, r: int, depth: int):
+        self.values[r] = depth % 3
+
+    def nbytes(self) -> int:
+        return len(self.values)
+
+
+class CompactVisited:
+    """
+    États visités d'une recherche sur RushHourPuzzle (bfs, astar), mémorisés par rang :
+    un bit par rang si l'espace de rangs tient dans dense_bytes, sinon un set d'entiers.
+    Le rang d'un enfant se déduit de celui de son parent et de l'action (child_rank).
+    Les véhicules doivent rester dans l'ordre du puzzle de départ (copie sur écriture).
+    """
+    def __init__(self, puzzle: RushHourPuzzle, dense_bytes: int = DENSE_BYTES):
+        layout, start = Layout.from_puzzle(puzzle)
+        self.ranker = StateRanker(layout, start)
+        self.slots = {spec[0]: i for i, spec in enumerate(layout.specs)}
+        self.horizontal = [spec[1] == 'H' for spec in layout.specs]
+        self.dense = self.ranker.size <= dense_bytes * 8
+        self.seen = BitSet(self.ranker.size) if self.dense else set()
+        self.count = 0
+
+    def rank(self, puzzle: RushHourPuzzle) -> int:
+        return self.ranker.rank(tuple(v.x if h else v.y for v, h in zip(puzzle.vehicles, self.horizontal)))
+
+    def child_rank(self, parent: RushHourPuzzle, parent_rank: int, action: Action) -> int:
+        """Rang de l'état obtenu en appliquant action à parent (rang parent_rank) : seule sa voie change."""
+        ranker = self.ranker
+        i = self.slots[action[0]]
+        g = ranker.group_of[i]
+        vehicles, horizontal = parent.vehicles, self.horizontal
+        current = tuple(vehicles[j].x if horizontal[j] else vehicles[j].y for j in ranker.groups[g])
+        slot = ranker.slot_of[i]
+        moved = current[:slot] + (current[slot] + action[1],) + current[slot + 1:]
+        index = ranker.index[g]
+        return parent_rank + (index[moved] - index[current]) * ranker.multipliers[g]
+
+    def __contains__(self, r: int) -> bool:
+        return r in self.seen
+
+    def add(self, r: int):
+        self.seen.add(r)
+        self.count += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        """Oublie les états visités ; les tables de rang sont gardées (passes successives d'anytime_astar)."""
+        self.seen = BitSet(self.ranker.size) if self.dense else set()
+        self.count = 0
+
+
+def _rank_array(size: int, values: Sequence[int] = ()):
+    """Tableau de rangs : array('Q'), 8 octets par rang, tant que les rangs tiennent sur 64 bits."""
+    return array('Q', values) if size <= 1 << 64 else list(values)
+
+
+def _sorted_contains(ranks: Sequence[int], r: int) -> bool:
+    i = bisect_left(ranks, r)
+    return i < len(ranks) and ranks[i] == r
+
+
+def _set_bytes(values: set) -> int:
+    """Estimation de la mémoire d'un set d'entiers (table et objets int)."""
+    return sys.getsizeof(values) + len(values) * 32
+
+
+def ranked_bfs(initial: RushHourPuzzle,
+               max_states: int = MAX_STATES,
+               stats: Optional[dict] = None,
+               dense_bytes: int = DENSE_BYTES) -> Tuple[Optional[Node], int, float]:
+    """
+    BFS sur les rangs d'états. Si l'espace de rangs tient dans dense_bytes, la profondeur
+    mod 3 de chaque rang tient sur un octet (LayerDepths) ; sinon chaque couche est gardée
+    comme tableau trié de rangs (8 octets par état visité) et un voisin n'est cherché que
+    dans la couche courante et la précédente. Même nombre de mouvements que bfs.
+    La recherche s'arrête sans solution après max_states états visités (budget_exhausted).
+    Si stats est fourni, il reçoit expanded, generated, stored, memory_bytes et budget_exhausted.
+    Retourne : (nœud solution, nombre d'états visités, temps d'exécution en secondes)
+    """
+    from external_bfs import path_to_node
+    start_time = time.time()
+    if initial.isGoal():
+        return Node(initial), 1, time.time() - start_time
+    if is_unsolvable(initial):
+        return None, 0, time.time() - start_time
+    layout, start = Layout.from_puzzle(initial)
+    ranker = StateRanker(layout, start)
+    size = ranker.size
+    dense = size <= dense_bytes
+    depths = LayerDepths(size) if dense else None
+    r0 = ranker.rank(start)
+    if dense:
+        depths[r0] = 0
+    # Mode creux : sorted_layers[d] = rangs triés de la couche d, gardés pour la remontée
+    sorted_layers = [_rank_array(size, [r0])]
+    layer = _rank_array(size, [r0])
+    visited = 1
+    depth = 0
+    peak_layer = 1
+    peak_pending = 0
+    goal = None
+    exhausted = False
+    while layer and goal is None and not exhausted:
+        next_layer = _rank_array(size)
+        pending = set()
+        current = sorted_layers[-1]
+        previous = sorted_layers[-2] if len(sorted_layers) > 1 else ()
+        for r in layer:
+            state = ranker.unrank(r)
+            for neighbor, rn in ranker.neighbors(state, r):
+                if dense:
+                    if depths[rn] != UNSEEN:
+                        continue
+                    depths[rn] = depth + 1
+                else:
+                    if rn in pending or _sorted_contains(current, rn) or _sorted_contains(previous, rn):
+                        continue
+                    pending.add(rn)
+                visited += 1
+                if layout.is_goal(neighbor):
+                    goal = (neighbor, rn)
+                    break
+                next_layer.append(rn)
+                if visited >= max_states:
+                    exhausted = True
+                    break
+            if goal is not None or exhausted:
+                break
+        if not dense:
+            peak_pending = max(peak_pending, _set_bytes(pending))
+            sorted_layers.append(_rank_array(size, sorted(pending)))
+        layer = next_layer
+        depth += 1
+        peak_layer = max(peak_layer, len(layer))
+    if dense:
+        memory = depths.nbytes() + peak_layer * 8
+    else:
+        memory = sum(len(ranks) for ranks in sorted_layers) * 8 + peak_layer * 8 + peak_pending
+    if stats is not None:
+        stats.update(expanded=visited - len(layer), generated=visited, stored=visited,
+                     memory_bytes=memory, budget_exhausted=exhausted)
+    if goal is None:
+        return None, visited, time.time() - start_time
+
+    # Remontée : le prédécesseur d'un état de profondeur d est un voisin de profondeur d - 1
+    path = [goal[0]]
+    r = goal[1]
+    for d in range(depth, 0, -1):
+        for neighbor, rn in ranker.neighbors(path[-1], r):
+            if (depths[rn] == (d - 1) % 3) if dense else _sorted_contains(sorted_layers[d - 1], rn):
+                path.append(neighbor)
+                r = rn
+                break
+    return path_to_node(initial, layout, path[::-1]), visited, time.time() - start_time
+
+
+def enumerate_component(puzzle: RushHourPuzzle, max_states: int = MAX_STATES,
+                        dense_bytes: int = DENSE_BYTES) -> Tuple[int, int]:
+    """
+    Taille de la composante de puzzle et mémoire (octets) de l'ensemble visité :
+    un bit par rang si l'espace de rangs tient dans dense_bytes, sinon parcours en
+    largeur ne gardant que trois couches triées (8 octets par état).
+    MemoryError si la composante dépasse max_states états.
+    """
+    layout, start = Layout.from_puzzle(puzzle)
+    ranker = StateRanker(layout, start)
+    size = ranker.size
+    r0 = ranker.rank(start)
+    if size <= dense_bytes * 8:
+        seen = BitSet(size)
+        seen.add(r0)
+        stack = _rank_array(size, [r0])
+        count = 1
+        while stack:
+            r = stack.pop()
+            for _, rn in ranker.neighbors(ranker.unrank(r), r):
+                if not seen.test_and_add(rn):
+                    count += 1
+                    stack.append(rn)
+            if count > max_states:
+                raise MemoryError(f"Composante de plus de {max_states} états.")
+        return count, seen.nbytes()
+
+    previous: Sequence[int] = ()
+    layer = _rank_array(size, [r0])
+    count = 1
+    peak = 0
+    while layer:
+        pending = set()
+        for r in layer:
+            for _, rn in ranker.neighbors(ranker.unrank(r), r):
+                if rn not in pending and not _sorted_contains(layer, rn) and not _sorted_contains(previous, rn):
+                    pending.add(rn)
+        count += len(pending)
+        if count > max_states:
+            raise MemoryError(f"Composante de plus de {max_states} états.")
+        peak = max(peak, (len(previous) + len(layer)) * 8 + _set_bytes(pending))
+        previous, layer = layer, _rank_array(size, sorted(pending))
+    return count, peak
+
+
+@register_solver("bfs-ranked", "BFS (rangs d'états, tableaux compacts)", optimal=True)
+def _solve_ranked_bfs(puzzle: RushHourPuzzle, options: SolveOptions) -> SolveResult:
+    stats: dict = {}
+    node, visited, elapsed = ranked_bfs(puzzle, options.extra.get("max_states", MAX_STATES), stats)
+    result = SolveResult("bfs-ranked", node, visited, expanded=stats.get("expanded", visited),
+                         generated=stats.get("generated", visited), stored=stats.get("stored"),
+                         timings={"search": elapsed})
+    result.budget_exhausted = stats.get("budget_exhausted", False)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from puzzle_corpus import iter_named_puzzles
+
+    parser = argparse.ArgumentParser(description="Énumère les composantes avec des rangs d'états.")
+    parser.add_argument("puzzle", help="Fichier CSV, dossier, archive .zip/.rhpz ou fichier texte de plateaux")
+    args = parser.parse_args()
+    for name, game in iter_named_puzzles(args.puzzle):
+        layout, start_state = Layout.from_puzzle(game)
+        ranker = StateRanker(layout, start_state)
+        start = time.perf_counter()
+        count, nbytes = enumerate_component(game)
+        print(f"{name} : {count} états atteignables, espace de rangs {ranker.size}, "
+              f"{nbytes} octets ({nbytes / count:.2f} octets/état), {time.perf_counter() - start:.2f}s")
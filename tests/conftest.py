@@ -0,0 +1,49 @@
+#conftest.py
+"""
+Fixtures communes : les modules sont à la racine du dépôt, les puzzles de
+référence dans data.zip (longueurs optimales dans OPTIMAL).
+"""
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rush_hour_puzzle import RushHourPuzzle  # noqa: E402
+
+DATA_ZIP = os.path.join(ROOT, "data.zip")
+OPTIMAL = {"1": 21, "2-a": 15, "2-b": 60, "2-c": 58, "2-d": 48, "2-e": 38, "e-f": 33}
+# Puzzles assez petits pour être résolus par tous les solveurs en quelques secondes
+SMALL = ("1", "2-b", "e-f")
+
+
+def load_data_puzzle(name: str) -> RushHourPuzzle:
+    with zipfile.ZipFile(DATA_ZIP) as archive:
+        text = archive.read(f"data/{name}.csv").decode("utf-8")
+    puzzle = RushHourPuzzle()
+    puzzle.setVehiclesFromLines(io.StringIO(text))
+    puzzle.setBoard()
+    return puzzle
+
+
+def mirrored(puzzle: RushHourPuzzle, walls=()) -> RushHourPuzzle:
+    """Puzzle symétrique gauche-droite (sortie à l'ouest), avec des murs en plus."""
+    width = puzzle.board_width
+    lines = [f"{width},{puzzle.board_height}", "EXIT,W"]
+    lines += [f"#,{x},{y}" for x, y in walls]
+    for v in puzzle.vehicles:
+        x = width - v.x - v.length if v.orientation == 'H' else width - 1 - v.x
+        lines.append(f"{v.id},{x},{v.y},{v.orientation},{v.length}")
+    result = RushHourPuzzle()
+    result.setVehiclesFromLines(io.StringIO("\n".join(lines)))
+    result.setBoard()
+    return result
+
+
+@pytest.fixture
+def puzzle_1() -> RushHourPuzzle:
+    return load_data_puzzle("1")
@@ -0,0 +1,66 @@
+#test_catalog.py
+import pytest
+
+from conftest import OPTIMAL, load_data_puzzle, mirrored
+from puzzle_catalog import PuzzleCatalog, canonical_hash
+from solver import SolveOptions, solve
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with PuzzleCatalog(str(tmp_path / "catalog.db")) as catalog:
+        yield catalog
+
+
+def test_add_is_an_upsert(catalog, puzzle_1):
+    catalog.add("p", puzzle_1)
+    other = load_data_puzzle("e-f")
+    catalog.add("p", other)
+    assert len(catalog) == 1
+    assert catalog.get("p").csv_rows() == other.csv_rows()
+
+
+def test_duplicates_share_canonical_state(catalog, puzzle_1):
+    reordered = puzzle_1.copy()
+    reordered.vehicles = list(reversed(reordered.vehicles))
+    catalog.add_many([("a", puzzle_1), ("b", reordered), ("c", mirrored(puzzle_1))])
+    assert canonical_hash(reordered) == canonical_hash(puzzle_1)
+    assert catalog.duplicates(puzzle_1) == ["a", "b"]
+    assert catalog.query(walls=False, canonical=canonical_hash(puzzle_1))[0]["name"] == "a"
+
+
+def test_record_solution_keeps_the_best(catalog):
+    puzzle = load_data_puzzle("2-c")
+    catalog.add("p", puzzle)
+    greedy = solve(puzzle, "greedy2")
+    optimal = solve(puzzle, "bfs")
+    assert greedy.moves > optimal.moves
+
+    assert catalog.record_solution(puzzle, "greedy2", greedy, optimal=False)
+    assert catalog.query(min_moves=1) == []
+    assert catalog.record_solution(puzzle, "bfs", optimal, optimal=True)
+    # Une solution non optimale, ou optimale mais pas plus courte, ne remplace rien
+    assert not catalog.record_solution(puzzle, "greedy2", greedy, optimal=False)
+    assert not catalog.record_solution(puzzle, "astar-moves", solve(puzzle, "astar-moves"), optimal=True)
+
+    entry = catalog.solution("p")
+    assert (entry["moves"], entry["optimal"], entry["algorithm"]) == (OPTIMAL["2-c"], 1, "bfs")
+    assert entry["solution"] == optimal.path
+    assert [row["name"] for row in catalog.query(min_moves=OPTIMAL["2-c"])] == ["p"]
+
+
+def test_failures_need_an_exhaustive_optimal_search(catalog):
+    puzzle = load_data_puzzle("2-c")
+    catalog.add("p", puzzle)
+    stopped = solve(puzzle, "bfs", SolveOptions(node_budget=50))
+    assert not catalog.record_solution(puzzle, "bfs", stopped, optimal=True, exhaustive=False)
+    assert catalog.solution("p") is None
+
+
+def test_solve_missing_solves_each_canonical_state_once(catalog, puzzle_1):
+    reordered = puzzle_1.copy()
+    reordered.vehicles = list(reversed(reordered.vehicles))
+    catalog.add_many([("a", puzzle_1), ("b", reordered)])
+    assert catalog.solve_missing("astar-moves") == 1
+    assert catalog.solution("b")["optimal"] == 1
+    assert catalog.solve_missing("astar-moves") == 0
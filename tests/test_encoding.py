@@ -0,0 +1,84 @@
+#test_encoding.py
+"""Aller-retour des formats : RHPZ (puzzle_archive), RHCK (resumable_search), rangs d'états."""
+import pytest
+
+from board_layout import Layout
+from conftest import OPTIMAL, SMALL, load_data_puzzle, mirrored
+from puzzle_archive import decode_puzzle, encode_puzzle, load_archive, write_archive
+from resumable_search import ResumableSearch
+from rush_hour_puzzle import canonical_key
+from state_ranking import CompactVisited, StateRanker
+
+
+def _puzzles():
+    puzzles = [load_data_puzzle(name) for name in OPTIMAL]
+    puzzles.append(mirrored(puzzles[0], walls=[(5, 0), (4, 5)]))
+    return puzzles
+
+
+def test_rhpz_record_round_trip():
+    for puzzle in _puzzles():
+        decoded = decode_puzzle(encode_puzzle(puzzle))
+        assert decoded.csv_rows() == puzzle.csv_rows()
+        assert canonical_key(decoded) == canonical_key(puzzle)
+
+
+def test_rhpz_archive_round_trip(tmp_path):
+    puzzles = _puzzles()
+    path = str(tmp_path / "puzzles.rhpz")
+    assert write_archive(path, puzzles) == len(puzzles)
+    loaded = load_archive(path)
+    assert [p.csv_rows() for p in loaded] == [p.csv_rows() for p in puzzles]
+
+
+def test_canonical_key_ignores_source_order(puzzle_1):
+    shuffled = puzzle_1.copy()
+    shuffled.vehicles = list(reversed(shuffled.vehicles))
+    assert canonical_key(shuffled) == canonical_key(puzzle_1)
+    moved = puzzle_1.create_new_state(1, -1)
+    assert canonical_key(moved) != canonical_key(puzzle_1)
+
+
+@pytest.mark.parametrize("algorithm, heuristic", [("bfs", None), ("astar", "moves")])
+def test_rhck_checkpoint_round_trip(tmp_path, algorithm, heuristic):
+    puzzle = load_data_puzzle("2-b")
+    search = ResumableSearch(puzzle, algorithm, heuristic)
+    search.run(max_expansions=300)
+    assert not search.done
+    path = str(tmp_path / "search.rhck")
+    search.save(path)
+    resumed = ResumableSearch.load(path)
+    assert resumed.algorithm == search.algorithm
+    assert resumed.heuristic_name == search.heuristic_name
+    assert resumed.keys == search.keys
+    assert resumed.parents == search.parents
+    assert resumed.g == search.g
+    assert resumed.closed == search.closed
+    assert list(resumed.frontier) == list(search.frontier)
+    assert (resumed.expanded, resumed.generated) == (search.expanded, search.generated)
+
+    assert resumed.run() and search.run()
+    assert resumed.result().moves == search.result().moves == OPTIMAL["2-b"]
+    assert resumed.expanded == search.expanded
+
+
+@pytest.mark.parametrize("name", SMALL)
+def test_rank_unrank_is_a_bijection_on_the_component(name):
+    puzzle = load_data_puzzle(name)
+    layout, start = Layout.from_puzzle(puzzle)
+    ranker = StateRanker(layout, start)
+    ranks = set()
+    for state in layout.component(start):
+        r = ranker.rank(state)
+        assert 0 <= r < ranker.size
+        assert ranker.unrank(r) == state
+        ranks.add(r)
+    assert len(ranks) == len(layout.component(start))
+
+
+def test_child_rank_matches_rank(puzzle_1):
+    visited = CompactVisited(puzzle_1)
+    parent_rank = visited.rank(puzzle_1)
+    for i, action in puzzle_1.legal_moves():
+        child = puzzle_1.create_new_state(i, action[1])
+        assert visited.child_rank(puzzle_1, parent_rank, action) == visited.rank(child)
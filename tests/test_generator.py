@@ -0,0 +1,31 @@
+#test_generator.py
+from board_layout import Layout
+from conftest import load_data_puzzle
+from hint_service import HintService
+from puzzle_generator import canonical_state, generate_batch, shape_key
+from solver import solve
+
+
+def test_canonical_state_orders_interchangeable_vehicles():
+    layout = Layout(6, 6, [], [('X', 'H', 2, 2), ('A', 'V', 2, 0), ('B', 'V', 2, 0), ('C', 'V', 3, 0)])
+    assert canonical_state(layout, (0, 4, 0, 2)) == (0, 0, 4, 2)
+    assert canonical_state(layout, (0, 0, 4, 2)) == (0, 0, 4, 2)
+
+
+def test_generated_puzzles_are_distinct_and_optimal():
+    results = generate_batch(2, 8, width=7, height=7, n_vehicles=6, max_samples=200)
+    assert len({shape_key(puzzle) for puzzle, _, _ in results}) == len(results)
+    for puzzle, moves, _ in results:
+        assert solve(puzzle, "bfs").moves == moves
+
+
+def test_hint_after_deviation_returns_to_the_solution():
+    puzzle = load_data_puzzle("1")
+    path = solve(puzzle, "bfs").path
+    service = HintService.from_solution(puzzle, path)
+    assert service.hint(puzzle) == path[0]
+    # Un coup hors du chemin : l'indice ramène sur un état de distance connue
+    moved = puzzle.create_new_state(puzzle.get_vehicle_index("L"), -1)
+    hint = service.hint(moved)
+    assert hint is not None
+    assert service.distance(moved.create_new_state(moved.get_vehicle_index(hint[0]), hint[1])) is not None
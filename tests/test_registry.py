@@ -0,0 +1,59 @@
+#test_registry.py
+import pytest
+
+from portfolio import is_optimal
+from solver import (ADMISSIBLE_HEURISTICS, SOLVERS, SolveOptions, SolveResult, algorithm_catalog,
+                    algorithm_name, make_heuristic, register_solver, solve)
+
+
+def test_algorithm_names():
+    assert algorithm_name("bfs") == "bfs"
+    assert algorithm_name("astar", "h2") == "astar2"
+    assert algorithm_name("astar", "moves") == "astar-moves"
+    assert algorithm_name("astar-resumable", "h3") == "astar-resumable3"
+
+
+def test_catalog_contains_builtin_and_plugin_solvers():
+    catalog = algorithm_catalog()
+    for name in ("bfs", "astar1", "astar2", "astar3", "astar-moves", "anytime-moves", "greedy2", "beam2",
+                 "bfs-ranked", "bfs-disk", "bfs-resumable", "astar-resumable2", "portfolio"):
+        assert name in catalog
+    assert catalog["astar-moves"][:2] == ("astar", "moves")
+    assert catalog["bfs"][:2] == ("bfs", None)
+
+
+def test_optimal_configurations():
+    assert "moves" in ADMISSIBLE_HEURISTICS
+    assert "h2" not in ADMISSIBLE_HEURISTICS
+    for name in ("bfs", "bfs-ranked", "bfs-disk", "bfs-resumable", "astar-moves", "astar-resumable-moves"):
+        assert is_optimal(name), name
+    for name in ("astar2", "astar3", "anytime-moves", "greedy-moves", "portfolio"):
+        assert not is_optimal(name), name
+
+
+def test_registered_solver_joins_catalog(puzzle_1):
+    calls = []
+
+    @register_solver("test-echo", "Solveur de test", uses_heuristic=True)
+    def _echo(puzzle, options):
+        calls.append(options.heuristic)
+        return SolveResult("test-echo", None, 0, expanded=0, generated=1)
+
+    try:
+        catalog = algorithm_catalog()
+        assert catalog["test-echo2"][:2] == ("test-echo", "h2")
+        solve(puzzle_1, "test-echo-moves")
+        solve(puzzle_1, "test-echo")
+        assert calls == ["moves", "h2"]
+    finally:
+        del SOLVERS["test-echo"]
+    assert "test-echo2" not in algorithm_catalog()
+
+
+def test_unknown_names_raise(puzzle_1):
+    with pytest.raises(ValueError):
+        solve(puzzle_1, "dijkstra")
+    with pytest.raises(ValueError):
+        make_heuristic("h9", puzzle_1)
+    with pytest.raises(ValueError):
+        solve(puzzle_1, "astar", SolveOptions(heuristic="h9"))
@@ -0,0 +1,83 @@
+#test_search.py
+"""Équivalence des solveurs optimaux et des heuristiques incrémentales."""
+import random
+
+import pytest
+
+from conftest import OPTIMAL, SMALL, load_data_puzzle, mirrored
+from solution_verifier import verify_solution
+from solver import SolveOptions, make_heuristic, solve
+
+OPTIMAL_SOLVERS = ("bfs", "bfs-ranked", "bfs-disk", "bfs-resumable", "astar-moves", "astar-resumable-moves")
+
+
+@pytest.mark.parametrize("name", SMALL)
+@pytest.mark.parametrize("algorithm", OPTIMAL_SOLVERS)
+def test_optimal_solvers_agree(name, algorithm):
+    puzzle = load_data_puzzle(name)
+    result = solve(puzzle, algorithm)
+    assert result.solved
+    assert result.moves == OPTIMAL[name]
+    assert verify_solution(puzzle, result.path).valid
+
+
+def test_anytime_converges_to_optimum():
+    puzzle = load_data_puzzle("e-f")
+    result = solve(puzzle, "anytime-moves")
+    assert result.moves == OPTIMAL["e-f"]
+    assert result.bound == 1.0
+
+
+def test_west_exit_with_walls(puzzle_1):
+    # Murs sur des cases libres : le premier laisse l'optimum intact, le second rend le puzzle insoluble
+    puzzle = mirrored(puzzle_1, walls=[(4, 5)])
+    blocked = mirrored(puzzle_1, walls=[(5, 0)])
+    for algorithm in ("bfs", "bfs-ranked", "bfs-resumable", "astar-moves"):
+        result = solve(puzzle, algorithm)
+        assert result.moves == OPTIMAL["1"]
+        assert verify_solution(puzzle, result.path).valid
+        result = solve(blocked, algorithm)
+        assert not result.solved and not result.budget_exhausted
+
+
+def test_node_budget_stops_without_solution():
+    puzzle = load_data_puzzle("2-c")
+    for algorithm in ("bfs", "astar2"):
+        result = solve(puzzle, algorithm, SolveOptions(node_budget=50))
+        assert not result.solved
+        assert result.budget_exhausted
+
+
+def _random_transitions(puzzle, steps, seed=0):
+    """(parent, action, enfant) le long d'une marche aléatoire depuis puzzle."""
+    rng = random.Random(seed)
+    states = [puzzle]
+    for _ in range(steps):
+        parent = rng.choice(states)
+        moves = parent.legal_moves()
+        if not moves:
+            continue
+        i, action = rng.choice(moves)
+        child = parent.create_new_state(i, action[1])
+        states.append(child)
+        yield parent, action, child
+
+
+@pytest.mark.parametrize("heuristic", ("h1", "h2", "h3", "moves"))
+@pytest.mark.parametrize("name", ("1", "2-c", "e-f"))
+def test_delta_matches_full_evaluation(heuristic, name):
+    puzzle = load_data_puzzle(name)
+    h = make_heuristic(heuristic, puzzle)
+    full = make_heuristic(heuristic, puzzle)
+    for parent, action, child in _random_transitions(puzzle, 1500):
+        assert h.delta(parent, full(parent), action, child) == full(child)
+
+
+def test_moves_heuristic_is_admissible():
+    from board_layout import Layout
+    puzzle = load_data_puzzle("1")
+    layout, start = Layout.from_puzzle(puzzle)
+    distances = layout.goal_distances(layout.component(start))
+    h = make_heuristic("moves", puzzle)
+    for state, distance in distances.items():
+        assert h(layout.to_puzzle(state)) <= distance
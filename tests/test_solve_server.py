@@ -0,0 +1,25 @@
+#test_solve_server.py
+import asyncio
+
+from conftest import OPTIMAL
+from solve_server import SolveService
+
+
+def test_concurrent_requests_are_coalesced_then_cached(puzzle_1):
+    async def scenario():
+        service = SolveService(workers=1)
+        try:
+            reordered = puzzle_1.copy()
+            reordered.vehicles = list(reversed(reordered.vehicles))
+            first, second = await asyncio.gather(service.solve(puzzle_1, "bfs"),
+                                                 service.solve(reordered, "bfs"))
+            third = await service.solve(puzzle_1, "bfs")
+            other = await service.solve(puzzle_1, "astar-moves")
+            return service.stats, first, second, third, other
+        finally:
+            service.close()
+
+    stats, first, second, third, other = asyncio.run(scenario())
+    assert first is second is third
+    assert first["moves"] == other["moves"] == OPTIMAL["1"]
+    assert (stats["requests"], stats["computed"], stats["coalesced"], stats["cache_hits"]) == (4, 2, 1, 1)
@@ -0,0 +1,67 @@
+#test_verifier.py
+import io
+
+from conftest import OPTIMAL, load_data_puzzle
+from rush_hour_puzzle import RushHourPuzzle
+from solution_optimizer import optimize_solution
+from solution_verifier import verify_solution
+from solver import solve
+
+
+def test_accepts_optimal_solution(puzzle_1):
+    path = solve(puzzle_1, "bfs").path
+    result = verify_solution(puzzle_1, path)
+    assert result.valid and result
+    assert result.moves == OPTIMAL["1"]
+
+
+def test_rejects_illegal_moves(puzzle_1):
+    cases = {
+        "véhicule Z inconnu": [("Z", 1)],
+        "déplacement nul": [("A", 0)],
+        "sortie du plateau": [("A", -2)],
+        "collision avec le véhicule F": [("X", 1)],
+    }
+    for reason, solution in cases.items():
+        result = verify_solution(puzzle_1, solution)
+        assert not result
+        assert (result.move_index, result.action, result.reason) == (0, solution[0], reason)
+
+
+def test_rejects_collision_after_valid_prefix(puzzle_1):
+    result = verify_solution(puzzle_1, [("A", -1), ("J", -1)])
+    assert not result.valid
+    assert (result.move_index, result.moves, result.reason) == (1, 2, "collision avec le véhicule H")
+
+
+def test_rejects_sweep_through_vehicle(puzzle_1):
+    # L glisse de deux cases vers la gauche : K occupe la case intermédiaire
+    result = verify_solution(puzzle_1, [("L", -2)])
+    assert result.reason == "collision avec le véhicule K"
+
+
+def test_rejects_wall_and_unfinished_solution(puzzle_1):
+    walled = puzzle_1.copy()
+    walled.walls = [(0, 0)]
+    walled.setBoard()
+    assert verify_solution(walled, [("A", -1)]).reason == "collision avec un mur"
+    result = verify_solution(puzzle_1, [("A", -1)])
+    assert not result.valid
+    assert (result.move_index, result.action, result.reason) == (1, None, "l'état final n'est pas un but")
+
+
+def test_rejects_invalid_initial_state():
+    puzzle = RushHourPuzzle()
+    puzzle.setVehiclesFromLines(io.StringIO("6,6\nX,0,2,H,2\nA,1,1,V,2\n"))
+    result = verify_solution(puzzle, [("X", 4)])
+    assert not result.valid
+    assert result.move_index == -1
+
+
+def test_optimizer_keeps_solutions_valid():
+    puzzle = load_data_puzzle("2-c")
+    path = solve(puzzle, "greedy2").path
+    shorter = optimize_solution(puzzle, path)
+    assert len(shorter) <= len(path)
+    assert verify_solution(puzzle, shorter).valid
+    assert optimize_solution(puzzle, path[:-1]) == path[:-1]